@@ -0,0 +1,85 @@
+'''
+Throughput of the training input pipeline (src/models/input_pipeline.py) with and without on-the-fly
+augmentation (src/models/augmentation.py), in images per second.
+
+A synthetic uint8 feature store is written to a temporary directory unless --features points to a real one
+(e.g. data/processed/features.npy):
+
+    python -m benchmarks.bench_augmentation --images 20000 --batch-size 64
+'''
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from src.models.augmentation import Augmenter
+from src.models.input_pipeline import load_features, make_feature_dataset
+
+
+def make_features(path, count, seed=0):
+    # Light background with a dark stroke-like band, like the 28x28 word crops
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(200, 256, (count, 28, 28, 1), dtype=np.uint8)
+    pixels[:, 10:18, 4:24] = rng.integers(0, 80, (count, 8, 20, 1), dtype=np.uint8)
+    np.save(path, pixels)
+
+
+def epoch_throughput(dataset, count, repeat):
+    # Best of `repeat` full passes over the dataset, without a model: only the input pipeline is measured
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in dataset:
+            pass
+        timings.append(time.perf_counter() - start)
+    return count / min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--features", help="Existing features.npy to read instead of synthetic data")
+    parser.add_argument("--images", type=int, default=20000, help="Number of synthetic images")
+    parser.add_argument("--batch-size", type=int, default=64, help="Training batch size")
+    parser.add_argument("--repeat", type=int, default=3, help="Epochs per configuration, the best one is reported")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        path = args.features
+        if path is None:
+            path = os.path.join(directory, "features.npy")
+            make_features(path, args.images)
+        features = load_features(path)
+        labels = np.zeros(len(features), dtype=np.int64)
+        count = len(features)
+
+        def pipeline(augment):
+            return make_feature_dataset(features, labels, batch_size=args.batch_size, shuffle=True, seed=0,
+                                        augment=augment)
+
+        plain = epoch_throughput(pipeline(None), count, args.repeat)
+        augmented = epoch_throughput(pipeline(Augmenter(seed=0)), count, args.repeat)
+
+        # The transforms alone, on one batch already in memory
+        augmenter = Augmenter(seed=0)
+        batch = features[:args.batch_size].astype(np.float32) / 255.0
+        start = time.perf_counter()
+        steps = max(1, 2000 // args.batch_size)
+        for step in range(steps):
+            augmenter(batch, step)
+        transforms = steps * len(batch) / (time.perf_counter() - start)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"images: {count}, batch size: {args.batch_size}, CPUs: {os.cpu_count()}")
+    print(f"pipeline without augmentation: {plain:,.0f} img/s")
+    print(f"pipeline with augmentation:    {augmented:,.0f} img/s ({augmented / plain:.0%} of the plain pipeline)")
+    print(f"augmentation transforms alone: {transforms:,.0f} img/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+'''
+Benchmark of src/data/load_dataset.py against the original loader (readlines, two splits per line,
+os.path.exists + os.path.getsize per entry).
+
+A synthetic IAM-like words/ tree and words.txt are generated in a temporary directory, with a share of
+missing and empty images, so the benchmark runs without the dataset:
+
+    python -m benchmarks.bench_load_dataset --words 20000
+'''
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from src.data.load_dataset import load_images
+
+
+def legacy_load_images(base_path, words_path):
+    data = []
+    inexistent_or_corrupted = 0
+    with open(words_path, "r") as f:
+        words = f.readlines()
+    for line in words:
+        if line.startswith("#"):
+            continue
+        parts = line.strip().split()
+        fixed_part = parts[:8]
+        transcription_part = ' '.join(parts[8:])
+        line_split = line.split(" ")
+        folder_parts = line_split[0].split('-')
+        folder1 = folder_parts[0]
+        folder2 = folder_parts[0] + '-' + folder_parts[1]
+        file_name = line_split[0] + ".png"
+        rel_path = os.path.join(base_path, folder1, folder2, file_name)
+        if os.path.exists(rel_path) and os.path.getsize(rel_path) > 0:
+            data.append(fixed_part + [transcription_part, rel_path])
+        else:
+            inexistent_or_corrupted += 1
+    return pd.DataFrame(data, columns=['line_id', 'result', 'graylevel', 'x', 'y', 'w', 'h', 'annotation', 'transcription', 'image_path'])
+
+
+def make_dataset(directory, count):
+    # ~10 words per line, ~10 lines per form, ~1% missing and ~1% empty images
+    base_path = os.path.join(directory, "words")
+    words_path = os.path.join(directory, "words.txt")
+    with open(words_path, "w") as f:
+        f.write("#--- words.txt ---#\n")
+        for i in range(count):
+            form = f"a{i // 1000:02d}-{(i // 100) % 10:03d}u"
+            word_id = f"{form}-{(i // 10) % 10:02d}-{i % 10:02d}"
+            f.write(f"{word_id} ok 154 {i % 2000} 768 27 51 AT word{i % 50}\n")
+            if i % 100 == 7:
+                continue  # missing image
+            folder = os.path.join(base_path, form.split('-')[0], form)
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, word_id + ".png"), "wb") as image:
+                image.write(b"" if i % 100 == 13 else b"\x89PNG\r\n\x1a\n")
+    return base_path, words_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=20000, help="Number of entries in the synthetic words.txt")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per implementation, the best one is reported")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        base_path, words_path = make_dataset(directory, args.words)
+        timings = {}
+        for name, loader in (("legacy", legacy_load_images), ("scandir", load_images)):
+            runs = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                df = loader(base_path, words_path)
+                runs.append(time.perf_counter() - start)
+            timings[name] = (min(runs), df)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    (legacy_time, legacy_df), (new_time, new_df) = timings["legacy"], timings["scandir"]
+    print(f"entries: {args.words}, rows kept: legacy={len(legacy_df)} scandir={len(new_df)}")
+    print(f"legacy:  {legacy_time:.3f}s  {legacy_df.memory_usage(deep=True).sum() / 1e6:.1f} MB")
+    print(f"scandir: {new_time:.3f}s  {new_df.memory_usage(deep=True).sum() / 1e6:.1f} MB")
+    print(f"speedup: {legacy_time / new_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+'''
+Cost of every architecture of the model zoo (src/models/model_zoo.py): parameter count, FLOPs per image and
+median CPU inference latency at batch 1 and 64. Accuracy depends on the data and is compared on the MLflow
+runs of `python -m src.models.build_train_cnn --architecture <name>`, which log the same profile.
+
+    python -m benchmarks.bench_model_zoo --classes 500 --threads 1
+'''
+
+import argparse
+import os
+
+import tensorflow as tf
+
+from src.models.model_zoo import ARCHITECTURES, profile_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--classes", type=int, default=500, help="Number of output classes")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed calls per batch size, the median is reported")
+    parser.add_argument("--threads", type=int, default=0, help="Intra-op threads (0: all cores)")
+    parser.add_argument("--architectures", nargs="+", choices=sorted(ARCHITECTURES), default=list(ARCHITECTURES))
+    args = parser.parse_args()
+
+    tf.config.threading.set_intra_op_parallelism_threads(args.threads)
+
+    # Imported here so the thread count is set before TensorFlow starts
+    from src.models.build_train_cnn import build_model
+
+    print(f"classes: {args.classes}, CPUs: {os.cpu_count()}, intra-op threads: {args.threads or 'all'}")
+    print(f"{'architecture':<14}{'params':>12}{'MFLOPs':>10}{'batch 1 (ms)':>15}{'batch 64 (ms)':>16}")
+    for name in args.architectures:
+        model = build_model((28, 28, 1), args.classes, architecture=name)
+        profile = profile_model(model, batch_sizes=(1, 64), repeat=args.repeat)
+        print(f"{name:<14}{profile['params']:>12,}{profile['flops'] / 1e6:>10.2f}"
+              f"{profile['latency_ms_batch_1']:>15.2f}{profile['latency_ms_batch_64']:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
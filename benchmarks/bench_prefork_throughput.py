@@ -0,0 +1,182 @@
+'''
+Throughput and memory of the prediction service with several workers:
+- uvicorn: `uvicorn --workers N`, every worker a fresh interpreter with default thread pools. It runs through
+  benchmarks.uvicorn_nodelay, so its connections have TCP_NODELAY like those of the prefork server,
+- prefork: `python -m src.api.serve --workers N`, workers forked after the service is imported and the model
+  file is mapped, cores // N inference threads each.
+
+For every worker count, closed-loop clients post a PNG to /predict on keep-alive connections for a fixed time.
+The service and the clients share the machine, so pin them with taskset on a larger machine. Memory is read
+from /proc after the run: total PSS of the server processes (shared pages split between them) and the average
+private memory (USS) of a worker.
+
+    python -m benchmarks.bench_prefork_throughput --workers 1 2 4 --duration 10
+'''
+
+import argparse
+import http.client
+import io
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def png_body(boundary):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("L", (120, 40), 200).save(buffer, format="PNG")
+    return (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"word.png\"\r\n"
+            f"Content-Type: image/png\r\n\r\n").encode() + buffer.getvalue() + f"\r\n--{boundary}--\r\n".encode()
+
+
+def wait_ready(port, workers, timeout=180):
+    # Connections are spread over the workers: require a run of successes so that every worker has loaded
+    deadline, streak = time.monotonic() + timeout, 0
+    while streak < 4 * workers:
+        if time.monotonic() > deadline:
+            raise TimeoutError("the service did not become ready")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            connection.request("GET", "/ready")
+            streak = streak + 1 if connection.getresponse().status == 200 else 0
+            connection.close()
+        except OSError:
+            streak = 0
+        if streak == 0:
+            time.sleep(0.2)
+
+
+def run_load(port, concurrency, duration):
+    """Closed-loop clients on keep-alive connections, returns the number of answered requests per second."""
+    boundary = "benchboundary"
+    body = png_body(boundary)
+    headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    counts = [0] * concurrency
+    stop_at = time.perf_counter() + duration
+
+    def client(slot):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        while time.perf_counter() < stop_at:
+            connection.request("POST", "/predict", body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status == 200:
+                counts[slot] += 1
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(slot,)) for slot in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / (time.perf_counter() - started)
+
+
+def process_tree(pid):
+    pids, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        pids.append(current)
+        try:
+            with open(f"/proc/{current}/task/{current}/children") as f:
+                pending.extend(int(child) for child in f.read().split())
+        except FileNotFoundError:
+            pass
+    return pids
+
+
+def memory_kib(pid):
+    # Proportional and private memory of a process (Linux)
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return values["Pss"], values["Private_Clean"] + values["Private_Dirty"]
+
+
+def measure(command, env, workers, concurrency, duration):
+    port = free_port()
+    server = subprocess.Popen(command + ["--port", str(port)], env=env, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL, start_new_session=True)
+    try:
+        wait_ready(port, workers)
+        run_load(port, concurrency, min(2.0, duration))  # warm-up: every batch size the batcher produces
+        throughput = run_load(port, concurrency, duration)
+        pids = process_tree(server.pid)
+        memory = [memory_kib(pid) for pid in pids]
+        worker_uss = [uss for pid, (_, uss) in zip(pids, memory) if pid != server.pid]
+        return {
+            "requests_per_s": throughput,
+            "total_pss_mib": sum(pss for pss, _ in memory) / 1024,
+            "worker_uss_mib": sum(worker_uss) / max(len(worker_uss), 1) / 1024,
+        }
+    finally:
+        os.killpg(server.pid, signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent client connections")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds of load per measurement")
+    parser.add_argument("--serving-mode", choices=["lite", "full"], default="lite",
+                        help="lite serves a .tflite file, full a .keras file with TensorFlow")
+    args = parser.parse_args()
+
+    from src.api.prediction import class_labels
+    from src.models.build_train_cnn import build_model
+    from src.models.export_model import convert_to_tflite, export_saved_model
+
+    directory = tempfile.mkdtemp()
+    try:
+        # One output per label of the service, /predict maps the argmax to its label
+        model = build_model((28, 28, 1), len(class_labels))
+        if args.serving_mode == "lite":
+            model_path = convert_to_tflite(export_saved_model(model, os.path.join(directory, "saved_model")),
+                                           os.path.join(directory, "CNN.tflite"))
+        else:
+            model_path = os.path.join(directory, "CNN.keras")
+            model.save(model_path)
+
+        python_path = os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")]))
+        env = dict(os.environ, PYTHONPATH=python_path, SERVING_MODE=args.serving_mode, MODEL_PATH=model_path,
+                   MODEL_CACHE_DIR=os.path.join(directory, "cache"))
+        env.pop("MODEL_NUM_THREADS", None)
+        cpus = len(os.sched_getaffinity(0))
+        commands = {
+            "uvicorn": [sys.executable, "-m", "benchmarks.uvicorn_nodelay", "src.api.prediction:app", "--log-level", "warning",
+                        "--workers"],
+            "prefork": [sys.executable, "-m", "src.api.serve", "--log-level", "warning", "--workers"],
+        }
+
+        print(f"serving mode: {args.serving_mode}, CPUs: {cpus}, clients: {args.concurrency}")
+        print(f"{'server':<10}{'workers':>8}{'req/s':>10}{'req/s/CPU':>11}{'total PSS (MiB)':>17}"
+              f"{'worker USS (MiB)':>18}")
+        for workers in args.workers:
+            for name, command in commands.items():
+                result = measure(command + [str(workers)], env, workers, args.concurrency, args.duration)
+                print(f"{name:<10}{workers:>8}{result['requests_per_s']:>10.0f}{result['requests_per_s'] / cpus:>11.0f}"
+                      f"{result['total_pss_mib']:>17.0f}{result['worker_uss_mib']:>18.0f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
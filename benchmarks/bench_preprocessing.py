@@ -0,0 +1,80 @@
+'''
+Micro-benchmark of the shared image preprocessing (src/data/preprocessing.py) against the original
+per-image code of prepare_features.py / prediction.py (PIL convert + resize, list append, float64 division).
+
+Synthetic word-like PNG crops are generated in a temporary directory, so the benchmark runs without the dataset:
+
+    python -m benchmarks.bench_preprocessing --images 2000 --repeat 3 --workers 4
+'''
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from src.data.preprocessing import decode_batch_parallel, normalize, preprocess_batch
+
+
+def legacy_preprocess(paths, width=28, height=28):
+    X = []
+    for path in paths:
+        image = Image.open(path).convert('L').resize((width, height))
+        X.append(np.array(image))
+    return (np.array(X) / 255.0).reshape(-1, height, width, 1)
+
+
+def make_images(directory, count, seed=0):
+    # IAM word crops are small grayscale PNGs of varying width
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(count):
+        width, height = int(rng.integers(40, 250)), int(rng.integers(30, 90))
+        pixels = rng.integers(180, 256, (height, width), dtype=np.uint8)
+        path = os.path.join(directory, f"word_{i}.png")
+        Image.fromarray(pixels, "L").save(path)
+        paths.append(path)
+    return paths
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=2000, help="Number of synthetic images")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per implementation, the best one is reported")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Workers for the parallel variants")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        paths = make_images(directory, args.images)
+        legacy_time, legacy = best_of(lambda: legacy_preprocess(paths), args.repeat)
+        shared_time, (shared, _) = best_of(lambda: preprocess_batch(paths), args.repeat)
+        threads_time, _ = best_of(lambda: normalize(decode_batch_parallel(paths, workers=args.workers)[0]), args.repeat)
+        processes_time, _ = best_of(
+            lambda: normalize(decode_batch_parallel(paths, workers=args.workers, use_processes=True)[0]), args.repeat
+        )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"images: {args.images}")
+    print(f"legacy (float64): {legacy_time:.3f}s  {args.images / legacy_time:,.0f} img/s  {legacy.nbytes / 1e6:.1f} MB")
+    print(f"shared (float32): {shared_time:.3f}s  {args.images / shared_time:,.0f} img/s  {shared.nbytes / 1e6:.1f} MB")
+    print(f"shared, {args.workers} threads: {threads_time:.3f}s  {args.images / threads_time:,.0f} img/s")
+    print(f"shared, {args.workers} processes: {processes_time:.3f}s  {args.images / processes_time:,.0f} img/s")
+    print(f"speedup (serial): {legacy_time / shared_time:.2f}x, max abs difference: {np.abs(legacy - shared).max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+'''
+Inference latency of the prediction service backends (src/api/model_store.py) on the same model:
+- pyfunc: the MLflow pyfunc wrapper used for registry and cached models (skipped if mlflow is not installed),
+- keras: the Keras model behind `predict`, used for a pinned .keras file,
+- saved_model: the concrete `serve` function of the SavedModel written by export_model,
+- tflite: the TFLite file written by export_model (XNNPACK delegate).
+
+The trained models/CNN.keras is used if it exists, otherwise an untrained baseline model:
+
+    python -m benchmarks.bench_serving_backends --model models/CNN.keras --repeat 100
+'''
+
+import argparse
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from src.api.model_store import KerasPredictor, SavedModelPredictor, TFLitePredictor
+from src.models.export_model import convert_to_tflite, export_saved_model
+from src.models.model_zoo import time_calls
+
+
+def pyfunc_predictor(model, directory):
+    try:
+        import mlflow.pyfunc
+        import mlflow.tensorflow
+    except ImportError:
+        return None
+    path = os.path.join(directory, "pyfunc")
+    mlflow.tensorflow.save_model(model, path)
+    return mlflow.pyfunc.load_model(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="models/CNN.keras", help="Trained Keras model")
+    parser.add_argument("--classes", type=int, default=500, help="Classes of the untrained model, without --model")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32])
+    parser.add_argument("--repeat", type=int, default=100, help="Timed calls per batch size, the median is reported")
+    args = parser.parse_args()
+
+    from tensorflow.keras.models import load_model
+    from src.models.build_train_cnn import build_model
+
+    if os.path.exists(args.model):
+        model = load_model(args.model, compile=False)
+        name = args.model
+    else:
+        model = build_model((28, 28, 1), args.classes)
+        name = f"untrained baseline, {args.classes} classes"
+
+    directory = tempfile.mkdtemp()
+    try:
+        saved_model_dir = export_saved_model(model, os.path.join(directory, "saved_model"))
+        tflite_path = convert_to_tflite(saved_model_dir, os.path.join(directory, "model.tflite"))
+        backends = {
+            "pyfunc": pyfunc_predictor(model, directory),
+            "keras": KerasPredictor(model),
+            "saved_model": SavedModelPredictor(saved_model_dir),
+            "tflite": TFLitePredictor(tflite_path),
+        }
+
+        rng = np.random.default_rng(0)
+        print(f"model: {name}, CPUs: {os.cpu_count()}")
+        print(f"{'backend':<14}" + "".join(f"{f'batch {size} (ms)':>16}" for size in args.batch_sizes))
+        for backend, predictor in backends.items():
+            if predictor is None:
+                print(f"{backend:<14}{'skipped, mlflow is not installed':>32}")
+                continue
+            timings = []
+            for size in args.batch_sizes:
+                batch = rng.random((size,) + tuple(model.input_shape[1:]), dtype=np.float32)
+                timings.append(time_calls(predictor.predict, batch, args.repeat))
+            print(f"{backend:<14}" + "".join(f"{timing:>16.3f}" for timing in timings))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
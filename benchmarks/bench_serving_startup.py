@@ -0,0 +1,116 @@
+'''
+Startup time and resident memory of the prediction service (src/api/prediction.py) per serving mode:
+- pyfunc: full mode, MLflow model from the local cache (skipped if mlflow is not installed),
+- keras: full mode, pinned .keras file (TensorFlow),
+- lite: SERVING_MODE=lite, pinned .tflite file on the standalone LiteRT interpreter.
+
+Every mode runs in a fresh process which imports the service, loads and warms up the model and answers one
+prediction, like a container cold start. Peak RSS is the high-water mark of the process memory (VmHWM, Linux).
+
+    python -m benchmarks.bench_serving_startup --repeat 3
+'''
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+CHILD = r'''
+import json, sys, time
+started = time.perf_counter()
+import src.api.prediction as prediction
+imported = time.perf_counter()
+prediction.model_manager.load_initial()
+loaded = time.perf_counter()
+import numpy as np
+prediction.run_inference(np.zeros((1, 28, 28, 1), dtype=np.float32))
+predicted = time.perf_counter()
+# Peak resident memory of this process (Linux): VmHWM in /proc/self/status, in KiB
+with open("/proc/self/status") as f:
+    peak_rss_kib = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+print(json.dumps({
+    "import_s": imported - started,
+    "load_s": loaded - imported,
+    "first_prediction_ms": 1000 * (predicted - loaded),
+    "peak_rss_mib": peak_rss_kib / 1024,
+    "imported": [name for name in ("tensorflow", "mlflow", "pandas") if name in sys.modules],
+}))
+'''
+
+
+def run_mode(env):
+    # Fresh interpreter per run, timed from process start to the first answered prediction
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-c", CHILD], env=env, capture_output=True, text=True, check=True)
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["total_s"] = time.perf_counter() - started
+    return result
+
+
+def cache_pyfunc_model(model, cache_dir):
+    # Same layout as ModelStore._download: <cache>/<run id>/model + manifest, and the LATEST pointer
+    try:
+        import mlflow.tensorflow
+    except ImportError:
+        return False
+    from src.api.model_store import LATEST_FILE, MANIFEST_FILE, hash_path
+
+    run_id = hashlib.sha256(b"bench").hexdigest()[:32]
+    model_dir = os.path.join(cache_dir, run_id, "model")
+    mlflow.tensorflow.save_model(model, model_dir)
+    with open(os.path.join(cache_dir, run_id, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump({"run_id": run_id, "sha256": hash_path(model_dir)}, f)
+    with open(os.path.join(cache_dir, LATEST_FILE), "w", encoding="utf-8") as f:
+        f.write(run_id)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--classes", type=int, default=500, help="Number of output classes of the model")
+    parser.add_argument("--repeat", type=int, default=3, help="Cold starts per mode, the fastest is reported")
+    args = parser.parse_args()
+
+    from src.models.build_train_cnn import build_model
+    from src.models.export_model import convert_to_tflite, export_saved_model
+
+    directory = tempfile.mkdtemp()
+    try:
+        model = build_model((28, 28, 1), args.classes)
+        keras_path = os.path.join(directory, "CNN.keras")
+        model.save(keras_path)
+        tflite_path = convert_to_tflite(export_saved_model(model, os.path.join(directory, "saved_model")),
+                                        os.path.join(directory, "CNN.tflite"))
+        cache_dir = os.path.join(directory, "cache")
+        os.makedirs(cache_dir)
+
+        python_path = os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")]))
+        base_env = dict(os.environ, PYTHONPATH=python_path, MODEL_CACHE_DIR=cache_dir)
+        base_env.pop("MODEL_PATH", None)
+        modes = {
+            "pyfunc": dict(base_env, SERVING_MODE="full") if cache_pyfunc_model(model, cache_dir) else None,
+            "keras": dict(base_env, SERVING_MODE="full", MODEL_PATH=keras_path),
+            "lite": dict(base_env, SERVING_MODE="lite", MODEL_PATH=tflite_path),
+        }
+
+        print(f"{'mode':<8}{'import (s)':>12}{'load (s)':>10}{'1st pred (ms)':>15}{'total (s)':>11}"
+              f"{'peak RSS (MiB)':>16}  heavy modules imported")
+        for mode, env in modes.items():
+            if env is None:
+                print(f"{mode:<8}  skipped, mlflow is not installed")
+                continue
+            result = min((run_mode(env) for _ in range(args.repeat)), key=lambda r: r["total_s"])
+            print(f"{mode:<8}{result['import_s']:>12.2f}{result['load_s']:>10.2f}"
+                  f"{result['first_prediction_ms']:>15.2f}{result['total_s']:>11.2f}{result['peak_rss_mib']:>16.0f}"
+                  f"  {', '.join(result['imported']) or 'none'}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+'''
+`python -m uvicorn` with TCP_NODELAY on every accepted connection, for bench_prefork_throughput.
+
+uvicorn creates its listening socket without IPPROTO_TCP, so asyncio leaves Nagle's algorithm enabled on the
+connections it accepts, while src.api.serve disables it. Running uvicorn through this module gives both servers
+the same socket options, so the benchmark compares the process models only. The patch is applied at import:
+the workers that `--workers` spawns import this module again as their main module.
+
+    python -m benchmarks.uvicorn_nodelay src.api.prediction:app --workers 4
+'''
+
+import asyncio.base_events
+import socket
+
+
+def _set_nodelay(sock):
+    # asyncio only does this for sockets created with proto=IPPROTO_TCP
+    if sock.family in (socket.AF_INET, socket.AF_INET6) and sock.type == socket.SOCK_STREAM:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+asyncio.base_events._set_nodelay = _set_nodelay
+
+if __name__ == "__main__":
+    import uvicorn.main
+
+    uvicorn.main.main(prog_name="uvicorn")
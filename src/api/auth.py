@@ -0,0 +1,85 @@
+# src/api/auth.py
+'''
+User accounts and HTTP Basic credential checks.
+
+The gateway authenticates every request with them. The prediction service uses the same check for its model
+admin endpoints (reload, rollback): the gateway forwards the admin's credentials, and a client reaching the
+prediction port directly cannot swap models without them.
+'''
+
+import functools
+
+from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from passlib.context import CryptContext
+
+security = HTTPBasic()
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+@functools.lru_cache(maxsize=None)
+def get_users():
+    """Users dictionary with hashed passwords and roles, hashed on first use: bcrypt would slow down every import."""
+    return {
+        "admin1": {
+            "username": "admin1",
+            "name": "Admin",
+            "hashed_password": pwd_context.hash('1nimda'),
+            "role": "admin",
+        },
+        "user1": {
+            "username": "user1",
+            "name": "User",
+            "hashed_password": pwd_context.hash('1resu'),
+            "role": "user",
+        }
+    }
+
+
+async def verify_password(username: str, password: str, hashed_password: str, credential_cache=None) -> bool:
+    if credential_cache is not None and credential_cache.is_verified(username, password, hashed_password):
+        return True
+    # bcrypt is CPU-bound, keep it off the event loop
+    verified = await run_in_threadpool(pwd_context.verify, password, hashed_password)
+    if verified and credential_cache is not None:
+        credential_cache.add(username, password, hashed_password)
+    return verified
+
+
+async def authenticate(credentials: HTTPBasicCredentials, credential_cache=None) -> dict:
+    """
+    Check HTTP Basic credentials against the users.
+
+    Parameters:
+        credentials (HTTPBasicCredentials): Credentials of the request.
+        credential_cache (CredentialCache): Optional cache of verified credentials, to skip bcrypt.
+
+    Returns:
+        dict: The authenticated user.
+
+    Raises:
+        HTTPException: 401 if the username or password is wrong.
+    """
+    # Only the first call hashes the passwords, keep it off the event loop
+    users = get_users() if get_users.cache_info().currsize else await run_in_threadpool(get_users)
+    username = credentials.username
+    if username not in users or not await verify_password(username, credentials.password,
+                                                          users[username]['hashed_password'], credential_cache):
+        print("🚫 Unauthorized access attempt")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Basic"},
+        )
+    print(f"✅ Authenticated user: {username}, Role: {users[username]['role']}")
+    return users[username]
+
+
+async def require_admin(credentials: HTTPBasicCredentials = Depends(security)) -> dict:
+    """Dependency of admin-only endpoints: 401 without valid credentials, 403 for users without the admin role."""
+    user = await authenticate(credentials)
+    if user["role"] != "admin":
+        print("🚫 Unauthorized access to admin endpoint")
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    return user
@@ -0,0 +1,78 @@
+# src/api/auth_cache.py
+'''
+Bounded, TTL-based cache of successfully verified credentials for the gateway.
+
+bcrypt is deliberately slow, so verifying HTTP Basic credentials on every request caps gateway throughput.
+Once a (username, password) pair has been verified, we remember an HMAC digest of it (never the password
+itself) for `ttl_seconds`. The HMAC key is random per process, so digests are useless outside of it.
+Entries are bound to the stored password hash, so a changed password invalidates them immediately.
+'''
+
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class CredentialCache:
+    def __init__(self, max_size=1024, ttl_seconds=300.0, hit_counter=None, miss_counter=None):
+        """
+        Parameters:
+            max_size (int): Maximum number of cached credentials; the least recently used entry is evicted first.
+            ttl_seconds (float): How long a verified credential stays valid in the cache.
+            hit_counter: Optional Prometheus Counter incremented on every cache hit.
+            miss_counter: Optional Prometheus Counter incremented on every cache miss.
+        """
+        self.max_size = max(0, int(max_size))
+        self.ttl_seconds = float(ttl_seconds)
+        self.hit_counter = hit_counter
+        self.miss_counter = miss_counter
+        self._key = os.urandom(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _digest(self, username, password):
+        message = username.encode("utf-8") + b"\0" + password.encode("utf-8")
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def is_verified(self, username, password, hashed_password):
+        """Return True if the credentials were verified against `hashed_password` within the TTL."""
+        digest = self._digest(username, password)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                expires_at, cached_hash = entry
+                if expires_at > now and hmac.compare_digest(cached_hash, hashed_password):
+                    self._entries.move_to_end(digest)
+                    hit = True
+                else:
+                    del self._entries[digest]
+                    hit = False
+            else:
+                hit = False
+
+        counter = self.hit_counter if hit else self.miss_counter
+        if counter is not None:
+            counter.inc()
+        return hit
+
+    def add(self, username, password, hashed_password):
+        """Remember credentials that were just verified successfully."""
+        if self.max_size == 0:
+            return
+        digest = self._digest(username, password)
+        with self._lock:
+            self._entries[digest] = (time.monotonic() + self.ttl_seconds, hashed_password)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
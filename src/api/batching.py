@@ -0,0 +1,150 @@
+# src/api/batching.py
+'''
+Dynamic micro-batching in front of the model.
+
+Concurrent /predict requests each push their preprocessed image(s) onto an asyncio queue. A single
+background worker drains the queue, gathering requests until either `max_batch_size` images are
+collected or `max_wait_ms` has elapsed since the first one arrived, then runs one `predict` call on the
+stacked batch (in a worker thread, so the event loop stays free) and hands each request back its own rows.
+'''
+
+import asyncio
+import time
+
+import numpy as np
+
+
+class _PendingRequest:
+    def __init__(self, images, future):
+        self.images = images
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatcher:
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=5.0,
+                 batch_size_metric=None, queue_wait_metric=None):
+        """
+        Coalesce concurrent prediction requests into batched model calls.
+
+        Parameters:
+            predict_fn (callable): Function mapping an (N, H, W, C) array to an (N, num_classes) array.
+            max_batch_size (int): Maximum number of images per `predict_fn` call.
+            max_wait_ms (float): Maximum time to wait for more requests once the first one is queued.
+            batch_size_metric: Optional Prometheus Histogram observing the size of every batch.
+            queue_wait_metric: Optional Prometheus Histogram observing per-request queue wait in seconds.
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.batch_size_metric = batch_size_metric
+        self.queue_wait_metric = queue_wait_metric
+        self._queue = None
+        self._worker = None
+
+    async def start(self):
+        """Start the background worker on the running event loop."""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the worker and fail the requests of the batch it was running and any request still in the queue."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        queued = []
+        while not self._queue.empty():
+            queued.append(self._queue.get_nowait())
+        _fail(queued)
+
+    async def submit(self, images):
+        """
+        Queue images for inference and wait for their predictions.
+
+        Parameters:
+            images (np.ndarray): Array of shape (N, H, W, C); a single image may be passed as (H, W, C).
+
+        Returns:
+            np.ndarray: Model output rows for the submitted images, in order.
+        """
+        if self._worker is None:
+            raise RuntimeError("MicroBatcher has not been started")
+        images = np.asarray(images)
+        if images.ndim == 3:
+            images = images[np.newaxis, ...]
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_PendingRequest(images, future))
+        return await future
+
+    async def _run(self):
+        batch = []
+        try:
+            await self._collect_and_run(batch)
+        except asyncio.CancelledError:
+            # Requests already taken off the queue would otherwise wait forever
+            _fail(batch)
+            raise
+
+    async def _collect_and_run(self, batch):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch.clear()
+            first = await self._queue.get()
+            batch.append(first)
+            size = len(first.images)
+            deadline = loop.time() + self.max_wait
+
+            # Keep collecting until the batch is full or the wait budget of the first request is spent
+            while size < self.max_batch_size:
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        pending = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    pending = self._queue.get_nowait()
+                batch.append(pending)
+                size += len(pending.images)
+
+            await self._run_batch(batch, size)
+
+    async def _run_batch(self, batch, size):
+        started = time.perf_counter()
+        if self.queue_wait_metric is not None:
+            for pending in batch:
+                self.queue_wait_metric.observe(started - pending.enqueued_at)
+        if self.batch_size_metric is not None:
+            self.batch_size_metric.observe(size)
+
+        try:
+            images = batch[0].images if len(batch) == 1 else np.concatenate([p.images for p in batch])
+            predictions = await asyncio.get_running_loop().run_in_executor(None, self.predict_fn, images)
+            predictions = np.asarray(predictions)
+        except Exception as e:
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+
+        # Fan the rows of the batched output back to the requests that contributed them
+        offset = 0
+        for pending in batch:
+            n = len(pending.images)
+            if not pending.future.done():
+                pending.future.set_result(predictions[offset:offset + n])
+            offset += n
+
+
+def _fail(requests):
+    for pending in requests:
+        if not pending.future.done():
+            pending.future.set_exception(RuntimeError("Prediction service is shutting down"))
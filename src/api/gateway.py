@@ -1,16 +1,20 @@
-from fastapi import FastAPI, Depends, HTTPException, status, File, UploadFile
-from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from fastapi import FastAPI, Depends, HTTPException, status, Request
+from fastapi.security import HTTPBasicCredentials
 from fastapi.responses import JSONResponse
+from prometheus_fastapi_instrumentator import Instrumentator
+from prometheus_client import Counter, Gauge
 import subprocess
 import httpx
 import asyncio
 import os
-from passlib.context import CryptContext
+from src.api.auth import authenticate, security
+from src.api.auth_cache import CredentialCache
 
 # definition of app including security setup
 app = FastAPI(title="Gateway Service")
-security = HTTPBasic()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Integrate Prometheus instrumentation
+Instrumentator().instrument(app).expose(app)
 
 # These addresses assume that your docker-compose networking is used,
 # and that service names are used as hostnames.
@@ -18,36 +22,146 @@ INGESTION_URL = "http://ingestion_service:8100"
 TRAINING_URL = "http://training_service:8200"
 PREDICTION_URL = "http://prediction_service:8300"
 
-# Users dictionary with hashed passwords and roles
-users = {
-    "admin1": {
-        "username": "admin1",
-        "name": "Admin",
-        "hashed_password": pwd_context.hash('1nimda'),
-        "role": "admin",
-    },
-    "user1": {
-        "username": "user1",
-        "name": "User",
-        "hashed_password": pwd_context.hash('1resu'),
-        "role": "user",
-    }
+# Shared backend client configuration: one keep-alive connection pool for the lifetime of the app
+BACKEND_MAX_CONNECTIONS = int(os.getenv("GATEWAY_BACKEND_MAX_CONNECTIONS", "100"))
+BACKEND_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GATEWAY_BACKEND_MAX_KEEPALIVE_CONNECTIONS", "20"))
+BACKEND_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("GATEWAY_BACKEND_KEEPALIVE_EXPIRY_SECONDS", "30"))
+BACKEND_HTTP2 = os.getenv("GATEWAY_BACKEND_HTTP2", "false").lower() in ("1", "true", "yes")
+BACKEND_CONNECT_TIMEOUT_SECONDS = float(os.getenv("GATEWAY_BACKEND_CONNECT_TIMEOUT_SECONDS", "5"))
+
+# Per-backend read timeouts: ingestion and training only start or query background jobs, so they answer quickly
+BACKEND_TIMEOUTS = {
+    "ingestion": httpx.Timeout(float(os.getenv("INGESTION_TIMEOUT_SECONDS", "30")), connect=BACKEND_CONNECT_TIMEOUT_SECONDS),
+    "training": httpx.Timeout(float(os.getenv("TRAINING_TIMEOUT_SECONDS", "30")), connect=BACKEND_CONNECT_TIMEOUT_SECONDS),
+    "prediction": httpx.Timeout(float(os.getenv("PREDICTION_TIMEOUT_SECONDS", "30")), connect=BACKEND_CONNECT_TIMEOUT_SECONDS),
+    # Reloading downloads and warms up a model on the prediction service
+    "admin": httpx.Timeout(float(os.getenv("MODEL_ADMIN_TIMEOUT_SECONDS", "600")), connect=BACKEND_CONNECT_TIMEOUT_SECONDS),
 }
 
+# Created on startup, closed on shutdown; the transport is kept to report the state of its connection pool
+http_transport = None
+http_client = None
+
+# Uploads are streamed through to the prediction service, never buffered whole; these cap their size
+MAX_UPLOAD_BYTES = int(os.getenv("GATEWAY_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+MAX_BATCH_UPLOAD_BYTES = int(os.getenv("GATEWAY_MAX_BATCH_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+
+backend_requests_in_flight = Gauge(
+    'gateway_backend_requests_in_flight', 'Requests currently forwarded to a backend service', ['backend']
+)
+backend_pool_connections = Gauge(
+    'gateway_backend_pool_connections', 'Connections held by the shared backend connection pool', ['state']
+)
+
+def pool_connection_count(idle: bool) -> int:
+    # httpx has no public pool statistics: read the httpcore pool of the transport created on startup.
+    # `connections` and `is_idle()` are public httpcore API, only the `_pool` attribute is not, so httpx and
+    # httpcore are pinned in requirements.txt and tests/test_api/test_gateway.py checks this on upgrades.
+    if http_transport is None:
+        return 0
+    return sum(1 for connection in http_transport._pool.connections if connection.is_idle() == idle)
+
+backend_pool_connections.labels("idle").set_function(lambda: pool_connection_count(idle=True))
+backend_pool_connections.labels("active").set_function(lambda: pool_connection_count(idle=False))
+
+
+# Cache of verified credentials so bcrypt only runs once per user and TTL window
+AUTH_CACHE_SIZE = int(os.getenv("GATEWAY_AUTH_CACHE_SIZE", "1024"))
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("GATEWAY_AUTH_CACHE_TTL_SECONDS", "300"))
 
+auth_cache_hits = Counter('gateway_auth_cache_hits', 'Credential checks answered from the cache')
+auth_cache_misses = Counter('gateway_auth_cache_misses', 'Credential checks that required a bcrypt verification')
+
+credential_cache = CredentialCache(
+    max_size=AUTH_CACHE_SIZE,
+    ttl_seconds=AUTH_CACHE_TTL_SECONDS,
+    hit_counter=auth_cache_hits,
+    miss_counter=auth_cache_misses,
+)
 
 # Function to verify user credentials and get role
-def get_current_user(credentials: HTTPBasicCredentials = Depends(security)):
-    username = credentials.username
-    if username not in users or not pwd_context.verify(credentials.password, users[username]['hashed_password']):
-        print("🚫 Unauthorized access attempt")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect username or password",
-            headers={"WWW-Authenticate": "Basic"},
+async def get_current_user(credentials: HTTPBasicCredentials = Depends(security)):
+    return await authenticate(credentials, credential_cache)
+
+@app.on_event("startup")
+async def open_http_client():
+    global http_client, http_transport
+    http_transport = httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=BACKEND_MAX_CONNECTIONS,
+            max_keepalive_connections=BACKEND_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=BACKEND_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        http2=BACKEND_HTTP2,
+    )
+    http_client = httpx.AsyncClient(transport=http_transport)
+
+@app.on_event("shutdown")
+async def close_http_client():
+    await http_client.aclose()
+
+async def call_backend(backend: str, method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    Send a request to a backend service through the shared connection pool.
+    Raises httpx.HTTPError on connection errors and non-2xx responses.
+    """
+    backend_requests_in_flight.labels(backend).inc()
+    try:
+        response = await http_client.request(method, url, timeout=BACKEND_TIMEOUTS[backend], **kwargs)
+        response.raise_for_status()
+        return response
+    finally:
+        backend_requests_in_flight.labels(backend).dec()
+
+def backend_error_status(exc: httpx.HTTPError) -> int:
+    # Only status errors carry a backend response; timeouts and connection failures are a bad gateway
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code
+    return status.HTTP_504_GATEWAY_TIMEOUT if isinstance(exc, httpx.TimeoutException) else status.HTTP_502_BAD_GATEWAY
+
+class UploadTooLarge(Exception):
+    pass
+
+async def limited_stream(request: Request, max_bytes: int):
+    # Relay the raw request body chunk by chunk, aborting as soon as it exceeds max_bytes
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            raise UploadTooLarge(f"Upload exceeds the limit of {max_bytes} bytes")
+        yield chunk
+
+async def forward_upload(request: Request, url: str, max_bytes: int) -> httpx.Response:
+    """
+    Stream a multipart upload to the prediction service without parsing or buffering it in the gateway.
+    """
+    content_type = request.headers.get("content-type", "")
+    if not content_type.startswith("multipart/form-data"):
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Expected a multipart/form-data upload")
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"Upload exceeds the limit of {max_bytes} bytes")
+    try:
+        return await call_backend(
+            "prediction", "POST", url,
+            content=limited_stream(request, max_bytes),
+            headers={"content-type": content_type},
         )
-    print(f"✅ Authenticated user: {username}, Role: {users[username]['role']}")
-    return users[username]
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc))
+
+def multipart_request_body(field: str, multiple: bool) -> dict:
+    # The upload endpoints read the raw body, so describe the expected form for the OpenAPI docs explicitly
+    file_schema = {"type": "string", "format": "binary"}
+    schema = {"type": "array", "items": file_schema} if multiple else file_schema
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"multipart/form-data": {"schema": {
+                "type": "object", "properties": {field: schema}, "required": [field],
+            }}},
+        }
+    }
 
 @app.get("/")
 def home():
@@ -59,16 +173,14 @@ async def trigger_ingestion(user: dict = Depends(get_current_user)):
         print("🚫 Unauthorized access to ingestion endpoint")
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     
-    print("📥 Starting ingestion process...")
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(f"{INGESTION_URL}/ingest")
-            response.raise_for_status()
-        except httpx.HTTPError as exc:
-            print(f"❌ Ingestion failed: {exc}")
-            raise HTTPException(status_code=exc.response.status_code, detail=str(exc))
-    print("✅ Ingestion completed successfully")
-    return {"ingestion_result": response.json()}
+    print("📥 Starting ingestion job...")
+    try:
+        response = await call_backend("ingestion", "POST", f"{INGESTION_URL}/jobs")
+    except httpx.HTTPError as exc:
+        print(f"❌ Ingestion failed: {exc}")
+        raise HTTPException(status_code=backend_error_status(exc), detail=str(exc))
+    print(f"✅ Ingestion job {response.json()['job_id']} started")
+    return {"ingestion_job": response.json()}
 
 @app.get("/train")
 async def trigger_training(user: dict = Depends(get_current_user)):
@@ -76,30 +188,73 @@ async def trigger_training(user: dict = Depends(get_current_user)):
         print("🚫 Unauthorized access to training endpoint")
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     
-    print("🎓 Starting training process...")
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(f"{TRAINING_URL}/train")
-            response.raise_for_status()
-        except httpx.HTTPError as exc:
-            print(f"❌ Training failed: {exc}")
-            raise HTTPException(status_code=exc.response.status_code, detail=str(exc))
-    print("✅ Training completed successfully")
-    return {"training_result": response.json()}
-
-@app.post("/predict")
-async def trigger_prediction(file: UploadFile = File(...), user: dict = Depends(get_current_user)):
+    print("🎓 Starting training job...")
+    try:
+        response = await call_backend("training", "POST", f"{TRAINING_URL}/jobs")
+    except httpx.HTTPError as exc:
+        print(f"❌ Training failed: {exc}")
+        raise HTTPException(status_code=backend_error_status(exc), detail=str(exc))
+    print(f"✅ Training job {response.json()['job_id']} started")
+    return {"training_job": response.json()}
+
+@app.get("/jobs/{pipeline}/{job_id}")
+async def get_job_status(pipeline: str, job_id: str, user: dict = Depends(get_current_user)):
+    if user["role"] != "admin":
+        print("🚫 Unauthorized access to jobs endpoint")
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    backend_urls = {"ingestion": INGESTION_URL, "training": TRAINING_URL}
+    if pipeline not in backend_urls:
+        raise HTTPException(status_code=404, detail=f"Unknown pipeline '{pipeline}'")
+
+    try:
+        response = await call_backend(pipeline, "GET", f"{backend_urls[pipeline]}/jobs/{job_id}")
+    except httpx.HTTPError as exc:
+        raise HTTPException(status_code=backend_error_status(exc), detail=str(exc))
+    return {"job": response.json()}
+
+async def admin_model_action(request: Request, user: dict, action: str, params: dict = None):
+    if user["role"] != "admin":
+        print("🚫 Unauthorized access to model admin endpoint")
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    try:
+        # The prediction service checks the admin's credentials again (src/api/auth.py)
+        response = await call_backend("admin", "POST", f"{PREDICTION_URL}/admin/model/{action}", params=params,
+                                      headers={"authorization": request.headers["authorization"]})
+    except httpx.HTTPError as exc:
+        print(f"❌ Model {action} failed: {exc}")
+        raise HTTPException(status_code=backend_error_status(exc), detail=str(exc))
+    return {"model_result": response.json()}
+
+@app.post("/admin/model/reload")
+async def trigger_model_reload(request: Request, force: bool = False, user: dict = Depends(get_current_user)):
+    return await admin_model_action(request, user, "reload", {"force": str(force).lower()})
+
+@app.post("/admin/model/rollback")
+async def trigger_model_rollback(request: Request, user: dict = Depends(get_current_user)):
+    return await admin_model_action(request, user, "rollback")
+
+@app.post("/predict", openapi_extra=multipart_request_body("file", multiple=False))
+async def trigger_prediction(request: Request, user: dict = Depends(get_current_user)):
     print(f"📩 Received prediction request from user: {user['username']}, Role: {user['role']}")
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            file_content = await file.read()
-            files = {"file": (file.filename, file_content, file.content_type)}
-            response = await client.post(f"{PREDICTION_URL}/predict", files=files)
-            response.raise_for_status()
-        except httpx.HTTPError as exc:
-            print(f"❌ Prediction failed: {exc}")
-            raise HTTPException(status_code=exc.response.status_code, detail=str(exc))
-    
+
+    try:
+        response = await forward_upload(request, f"{PREDICTION_URL}/predict", MAX_UPLOAD_BYTES)
+    except httpx.HTTPError as exc:
+        print(f"❌ Prediction failed: {exc}")
+        raise HTTPException(status_code=backend_error_status(exc), detail=str(exc))
+
     print("✅ Prediction successful")
-    return {"prediction_result": response.json()}
\ No newline at end of file
+    return {"prediction_result": response.json()}
+
+@app.post("/predict/batch", openapi_extra=multipart_request_body("files", multiple=True))
+async def trigger_batch_prediction(request: Request, user: dict = Depends(get_current_user)):
+    print(f"📩 Received batch prediction request from user: {user['username']}, Role: {user['role']}")
+
+    try:
+        response = await forward_upload(request, f"{PREDICTION_URL}/predict/batch", MAX_BATCH_UPLOAD_BYTES)
+    except httpx.HTTPError as exc:
+        print(f"❌ Batch prediction failed: {exc}")
+        raise HTTPException(status_code=backend_error_status(exc), detail=str(exc))
+
+    print("✅ Batch prediction successful")
+    return {"prediction_result": response.json()}
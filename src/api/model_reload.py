@@ -0,0 +1,144 @@
+# src/api/model_reload.py
+'''
+Hot model reload for the prediction service.
+
+The ModelManager keeps the model currently being served plus the previous one. A reload loads the new
+model into a second slot, warms it up with a dummy batch (so the first real request does not pay for
+graph tracing and lazy allocations), and only then swaps it in with a single reference assignment.
+In-flight batches keep using the model they started with. The previous model is retained for rollback.
+A rolled-back version is not swapped in again by later reloads, until a newer version appears or a reload
+is forced.
+
+A background watcher can poll the model source (the MLflow registry, or the pinned local file) and
+trigger a reload when a new version appears.
+'''
+
+import threading
+import time
+
+import numpy as np
+
+
+class ModelManager:
+    def __init__(self, store, warmup_shape=(1, 28, 28, 1), version_metric=None, swap_duration_metric=None,
+                 on_swap=None):
+        """
+        Parameters:
+            store (ModelStore): Source used to resolve and load model versions.
+            warmup_shape (tuple): Shape of the dummy batch used to warm up a freshly loaded model.
+            version_metric: Optional Prometheus Gauge with `version` and `source` labels for the served model.
+            swap_duration_metric: Optional Prometheus Summary observing load + warm-up + swap time.
+            on_swap: Optional callable invoked with the new LoadedModel after every swap, e.g. to invalidate
+                results cached for the previous model.
+        """
+        self.store = store
+        self.warmup_shape = warmup_shape
+        self.version_metric = version_metric
+        self.swap_duration_metric = swap_duration_metric
+        self.on_swap = on_swap
+        self.current = None
+        self.previous = None
+        self.rolled_back_version = None  # version rolled away from, skipped by reloads
+        self.load_error = None
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop_watching = threading.Event()
+
+    def load_initial(self):
+        """Load the first model following the store's resolution order."""
+        with self._reload_lock:
+            try:
+                self._swap(self._warm_up(self.store.load()))
+                self.load_error = None
+            except Exception as e:
+                self.load_error = str(e)
+                raise
+
+    def reload(self, force=False):
+        """
+        Load the latest available model version and swap it in if it differs from the served one and is not
+        the version rolled away from by `rollback`.
+
+        Parameters:
+            force (bool): Reload even if the latest version is the one already served or the rolled-back one.
+
+        Returns:
+            dict: Outcome of the reload with the served version.
+        """
+        with self._reload_lock:
+            started = time.perf_counter()
+            version = self.store.latest_version()
+            if not force and self.current is not None and self.current.version == version:
+                return {"swapped": False, "model_version": version}
+            if not force and version == self.rolled_back_version:
+                return {"swapped": False, "model_version": self.current.version, "rolled_back_version": version}
+
+            candidate = self._warm_up(self.store.load_version(version))
+            self._swap(candidate)
+            self.rolled_back_version = None
+            duration = time.perf_counter() - started
+            if self.swap_duration_metric is not None:
+                self.swap_duration_metric.observe(duration)
+            print(f"🔄 Swapped in model {candidate.version} in {duration:.2f}s")
+            return {"swapped": True, "model_version": candidate.version, "swap_seconds": round(duration, 3)}
+
+    def rollback(self):
+        """
+        Swap the previously served model back in. Reloads skip the version rolled away from until a newer one
+        appears, so the watcher does not undo the rollback.
+
+        Raises:
+            RuntimeError: If there is no previous model to roll back to.
+        """
+        with self._reload_lock:
+            if self.previous is None:
+                raise RuntimeError("No previous model to roll back to")
+            self.rolled_back_version = self.current.version
+            self._swap(self.previous)
+            print(f"⏪ Rolled back to model {self.current.version}")
+            return {"swapped": True, "model_version": self.current.version}
+
+    def start_watching(self, interval_seconds):
+        """Poll the model source every `interval_seconds` and reload when a new version appears."""
+        if interval_seconds <= 0 or self._watcher is not None:
+            return
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval_seconds,), name="model-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop_watching.set()
+        self._watcher = None
+
+    def _watch(self, interval_seconds):
+        while not self._stop_watching.wait(interval_seconds):
+            try:
+                if self.current is None:
+                    # The initial load failed: retry it, so the service becomes ready once a model is available
+                    self.load_initial()
+                    print(f"✅ Model {self.current.version} loaded by the watcher (source: {self.current.source}).")
+                else:
+                    self.reload()
+            except Exception as e:
+                print(f"⚠️ Model watcher could not load the model: {e}")
+
+    def _warm_up(self, loaded):
+        loaded.predict(np.zeros(self.warmup_shape, dtype=np.float32))
+        return loaded
+
+    def _swap(self, loaded):
+        if loaded is self.current:
+            return
+        old = self.current
+        if old is not None:
+            self.previous = old
+        self.current = loaded
+
+        if self.version_metric is not None:
+            if old is not None:
+                self.version_metric.remove(old.version, old.source)
+            self.version_metric.labels(loaded.version, loaded.source).set(1)
+        if self.on_swap is not None:
+            self.on_swap(loaded)
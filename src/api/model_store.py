@@ -0,0 +1,344 @@
+# src/api/model_store.py
+'''
+Model resolution for the prediction service.
+
+The model is looked up in this order:
+1. Pinned local path set through MODEL_PATH: a Keras file such as `models/CNN.keras`, or one of the
+   artifacts written by the export_model stage, `models/CNN.tflite` or `models/CNN_savedmodel`. The exported
+   artifacts are served directly by the TFLite interpreter or the SavedModel's concrete function, without the
+   Keras and MLflow pyfunc layers on the request path.
+2. Local cache: an MLflow model previously downloaded into MODEL_CACHE_DIR, keyed by run id
+   (MODEL_RUN_ID if set, otherwise the last run that was downloaded). Each cached model is stored
+   with a manifest holding the SHA-256 of its files, which is checked before loading.
+3. Registry: the best run of the MLflow experiment, downloaded into the cache for the next start.
+
+This keeps container cold starts fast and lets the service start without network access once the cache is warm.
+
+In the lightweight serving mode (`allow_registry=False`) only the pinned path is used. A .tflite file then runs
+on the standalone LiteRT interpreter (ai-edge-litert, or the older tflite-runtime) when it is installed, so
+neither TensorFlow nor MLflow is ever imported. MLflow and TensorFlow are imported lazily, only by the code
+paths that need them.
+'''
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+MANIFEST_FILE = "manifest.json"
+LATEST_FILE = "LATEST"
+
+
+class LoadedModel:
+    def __init__(self, model, version, source):
+        """
+        Parameters:
+            model: Object exposing `predict(batch) -> np.ndarray`.
+            version (str): Run id of the MLflow model, or content hash of a pinned local file.
+            source (str): Where the model came from: "pinned", "cache" or "registry".
+        """
+        self.model = model
+        self.version = version
+        self.source = source
+        self.loaded_at = time.time()
+
+    def predict(self, batch):
+        return self.model.predict(batch)
+
+
+class KerasPredictor:
+    # Keras prints a progress bar per predict call unless told otherwise
+    def __init__(self, model):
+        self.model = model
+
+    def predict(self, batch):
+        return self.model.predict(batch, verbose=0)
+
+
+class SavedModelPredictor:
+    # Calls the concrete `serve` function written by the export_model stage
+    def __init__(self, saved_model_dir):
+        import tensorflow as tf
+
+        self._tf = tf
+        self.saved_model = tf.saved_model.load(saved_model_dir)
+
+    def predict(self, batch):
+        return self.saved_model.serve(self._tf.constant(batch, dtype=self._tf.float32)).numpy()
+
+
+class TFLitePredictor:
+    """
+    Serves a .tflite file, float or full-integer (int8 inputs and outputs are quantized and dequantized here).
+
+    The XNNPACK delegate can crash when an allocated interpreter is resized to a larger batch, so batches
+    are zero-padded to the next power of two and each of these sizes gets its own interpreter, allocated
+    once. Interpreters are not thread-safe, calls are serialized. Each interpreter holds its own copy of the
+    weights packed by XNNPACK and its own tensors, in private memory: only the mapped .tflite file is shared
+    between the interpreters and between the pre-forked workers (src/api/serve.py).
+    """
+
+    def __init__(self, tflite_path, num_threads=None):
+        self._interpreter_class = tflite_interpreter_class()
+        self.tflite_path = tflite_path
+        self.num_threads = num_threads
+        self._interpreters = {}
+        self._lock = threading.Lock()
+
+    def predict(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        count = len(batch)
+        size = 1 << max(count - 1, 0).bit_length()
+        if size != count:
+            batch = np.concatenate([batch, np.zeros((size - count,) + batch.shape[1:], dtype=np.float32)])
+        with self._lock:
+            interpreter = self._interpreters.get(size) or self._load(size)
+            input_details = interpreter.get_input_details()[0]
+            output_details = interpreter.get_output_details()[0]
+            interpreter.set_tensor(input_details["index"], _quantize(batch, input_details))
+            interpreter.invoke()
+            output = _dequantize(interpreter.get_tensor(output_details["index"]), output_details)
+        return output[:count]
+
+    def _load(self, size):
+        interpreter = self._interpreter_class(model_path=self.tflite_path, num_threads=self.num_threads)
+        input_details = interpreter.get_input_details()[0]
+        interpreter.resize_tensor_input(input_details["index"], [size] + list(input_details["shape"][1:]))
+        interpreter.allocate_tensors()
+        self._interpreters[size] = interpreter
+        return interpreter
+
+
+def tflite_interpreter_class():
+    """The lightest installed TFLite interpreter: LiteRT, then tflite-runtime, then the one bundled with TensorFlow."""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+
+            Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+def _quantize(batch, details):
+    if not np.issubdtype(details["dtype"], np.integer):
+        return np.ascontiguousarray(batch, dtype=details["dtype"])
+    scale, zero_point = details["quantization"]
+    limits = np.iinfo(details["dtype"])
+    return np.clip(np.round(batch / scale) + zero_point, limits.min, limits.max).astype(details["dtype"])
+
+
+def _dequantize(output, details):
+    if not np.issubdtype(details["dtype"], np.integer):
+        return output
+    scale, zero_point = details["quantization"]
+    return (output.astype(np.float32) - zero_point) * scale
+
+
+def quantization_info_path(tflite_path):
+    """Sidecar written by the quantize_model stage next to the model it publishes."""
+    return os.path.splitext(tflite_path)[0] + ".json"
+
+
+def read_quantization_info(tflite_path):
+    """Variant and metrics of a model published by the quantize_model stage, None for any other model."""
+    try:
+        with open(quantization_info_path(tflite_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_local_model(path, num_threads=None):
+    """Load a local model file with the predictor matching its format (.tflite, SavedModel directory or Keras)."""
+    if path.endswith(".tflite"):
+        return TFLitePredictor(path, num_threads)
+    if os.path.isdir(path) and os.path.exists(os.path.join(path, "saved_model.pb")):
+        return SavedModelPredictor(path)
+    from tensorflow.keras.models import load_model
+
+    return KerasPredictor(load_model(path, compile=False))
+
+
+def hash_path(path):
+    """SHA-256 over the relative names and contents of every file under `path` (or of `path` itself)."""
+    digest = hashlib.sha256()
+    if os.path.isfile(path):
+        files = [(os.path.basename(path), path)]
+    else:
+        files = []
+        for root, _, names in os.walk(path):
+            for name in names:
+                full_path = os.path.join(root, name)
+                files.append((os.path.relpath(full_path, path), full_path))
+        files.sort()
+    for rel_path, full_path in files:
+        digest.update(rel_path.encode("utf-8"))
+        with open(full_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def pinned_version(path):
+    return "sha256:" + hash_path(path)[:16]
+
+
+class ModelStore:
+    def __init__(self, tracking_uri, experiment_name, cache_dir, pinned_path=None, run_id=None, artifact_path="model",
+                 num_threads=None, allow_registry=True):
+        self.tracking_uri = tracking_uri
+        self.experiment_name = experiment_name
+        self.cache_dir = cache_dir
+        self.pinned_path = pinned_path
+        self.run_id = run_id
+        self.artifact_path = artifact_path
+        self.num_threads = num_threads  # TFLite interpreter threads (None: TFLite default)
+        self.allow_registry = allow_registry  # False: only the pinned path, MLflow is never imported
+
+    def load(self):
+        """
+        Resolve and load the model following the pinned path -> cache -> registry order.
+
+        Returns:
+            LoadedModel: The loaded model with its version and source.
+        """
+        if self.pinned_path and os.path.exists(self.pinned_path):
+            print(f"📌 Loading pinned model from {self.pinned_path}")
+            return self._load_pinned()
+        self._check_registry_allowed()
+
+        cached_run_id = self.run_id or self._latest_cached_run_id()
+        if cached_run_id:
+            loaded = self._load_cached(cached_run_id)
+            if loaded is not None:
+                return loaded
+
+        return self.load_from_registry()
+
+    def latest_version(self):
+        """
+        Return the version that should currently be served, without loading it:
+        the content hash of the pinned file, the pinned run id, or the best run in the registry.
+        """
+        if self.pinned_path and os.path.exists(self.pinned_path):
+            return pinned_version(self.pinned_path)
+        self._check_registry_allowed()
+        return self.run_id or self.latest_registry_run_id()
+
+    def load_version(self, version):
+        """Load a version returned by `latest_version`, preferring the local cache for MLflow runs."""
+        if version.startswith("sha256:"):
+            return self._load_pinned()
+        self._check_registry_allowed()
+        return self._load_cached(version) or self.load_from_registry(version)
+
+    def load_from_registry(self, run_id=None):
+        """Download the requested run (or the best run of the experiment) into the cache and load it."""
+        run_id = run_id or self.run_id or self.latest_registry_run_id()
+        model_dir = self._download(run_id)
+        import mlflow.pyfunc
+        print(f"✅ Model of run {run_id} loaded from the registry.")
+        return LoadedModel(mlflow.pyfunc.load_model(model_dir), run_id, "registry")
+
+    def latest_registry_run_id(self):
+        """Return the run id with the best validation accuracy in the experiment."""
+        import mlflow
+        from mlflow.tracking import MlflowClient
+
+        print("🔍 Fetching the latest model from MLflow...")
+        mlflow.set_tracking_uri(self.tracking_uri)
+        client = MlflowClient()
+        experiment = client.get_experiment_by_name(self.experiment_name)
+        if not experiment:
+            raise Exception(f"Experiment '{self.experiment_name}' not found.")
+
+        runs = client.search_runs(
+            experiment_ids=[experiment.experiment_id],
+            order_by=["metrics.val_accuracy DESC"],
+            max_results=1,
+        )
+        if not runs:
+            raise Exception("No runs found in the experiment.")
+        return runs[0].info.run_id
+
+    def _check_registry_allowed(self):
+        if not self.allow_registry:
+            raise RuntimeError(f"The pinned model {self.pinned_path!r} does not exist and the MLflow registry is "
+                               "disabled in the lightweight serving mode")
+
+    def _load_pinned(self):
+        version = pinned_version(self.pinned_path)
+        info = read_quantization_info(self.pinned_path) if self.pinned_path.endswith(".tflite") else None
+        if info is not None:
+            print(f"🔢 Quantized model: {info.get('variant')} variant, accuracy {info.get('accuracy')} "
+                  f"({info.get('accuracy_delta')} from the float model)")
+        return LoadedModel(load_local_model(self.pinned_path, self.num_threads), version, "pinned")
+
+    def _run_dir(self, run_id):
+        return os.path.join(self.cache_dir, run_id)
+
+    def _latest_cached_run_id(self):
+        try:
+            with open(os.path.join(self.cache_dir, LATEST_FILE), "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def _load_cached(self, run_id):
+        run_dir = self._run_dir(run_id)
+        try:
+            with open(os.path.join(run_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        model_dir = os.path.join(run_dir, "model")
+        if not os.path.isdir(model_dir) or hash_path(model_dir) != manifest.get("sha256"):
+            print(f"⚠️ Cached model for run {run_id} is incomplete or corrupted, discarding it.")
+            shutil.rmtree(run_dir, ignore_errors=True)
+            return None
+
+        import mlflow.pyfunc
+        print(f"✅ Model of run {run_id} loaded from cache {run_dir}.")
+        return LoadedModel(mlflow.pyfunc.load_model(model_dir), run_id, "cache")
+
+    def _download(self, run_id):
+        import mlflow
+
+        mlflow.set_tracking_uri(self.tracking_uri)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        model_uri = f"runs:/{run_id}/{self.artifact_path}"
+
+        # Download next to the final location, then move it in place so a crash never leaves a partial entry
+        staging_dir = tempfile.mkdtemp(prefix=f".{run_id}-", dir=self.cache_dir)
+        try:
+            local_path = mlflow.artifacts.download_artifacts(artifact_uri=model_uri, dst_path=staging_dir)
+            os.replace(local_path, os.path.join(staging_dir, "model"))
+            manifest = {
+                "run_id": run_id,
+                "model_uri": model_uri,
+                "sha256": hash_path(os.path.join(staging_dir, "model")),
+                "downloaded_at": time.time(),
+            }
+            with open(os.path.join(staging_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+
+            run_dir = self._run_dir(run_id)
+            shutil.rmtree(run_dir, ignore_errors=True)
+            os.replace(staging_dir, run_dir)
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+
+        with open(os.path.join(self.cache_dir, LATEST_FILE), "w", encoding="utf-8") as f:
+            f.write(run_id)
+        return os.path.join(run_dir, "model")
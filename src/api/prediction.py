@@ -1,14 +1,24 @@
 # src/api/prediction.py
-from fastapi import FastAPI, File, UploadFile
+from fastapi import Depends, FastAPI, File, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
+from typing import List
 from prometheus_fastapi_instrumentator import Instrumentator
-from prometheus_client import Summary
-import mlflow
-import mlflow.pyfunc
-from mlflow.tracking import MlflowClient
+from prometheus_client import Counter, Summary, Histogram, Gauge
 from PIL import Image
 import numpy as np
 import os
+import io
+import tarfile
+import zipfile
+import zlib
+import threading
+from src.api.auth import require_admin
+from src.api.batching import MicroBatcher
+from src.data.preprocessing import decode_batch, decode_image, normalize
+from src.api.model_store import ModelStore
+from src.api.model_reload import ModelManager
+from src.api.prediction_cache import PredictionCache
 
 app = FastAPI(title="Prediction Service")
 
@@ -19,53 +29,312 @@ Instrumentator().instrument(app).expose(app)
 MLFLOW_TRACKING_URI = "https://dagshub.com/KazemZh/OCR_Handwritting_MLOps.mlflow"
 EXPERIMENT_NAME = "OCR_CNN_Training"
 
+# Serving mode: "full" resolves models through MLflow and TensorFlow, "lite" only serves the pinned .tflite
+# file on the standalone LiteRT interpreter, without importing TensorFlow, MLflow or pandas (Dockerfile-prediction-lite)
+SERVING_MODE = os.getenv("SERVING_MODE", "full")
+
+# Model resolution order: pinned local Keras file -> local cache of MLflow models -> MLflow registry
+# e.g. models/CNN.keras, or the exported models/CNN.tflite / models/CNN_savedmodel / models/quantized/CNN_quantized.tflite
+MODEL_PATH = os.getenv("MODEL_PATH", "models/CNN.tflite" if SERVING_MODE == "lite" else None)
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", "models/cache")
+MODEL_RUN_ID = os.getenv("MODEL_RUN_ID")  # pin a specific MLflow run
+MODEL_NUM_THREADS = int(os.getenv("MODEL_NUM_THREADS", "0")) or None  # TFLite interpreter threads
+
+# Poll the model source for new versions every N seconds and hot-swap them in (0 disables the watcher)
+MODEL_WATCH_INTERVAL_SECONDS = float(os.getenv("MODEL_WATCH_INTERVAL_SECONDS", "0"))
+
+model_store = ModelStore(
+    tracking_uri=MLFLOW_TRACKING_URI,
+    experiment_name=EXPERIMENT_NAME,
+    cache_dir=MODEL_CACHE_DIR,
+    pinned_path=MODEL_PATH,
+    run_id=MODEL_RUN_ID,
+    num_threads=MODEL_NUM_THREADS,
+    allow_registry=SERVING_MODE != "lite",
+)
+
+# Micro-batching configuration: concurrent requests are coalesced into one model call
+MAX_BATCH_SIZE = int(os.getenv("PREDICTION_MAX_BATCH_SIZE", "32"))
+MAX_BATCH_WAIT_MS = float(os.getenv("PREDICTION_MAX_BATCH_WAIT_MS", "5"))
+
+# Upper bound on the number of images accepted by a single /predict/batch request
+MAX_FILES_PER_REQUEST = int(os.getenv("PREDICTION_MAX_FILES_PER_REQUEST", "256"))
+
+# Upper bound on the decompressed size of the archives of a single /predict/batch request (zip/gzip bombs)
+MAX_ARCHIVE_BYTES = int(os.getenv("PREDICTION_MAX_ARCHIVE_BYTES", str(64 * 1024 * 1024)))
+ARCHIVE_READ_CHUNK_BYTES = 64 * 1024
+
+# Results of repeated images are served from the cache (0 disables it), for at most the TTL
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "3600"))
+
 # Create a Summary to record inference time
 inference_time_summary = Summary('inference_time_seconds', 'Time taken for inference')
 
-def load_latest_model():
-    print("🔍 Fetching the latest model from MLflow...")
-    mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
-    client = MlflowClient()
-    experiment = client.get_experiment_by_name(EXPERIMENT_NAME)
-    if not experiment:
-        raise Exception(f"Experiment '{EXPERIMENT_NAME}' not found.")
-    
-    runs = client.search_runs(
-        experiment_ids=[experiment.experiment_id],
-        order_by=["metrics.val_accuracy DESC"],
-        max_results=1,
-    )
-    if not runs:
-        raise Exception("No runs found in the experiment.")
-
-    latest_run = runs[0]
-    model_uri = f"runs:/{latest_run.info.run_id}/model"
-    model = mlflow.pyfunc.load_model(model_uri)
-    print("✅ Latest model loaded successfully.")
-    return model
-
-# Load the model at startup
-model = load_latest_model()
+# Histograms to tune the micro-batching parameters
+batch_size_histogram = Histogram(
+    'inference_batch_size', 'Number of images per model.predict call',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+queue_wait_histogram = Histogram(
+    'inference_queue_wait_seconds', 'Time a request waits in the batching queue before inference',
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5),
+)
+
+# Metrics describing the served model and hot swaps
+model_version_gauge = Gauge('model_version_info', 'Model version currently served (value is always 1)', ['version', 'source'])
+model_swap_summary = Summary('model_swap_duration_seconds', 'Time taken to load, warm up and swap in a new model')
+
+# Prediction cache metrics, per tier: "bytes" (uploaded file) and "pixels" (decoded image)
+prediction_cache = PredictionCache(
+    max_size=PREDICTION_CACHE_SIZE,
+    ttl_seconds=PREDICTION_CACHE_TTL_SECONDS,
+    hit_counter=Counter('prediction_cache_hits', 'Images answered from the prediction cache', ['tier']),
+    miss_counter=Counter('prediction_cache_misses', 'Prediction cache lookups without a result', ['tier']),
+    eviction_counter=Counter('prediction_cache_evictions', 'Results dropped from the prediction cache', ['reason']),
+    size_gauge=Gauge('prediction_cache_size', 'Number of results in the prediction cache'),
+    hit_ratio_gauge=Gauge('prediction_cache_hit_ratio', 'Hit ratio of the prediction cache since startup', ['tier']),
+)
+
+# Loaded in a background thread on startup so the port is bound immediately; /ready reports when it is warm
+model_manager = ModelManager(
+    model_store,
+    warmup_shape=(1, 28, 28, 1),
+    version_metric=model_version_gauge,
+    swap_duration_metric=model_swap_summary,
+    on_swap=prediction_cache.invalidate,
+)
+
+def load_model_in_background():
+    try:
+        model_manager.load_initial()
+        print(f"✅ Model {model_manager.current.version} ready (source: {model_manager.current.source}).")
+    except Exception as e:
+        print(f"❌ Model loading failed: {e}")
+    model_manager.start_watching(MODEL_WATCH_INTERVAL_SECONDS)
 
 # Define your class labels (modify as needed)
 class_labels = ['A', 'made', 'may', 'two', 'We', 'But', 'told', 'And', 'new', 'This', 
                 'first', 'people', 'In', 'much', 'could', 'time', 'man', 'like', 'well', 'You']
 
 def preprocess_image(image: Image.Image) -> np.ndarray:
-    image = image.convert("L")  # grayscale
-    image = image.resize((28, 28))
-    image_array = np.array(image) / 255.0
-    image_array = image_array.reshape(-1, 28, 28, 1)
-    return image_array
+    # Same decoding, resizing and normalization as the prepare_features training stage
+    return normalize(decode_image(image)[np.newaxis, ...])
+
+class UploadLimitExceeded(Exception):
+    """A /predict/batch request has too many images or too many decompressed bytes (413)."""
+
+def read_capped(stream, budget):
+    """
+    Read a decompressed archive member in chunks, without ever holding more than `budget` bytes.
+
+    Raises:
+        UploadLimitExceeded: If the member is larger than the budget, whatever size its header declared.
+    """
+    chunks, size = [], 0
+    while True:
+        chunk = stream.read(min(ARCHIVE_READ_CHUNK_BYTES, budget - size + 1))
+        if not chunk:
+            return b"".join(chunks)
+        size += len(chunk)
+        if size > budget:
+            raise UploadLimitExceeded(f"Archives expand to more than {MAX_ARCHIVE_BYTES} bytes")
+        chunks.append(chunk)
+
+def expand_uploads(files: List[UploadFile]) -> List[tuple]:
+    """
+    Flatten the uploaded files into (filename, bytes) pairs, unpacking .zip and .tar(.gz) archives of crops.
+
+    Blocking (file reads and decompression), run in the threadpool. The number of images is capped by
+    MAX_FILES_PER_REQUEST, and the decompressed size of the archives by MAX_ARCHIVE_BYTES: the declared member
+    sizes are checked before anything is extracted, and members are read in bounded chunks in case they lie.
+
+    Raises:
+        UploadLimitExceeded: If one of the limits is exceeded.
+    """
+    items = []
+    budget = MAX_ARCHIVE_BYTES
+
+    def check_limits(members, declared_bytes):
+        if len(items) + len(members) > MAX_FILES_PER_REQUEST:
+            raise UploadLimitExceeded(f"Too many images, at most {MAX_FILES_PER_REQUEST} are accepted per request")
+        if declared_bytes > budget:
+            raise UploadLimitExceeded(f"Archives expand to more than {MAX_ARCHIVE_BYTES} bytes")
+
+    for upload in files:
+        data = upload.file.read()
+        name = upload.filename or ""
+        if zipfile.is_zipfile(io.BytesIO(data)):
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                members = [member for member in archive.infolist() if not member.is_dir()]
+                check_limits(members, sum(member.file_size for member in members))
+                for member in members:
+                    with archive.open(member) as stream:
+                        content = read_capped(stream, budget)
+                    budget -= len(content)
+                    items.append((member.filename, content))
+        elif name.endswith((".tar", ".tar.gz", ".tgz")):
+            with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+                members = [member for member in archive.getmembers() if member.isfile()]
+                check_limits(members, sum(member.size for member in members))
+                for member in members:
+                    content = read_capped(archive.extractfile(member), budget)
+                    budget -= len(content)
+                    items.append((member.name, content))
+        else:
+            check_limits([name], 0)
+            items.append((name, data))
+    return items
+
+def run_inference(image_batch: np.ndarray) -> np.ndarray:
+    # Take one reference so a concurrent hot swap never changes the model in the middle of a batch
+    model = model_manager.current
+    with inference_time_summary.time():
+        return np.asarray(model.predict(image_batch))
+
+def decode_uploads(uploads, model_version):
+    """
+    Blocking part of a prediction, run in the threadpool: cache lookups and decoding of the cache misses.
+
+    Returns:
+        tuple: (results, batch, to_predict, failures) where results has the cached probabilities (None
+        otherwise), batch is the normalized array of the images to run through the model, to_predict the
+        (upload index, bytes key, pixels key) of its rows and failures a list of (upload index, error message).
+    """
+    keys = [prediction_cache.key("bytes", data, model_version) for data in uploads]
+    results = [prediction_cache.get(key) for key in keys]
+    to_decode = [i for i, result in enumerate(results) if result is None]
+    if not to_decode:
+        return results, None, [], []
+
+    pixels, decode_failures = decode_batch([io.BytesIO(uploads[i]) for i in to_decode])
+    failed = {j for j, _ in decode_failures}
+    to_predict, rows = [], []
+    for j, i in enumerate(to_decode):
+        if j in failed:
+            continue
+        pixels_key = prediction_cache.key("pixels", pixels[j], model_version)
+        results[i] = prediction_cache.get(pixels_key)
+        if results[i] is None:
+            to_predict.append((i, keys[i], pixels_key))
+            rows.append(j)
+        else:
+            prediction_cache.put(keys[i], results[i])
+    batch = normalize(pixels[rows]) if rows else None
+    return results, batch, to_predict, [(to_decode[j], error) for j, error in decode_failures]
+
+async def cached_predictions(uploads, model_version):
+    """
+    Probabilities of each uploaded image, answered from the prediction cache when possible.
+
+    Only the uploads missing from the bytes tier are decoded, and only the images missing from both tiers go
+    through the model, in one batch. Their results are then cached in both tiers. Decoding and hashing run in
+    the threadpool, each image is hashed once, and only the batcher is awaited on the event loop.
+
+    Returns:
+        tuple: (probabilities, failures) where probabilities has one row per upload (None for the images that
+        could not be decoded) and failures is a list of (index, error message).
+    """
+    results, batch, to_predict, failures = await run_in_threadpool(decode_uploads, uploads, model_version)
+    if to_predict:
+        # One stacked array, one forward pass
+        predictions = await batcher.submit(batch)
+        for (i, bytes_key, pixels_key), prediction in zip(to_predict, predictions):
+            results[i] = prediction
+            prediction_cache.put(bytes_key, prediction)
+            prediction_cache.put(pixels_key, prediction)
+    return results, failures
+
+batcher = MicroBatcher(
+    run_inference,
+    max_batch_size=MAX_BATCH_SIZE,
+    max_wait_ms=MAX_BATCH_WAIT_MS,
+    batch_size_metric=batch_size_histogram,
+    queue_wait_metric=queue_wait_histogram,
+)
+
+@app.on_event("startup")
+async def start_batcher():
+    await batcher.start()
+
+@app.on_event("startup")
+def start_model_loading():
+    threading.Thread(target=load_model_in_background, name="model-loader", daemon=True).start()
+
+@app.on_event("shutdown")
+async def stop_batcher():
+    await batcher.stop()
+
+@app.on_event("shutdown")
+def stop_model_watcher():
+    model_manager.stop_watching()
+
+def model_not_ready_response():
+    return JSONResponse(status_code=503, content={"error": "Model is not loaded yet", "load_error": model_manager.load_error})
+
+@app.get("/health")
+def health():
+    return {"status": "ok"}
+
+@app.get("/ready")
+def ready():
+    model = model_manager.current
+    if model is None:
+        status = "failed" if model_manager.load_error else "loading"
+        return JSONResponse(status_code=503, content={"status": status, "error": model_manager.load_error})
+    return {"status": "ready", "model_version": model.version, "model_source": model.source, "serving_mode": SERVING_MODE}
+
+@app.post("/admin/model/reload")
+def reload_model(force: bool = False, user: dict = Depends(require_admin)):
+    try:
+        return model_manager.reload(force=force)
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+@app.post("/admin/model/rollback")
+def rollback_model(user: dict = Depends(require_admin)):
+    try:
+        return model_manager.rollback()
+    except RuntimeError as e:
+        return JSONResponse(status_code=409, content={"error": str(e)})
 
 @app.post("/predict")
-def predict(file: UploadFile = File(...)):
+async def predict(file: UploadFile = File(...)):
+    model = model_manager.current
+    if model is None:
+        return model_not_ready_response()
     try:
-        image = Image.open(file.file)
-        image_array = preprocess_image(image)
-        with inference_time_summary.time():
-            prediction = model.predict(image_array)
-            predicted_label = class_labels[np.argmax(prediction)]
+        predictions, failures = await cached_predictions([await file.read()], model.version)
+        if failures:
+            return JSONResponse(status_code=500, content={"error": failures[0][1]})
+        predicted_label = class_labels[np.argmax(predictions[0])]
         return {"predicted_text": predicted_label}
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
+
+@app.post("/predict/batch")
+async def predict_batch(files: List[UploadFile] = File(...)):
+    model = model_manager.current
+    if model is None:
+        return model_not_ready_response()
+    try:
+        items = await run_in_threadpool(expand_uploads, files)
+    except (zipfile.BadZipFile, tarfile.TarError, EOFError, zlib.error) as e:
+        # Truncated gzip streams raise EOFError, corrupt deflate data zlib.error
+        return JSONResponse(status_code=400, content={"error": f"Invalid archive: {e}"})
+    except UploadLimitExceeded as e:
+        return JSONResponse(status_code=413, content={"error": str(e)})
+
+    # Cache misses are decoded into one preallocated buffer; failures are reported per item instead of failing the request
+    try:
+        predictions, failures = await cached_predictions([data for _, data in items], model.version)
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"error": str(e)})
+    results = [None] * len(items)
+    for i, error in failures:
+        results[i] = {"filename": items[i][0], "error": error}
+    for i, prediction in enumerate(predictions):
+        if prediction is not None:
+            results[i] = {"filename": items[i][0], "predicted_text": class_labels[np.argmax(prediction)]}
+
+    return {"predictions": results}
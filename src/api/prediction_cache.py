@@ -0,0 +1,132 @@
+# src/api/prediction_cache.py
+'''
+Bounded, TTL-based cache of prediction results for the prediction service.
+
+Scans are often submitted again, and the gateway retries requests, so the same word crop reaches the model many
+times. Results are cached in two tiers, keyed by a BLAKE2b digest of:
+- "bytes": the uploaded file. A hit skips decoding and inference.
+- "pixels": the decoded 28x28 uint8 buffer. This catches the same crop re-encoded or with other metadata,
+  and skips inference.
+
+Every key also holds the model version that computed the result. The cache is cleared whenever a new model is
+swapped in (ModelManager `on_swap`). The version in the key keeps a result computed by the old model during
+the swap from being served by the new one.
+'''
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+TIERS = ("bytes", "pixels")
+
+
+class PredictionCache:
+    def __init__(self, max_size=4096, ttl_seconds=3600.0, hit_counter=None, miss_counter=None,
+                 eviction_counter=None, size_gauge=None, hit_ratio_gauge=None):
+        """
+        Parameters:
+            max_size (int): Maximum number of cached results over both tiers; the least recently used is evicted
+                first. 0 disables the cache.
+            ttl_seconds (float): How long a result stays valid in the cache.
+            hit_counter: Optional Prometheus Counter with a `tier` label, incremented on every hit.
+            miss_counter: Optional Prometheus Counter with a `tier` label, incremented on every miss.
+            eviction_counter: Optional Prometheus Counter with a `reason` label ("size", "expired" or
+                "model_swap"), incremented per evicted entry.
+            size_gauge: Optional Prometheus Gauge set to the number of cached results.
+            hit_ratio_gauge: Optional Prometheus Gauge with a `tier` label set to the hit ratio since startup.
+        """
+        self.max_size = max(0, int(max_size))
+        self.ttl_seconds = float(ttl_seconds)
+        self.hit_counter = hit_counter
+        self.miss_counter = miss_counter
+        self.eviction_counter = eviction_counter
+        self.size_gauge = size_gauge
+        self.hit_ratio_gauge = hit_ratio_gauge
+        self._entries = OrderedDict()
+        self._lookups = dict.fromkeys(TIERS, 0)
+        self._hits = dict.fromkeys(TIERS, 0)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def key(self, tier, data, model_version):
+        """
+        Cache key of `data` (uploaded bytes, or the pixel buffer) for `model_version`, None if the cache is
+        disabled. Computed once per image and passed to `get` and `put`, so large uploads are hashed only once.
+        """
+        if not self.enabled:
+            return None
+        if isinstance(data, np.ndarray):
+            data = np.ascontiguousarray(data)
+        return tier, model_version, hashlib.blake2b(data, digest_size=16).digest()
+
+    def get(self, key):
+        """
+        Look up a result by the key from `key()`.
+
+        Returns:
+            np.ndarray: The cached probabilities, or None on a miss.
+        """
+        if key is None:
+            return None
+        tier = key[0]
+        now = time.monotonic()
+        expired = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry, expired = None, True
+            if entry is not None:
+                self._entries.move_to_end(key)
+            self._lookups[tier] += 1
+            self._hits[tier] += entry is not None
+            ratio = self._hits[tier] / self._lookups[tier]
+
+        counter = self.miss_counter if entry is None else self.hit_counter
+        if counter is not None:
+            counter.labels(tier).inc()
+        if self.hit_ratio_gauge is not None:
+            self.hit_ratio_gauge.labels(tier).set(ratio)
+        if expired:
+            self._record_evictions("expired", 1)
+        return None if entry is None else entry[1]
+
+    def put(self, key, probabilities):
+        """Remember the probabilities for a key from `key()`."""
+        if key is None:
+            return
+        value = np.array(probabilities, copy=True)
+        value.flags.writeable = False  # shared by every request that hits the entry
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            self._record_evictions("size", evicted)
+        elif self.size_gauge is not None:
+            self.size_gauge.set(len(self._entries))
+
+    def invalidate(self, loaded=None):
+        """Drop every cached result. Used as the ModelManager `on_swap` callback, hence the unused argument."""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+        self._record_evictions("model_swap", count)
+
+    def _record_evictions(self, reason, count):
+        if self.eviction_counter is not None and count:
+            self.eviction_counter.labels(reason).inc(count)
+        if self.size_gauge is not None:
+            self.size_gauge.set(len(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
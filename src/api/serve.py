@@ -0,0 +1,248 @@
+# src/api/serve.py
+'''
+Pre-fork launcher for running the prediction service with several worker processes.
+
+`uvicorn --workers N` spawns N fresh interpreters. Each one imports the service and loads a private copy of the
+model, and each sizes its thread pools for the whole machine. This launcher does the shared work once, in the
+parent process, and then forks the workers:
+- It binds the listening socket, which all the workers accept on.
+- It limits the thread pools of every worker to cores // workers threads (MODEL_NUM_THREADS, the OpenMP, BLAS
+  and TensorFlow pools), so the workers together never run more inference threads than there are cores.
+- It imports the service, so the loaded modules are shared copy-on-write by the workers.
+- It memory-maps the pinned .tflite model (MODEL_PATH of the service) and reads it into the page cache. The
+  TFLite interpreters of the workers map the same file read-only, so the file's pages are in memory only once,
+  whatever the number of workers. The weights packed by XNNPACK and the tensors of each interpreter are still
+  private to every worker (see TFLitePredictor).
+
+Each worker then runs the usual startup: its own micro-batcher, model loading (interpreters and warm-up) and
+model watcher. Workers that die are replaced, after an exponentially growing delay while they keep dying right
+after they start; the launcher exits with status 1 once too many in a row did. With more than one worker, the Prometheus metrics are aggregated
+over the workers through PROMETHEUS_MULTIPROC_DIR.
+
+    python -m src.api.serve --workers 4 --port 8300
+'''
+
+import argparse
+import importlib
+import mmap
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+import traceback
+
+# Thread pools sized from these variables when numpy, OpenMP and TensorFlow start
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "TF_NUM_INTRAOP_THREADS")
+
+
+def threads_per_worker(workers, cpus=None):
+    """Inference threads of each worker, so that all the workers together use at most one thread per core."""
+    return max(1, (cpus or os.cpu_count() or 1) // workers)
+
+
+def limit_threads(threads, environ=os.environ):
+    """Cap the thread pools of the service. Takes effect only if set before numpy and TensorFlow are imported."""
+    environ["MODEL_NUM_THREADS"] = str(threads)
+    for name in THREAD_ENV_VARS:
+        environ[name] = str(threads)
+    environ["TF_NUM_INTEROP_THREADS"] = "1"
+
+
+def map_model(path):
+    """
+    Memory-map a .tflite file read-only and load it into the page cache before the workers are forked.
+
+    Returns:
+        mmap.mmap: The mapping, to keep open while the workers run, or None for other model formats.
+    """
+    if not path or not path.endswith(".tflite") or not os.path.isfile(path):
+        return None
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mapping, "madvise"):
+        mapping.madvise(mmap.MADV_WILLNEED)
+    # Touch every page so the workers start on a warm page cache
+    for offset in range(0, len(mapping), mmap.PAGESIZE):
+        mapping[offset]
+    return mapping
+
+
+def bind_socket(host, port, backlog=2048):
+    # IPPROTO_TCP explicitly: asyncio only sets TCP_NODELAY on accepted sockets whose protocol is TCP, without
+    # it every response waits for the client's delayed ACK (~40 ms)
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    def __init__(self, app, sock, workers, log_level="info", min_uptime_seconds=10.0, max_fast_failures=5,
+                 backoff_seconds=0.5, max_backoff_seconds=30.0):
+        """
+        Parameters:
+            app: The ASGI application, imported in the parent process.
+            sock (socket.socket): Listening socket shared by the workers.
+            workers (int): Number of worker processes.
+            log_level (str): Uvicorn log level of the workers.
+            min_uptime_seconds (float): A worker dying sooner than this after its spawn counts as a fast failure.
+            max_fast_failures (int): Consecutive fast failures after which the launcher stops and exits with 1.
+            backoff_seconds (float): Delay before respawning after the first fast failure, doubled after each
+                following one. Workers that ran for min_uptime_seconds are replaced at once.
+            max_backoff_seconds (float): Upper bound of the respawn delay.
+        """
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.log_level = log_level
+        self.min_uptime_seconds = min_uptime_seconds
+        self.max_fast_failures = max_fast_failures
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.pids = set()
+        self.spawned_at = {}
+        self.fast_failures = 0
+        self.exit_code = 0
+        self._stopping = False
+
+    def serve(self):
+        """Body of a worker process."""
+        import uvicorn
+
+        uvicorn.Server(uvicorn.Config(self.app, log_level=self.log_level)).run(sockets=[self.sock])
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            # Worker: restore the default handlers, uvicorn installs its own for a graceful shutdown
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                self.serve()
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                # Never return into the parent's supervision loop
+                os._exit(code)
+        self.pids.add(pid)
+        self.spawned_at[pid] = time.monotonic()
+        return pid
+
+    def stop(self, signum=None, frame=None):
+        self._stopping = True
+        for pid in list(self.pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        """
+        Fork the workers, replace the ones that die and forward SIGTERM/SIGINT to all of them.
+
+        Returns:
+            int: Exit status of the launcher, 1 if it gave up on workers that kept dying right after their spawn.
+        """
+        handlers = {signum: signal.signal(signum, self.stop) for signum in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            for _ in range(self.workers):
+                self.spawn()
+            print(f"✅ Started {self.workers} workers: {sorted(self.pids)}")
+            while self.pids:
+                try:
+                    pid, status = os.wait()
+                except ChildProcessError:
+                    break
+                self.pids.discard(pid)
+                _mark_process_dead(pid)
+                if not self._stopping:
+                    self._replace(pid, os.waitstatus_to_exitcode(status))
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+        return self.exit_code
+
+    def _replace(self, pid, code):
+        uptime = time.monotonic() - self.spawned_at.pop(pid)
+        self.fast_failures = self.fast_failures + 1 if uptime < self.min_uptime_seconds else 0
+        if self.fast_failures >= self.max_fast_failures:
+            print(f"❌ Worker {pid} exited with status {code} after {uptime:.1f} s, {self.fast_failures} workers "
+                  f"in a row died within {self.min_uptime_seconds:g} s of their start. Stopping.")
+            self.exit_code = 1
+            self.stop()
+            return
+        delay = 0.0
+        if self.fast_failures:
+            delay = min(self.backoff_seconds * 2 ** (self.fast_failures - 1), self.max_backoff_seconds)
+        print(f"⚠️ Worker {pid} exited with status {code} after {uptime:.1f} s, starting a new one in {delay:g} s.")
+        # Sleep in short steps so that SIGTERM/SIGINT still stops the launcher quickly
+        deadline = time.monotonic() + delay
+        while not self._stopping and time.monotonic() < deadline:
+            time.sleep(min(0.1, deadline - time.monotonic()))
+        if not self._stopping:
+            self.spawn()
+
+
+def _mark_process_dead(pid):
+    # Drop the live gauges of a dead worker from the aggregated metrics
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the prediction service with pre-forked workers.")
+    parser.add_argument("--app", default="src.api.prediction:app", help="ASGI application to serve")
+    parser.add_argument("--host", default=os.getenv("PREDICTION_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PREDICTION_PORT", "8300")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("PREDICTION_WORKERS", "1")),
+                        help="Number of worker processes")
+    parser.add_argument("--threads", type=int, default=int(os.getenv("MODEL_NUM_THREADS", "0")),
+                        help="Inference threads per worker (default: cores // workers)")
+    parser.add_argument("--min-uptime", type=float, default=float(os.getenv("WORKER_MIN_UPTIME_SECONDS", "10")),
+                        help="Workers dying sooner than this many seconds after their start count as fast failures")
+    parser.add_argument("--max-fast-failures", type=int, default=int(os.getenv("WORKER_MAX_FAST_FAILURES", "5")),
+                        help="Exit with status 1 after this many fast failures in a row")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    threads = args.threads or threads_per_worker(args.workers)
+    limit_threads(threads)
+    metrics_dir = None
+    if args.workers > 1 and "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="prometheus_")
+
+    sock = bind_socket(args.host, args.port)
+    module_name, app_name = args.app.split(":")
+    module = importlib.import_module(module_name)
+    app = getattr(module, app_name)
+
+    model_path = getattr(module, "MODEL_PATH", None)
+    model_mapping = map_model(model_path)
+    if model_mapping is not None:
+        print(f"📦 Mapped {model_path} ({len(model_mapping) / 2**20:.1f} MiB), shared by the workers.")
+    elif getattr(module, "SERVING_MODE", None) == "full":
+        # Keras, SavedModel and MLflow models: import TensorFlow once so the workers share its pages
+        import tensorflow  # noqa: F401
+    print(f"🚀 Serving {args.app} on {args.host}:{args.port} with {args.workers} workers x {threads} threads.")
+    server = PreforkServer(app, sock, args.workers, log_level=args.log_level, min_uptime_seconds=args.min_uptime,
+                           max_fast_failures=args.max_fast_failures)
+    try:
+        return server.run()
+    finally:
+        # The metric files of the workers are only meaningful to this launcher
+        if metrics_dir is not None:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
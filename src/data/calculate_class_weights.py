@@ -1,9 +1,11 @@
 import numpy as np
 import os
 
-def calculate_class_weights(y_train_path, output_path, smooth_factor=1e-6):
-    # Load the training labels
+def calculate_class_weights(y_train_path, output_path, smooth_factor=1e-6, indices_path=None):
+    # Load the training labels (the rows listed in indices_path when the labels cover the whole dataset)
     Y_train = np.load(y_train_path)
+    if indices_path is not None:
+        Y_train = Y_train[np.load(indices_path)]
 
     # Count occurrences of each class
     unique_classes, class_counts = np.unique(Y_train, return_counts=True)
@@ -24,7 +26,8 @@ def calculate_class_weights(y_train_path, output_path, smooth_factor=1e-6):
     print("Class Weights Dictionary: ", class_weights_dict_manual)
 
 if __name__ == "__main__":
-    y_train_path = "data/processed/Y_train.npy"  # Path to the training labels
+    y_train_path = "data/processed/labels.npy"  # Path to the labels of the whole dataset
+    indices_path = "data/processed/train_idx.npy"  # Rows of the training set
     output_path = "data/processed/class_weights.npy"  # Path to save the class weights
 
-    calculate_class_weights(y_train_path, output_path)
+    calculate_class_weights(y_train_path, output_path, indices_path=indices_path)
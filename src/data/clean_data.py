@@ -1,47 +1,65 @@
 '''
-To further clean the dataset, we remove common stopwords and specific unwanted symbols or suffixes. 
-Stopwords are words that carry little meaning, such as 'and', 'the', or 'of', which can add noise to the model training process. 
+To further clean the dataset, we remove common stopwords and specific unwanted symbols or suffixes.
+Stopwords are words that carry little meaning, such as 'and', 'the', or 'of', which can add noise to the model training process.
 Additionally, certain symbols or suffixes are removed to make the data more consistent and useful for training.
 
 Steps:
-1. Download Stopwords:
-Use NLTK to download the standard list of English stopwords, which are words that are generally not useful for model training.
+1. Load Stopwords:
+Use the standard list of English stopwords (the NLTK list, bundled in src/data/stopwords.py so nothing is downloaded at run time).
 2. Remove Specific Unwanted Transcriptions:
-Update the set of stopwords with specific unwanted symbols, such as ')', ':', '...', and "'s", to further clean the dataset.
+Extend the set of stopwords with specific unwanted symbols, such as ')', ':', '...', and "'s", to further clean the dataset.
 3. Filter Out Unwanted Transcriptions:
 Remove all transcriptions from the dataset that match any of the stopwords or unwanted symbols. This step helps ensure that only meaningful transcriptions are retained.
 '''
 
 import pandas as pd
-import nltk
-from nltk.corpus import stopwords
+from src.data.stopwords import STOP_WORDS
+from src.data.table_io import read_table, write_table
 
-# Download stopwords list from NLTK
-nltk.download('stopwords')
+def remove_stopwords(df, stop_words=STOP_WORDS):
+    """
+    Remove the rows whose transcription is a stopword or an unwanted symbol.
 
-# Create a set of English stopwords
-stop_words = set(stopwords.words('english'))
+    Parameters:
+        df (pd.DataFrame): Table with a 'transcription' column.
+        stop_words (set): Transcriptions to remove.
 
-# Remove specific unwanted transcriptions by adding symbols to the stopwords set
-stop_words.update([')', ':', '...', "'s"])  # Adding symbols and suffixes to the stopwords set for further cleaning
+    Returns:
+        pd.DataFrame: The cleaned table with a clean, continuous index.
+    """
+    # Filter out transcriptions that are in the stopwords list
+    df_cleaned = df[~df['transcription'].isin(stop_words)].copy()
 
-# Read the input CSV file
-input_file = 'data/processed/filtered_data.csv'
-df_filtered = pd.read_csv(input_file)
+    # Columnar tables store transcriptions as categoricals: drop the categories that were removed
+    if isinstance(df_cleaned['transcription'].dtype, pd.CategoricalDtype):
+        df_cleaned['transcription'] = df_cleaned['transcription'].cat.remove_unused_categories()
 
-# Filter out transcriptions that are in the stopwords list
-df_cleaned = df_filtered[~df_filtered['transcription'].isin(stop_words)].copy()  # Remove transcriptions that match stopwords
+    # Reset index after filtering to ensure a clean, continuous index
+    df_cleaned.reset_index(drop=True, inplace=True)
+    return df_cleaned
 
-# Reset index after filtering to ensure a clean, continuous index
-df_cleaned.reset_index(drop=True, inplace=True)
+def clean_data(input_file, output_file, stop_words=STOP_WORDS):
+    """
+    Removes stopwords and unwanted symbols from the filtered dataset.
 
-# Output the cleaned data to a new CSV file
-output_file = 'data/processed/cleaned_data.csv'
-df_cleaned.to_csv(output_file, index=False)
-print('Successfully cleaned data and saved to', output_file)
+    Parameters:
+        input_file (str): Path to the filtered table (.parquet, .arrow or .csv).
+        output_file (str): Path to save the cleaned table (.parquet, .arrow or .csv).
+        stop_words (set): Transcriptions to remove.
+    """
+    df_cleaned = remove_stopwords(read_table(input_file), stop_words)
 
-# Print the number of unique transcriptions remaining in the cleaned dataset
-print('Number of remained unique values: ', df_cleaned['transcription'].nunique())  # Display the count of unique values to verify filtering
+    # Output the cleaned data to a new table
+    write_table(df_cleaned, output_file)
+    print('Successfully cleaned data and saved to', output_file)
 
-# Print the unique transcriptions remaining in the dataset
-print('Remained unique values: ', df_cleaned['transcription'].unique())  # Display the remaining unique transcriptions for verification
\ No newline at end of file
+    # Print the number of unique transcriptions remaining in the cleaned dataset
+    print('Number of remained unique values: ', df_cleaned['transcription'].nunique())  # Display the count of unique values to verify filtering
+
+    # Print the unique transcriptions remaining in the dataset
+    print('Remained unique values: ', df_cleaned['transcription'].unique())  # Display the remaining unique transcriptions for verification
+
+if __name__ == "__main__":
+    input_file = 'data/processed/filtered_data.parquet'
+    output_file = 'data/processed/cleaned_data.parquet'
+    clean_data(input_file, output_file)
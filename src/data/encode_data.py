@@ -1,28 +1,44 @@
 '''
-To use categorical data such as transcriptions in a machine learning model, we need to convert them into a numerical format. 
-In this step, we use LabelEncoder to transform each unique transcription into a unique integer label. This encoded format makes 
-the labels usable in the deep learning model.
+To use categorical data such as transcriptions in a machine learning model, we need to convert them into a numerical format.
+In this step, each unique transcription is transformed into a unique integer label, the same labels as scikit-learn's
+LabelEncoder (classes sorted, numbered from 0). This encoded format makes the labels usable in the deep learning model.
 '''
 
-import pandas as pd
-from sklearn.preprocessing import LabelEncoder
+import numpy as np
+from src.data.table_io import read_table, write_table
 
-# Read the input CSV file
-input_file = 'data/processed/cleaned_data.csv'
-df_cleaned = pd.read_csv(input_file)
+def encode_labels(df):
+    """
+    Add a 'transcription_encoded' column with the integer label of each transcription.
 
-# Initialize the LabelEncoder
-le = LabelEncoder()
+    Parameters:
+        df (pd.DataFrame): Table with a 'transcription' column, modified in place.
 
-# Encode the transcriptions and add to the DataFrame
-df_cleaned['transcription_encoded'] = le.fit_transform(
-    df_cleaned['transcription'])
+    Returns:
+        tuple: (df, transcription_mapping) where the mapping goes from transcription to encoded label.
+    """
+    classes, encoded = np.unique(df['transcription'].astype(str).to_numpy(), return_inverse=True)
+    df['transcription_encoded'] = encoded.astype(np.int64)
 
-# Create a mapping between transcriptions and their encoded labels
-transcription_mapping = dict(zip(le.classes_, le.transform(le.classes_)))
+    # Create a mapping between transcriptions and their encoded labels
+    transcription_mapping = {transcription: label for label, transcription in enumerate(classes)}
+    return df, transcription_mapping
 
-# Output the encoded data to a new CSV file
-output_file = 'data/processed/encoded_data.csv'
-df_cleaned.to_csv(output_file, index=False)
+def encode_data(input_file, output_file):
+    """
+    Encodes the transcriptions of the cleaned dataset as integer labels.
 
-print('Successfully encoded data and saved to', output_file)
+    Parameters:
+        input_file (str): Path to the cleaned table (.parquet, .arrow or .csv).
+        output_file (str): Path to save the encoded table (.parquet, .arrow or .csv).
+    """
+    df_encoded, _ = encode_labels(read_table(input_file))
+
+    # Output the encoded data to a new table
+    write_table(df_encoded, output_file)
+    print('Successfully encoded data and saved to', output_file)
+
+if __name__ == "__main__":
+    input_file = 'data/processed/cleaned_data.parquet'
+    output_file = 'data/processed/encoded_data.parquet'
+    encode_data(input_file, output_file)
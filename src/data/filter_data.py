@@ -9,30 +9,51 @@ Transcriptions that occur either too frequently or too rarely can lead to imbala
 '''
 
 import pandas as pd
+from src.data.table_io import read_table, write_table
 
-def filter_data(input_file, output_file, min_samples, max_samples):
+# Frequency range of the transcriptions kept for training
+MIN_SAMPLES = 100
+MAX_SAMPLES = 200
+
+def filter_transcriptions(df, min_samples, max_samples):
     """
-    Filters the dataset based on the frequency of transcriptions.
+    Keep only the transcriptions whose number of occurrences lies in [min_samples, max_samples].
 
     Parameters:
-        input_file (str): Path to the input CSV file.
-        output_file (str): Path to save the filtered CSV file.
+        df (pd.DataFrame): Table with a 'transcription' column.
         min_samples (int): Minimum number of occurrences for a transcription to be kept.
         max_samples (int): Maximum number of occurrences for a transcription to be kept.
-    """
-    # Read the input CSV file
-    df = pd.read_csv(input_file)
 
+    Returns:
+        pd.DataFrame: The filtered table with a clean, continuous index.
+    """
     # Filter transcriptions based on the specified count thresholds
     class_counts = df['transcription'].value_counts()
     classes_to_keep = class_counts[(class_counts >= min_samples) & (class_counts <= max_samples)].index
     df_filtered = df[df['transcription'].isin(classes_to_keep)].copy()
 
+    # Columnar tables store transcriptions as categoricals: drop the categories that were filtered out
+    if isinstance(df_filtered['transcription'].dtype, pd.CategoricalDtype):
+        df_filtered['transcription'] = df_filtered['transcription'].cat.remove_unused_categories()
+
     # Reset index after filtering to ensure a clean, continuous index
     df_filtered.reset_index(drop=True, inplace=True)
+    return df_filtered
+
+def filter_data(input_file, output_file, min_samples, max_samples):
+    """
+    Filters the dataset based on the frequency of transcriptions.
+
+    Parameters:
+        input_file (str): Path to the input table (.parquet, .arrow or .csv).
+        output_file (str): Path to save the filtered table (.parquet, .arrow or .csv).
+        min_samples (int): Minimum number of occurrences for a transcription to be kept.
+        max_samples (int): Maximum number of occurrences for a transcription to be kept.
+    """
+    df_filtered = filter_transcriptions(read_table(input_file), min_samples, max_samples)
 
-    # Output the filtered data to a new CSV file
-    df_filtered.to_csv(output_file, index=False)
+    # Output the filtered data to a new table
+    write_table(df_filtered, output_file)
 
     # Print unique transcriptions remaining in the filtered dataset
     print("Successfully filtered data and saved to", output_file)
@@ -40,8 +61,8 @@ def filter_data(input_file, output_file, min_samples, max_samples):
     print(df_filtered['transcription'].unique())
 
 if __name__ == "__main__":
-    input_file = 'data/raw/words.csv'
-    output_file = 'data/processed/filtered_data.csv'
-    min_samples = 100
-    max_samples = 200
+    input_file = 'data/raw/words.parquet'
+    output_file = 'data/processed/filtered_data.parquet'
+    min_samples = MIN_SAMPLES
+    max_samples = MAX_SAMPLES
     filter_data(input_file, output_file, min_samples, max_samples)
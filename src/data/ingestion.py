@@ -1,16 +1,32 @@
 # src/data/ingestion.py
-from fastapi import FastAPI
-import subprocess
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+from src.pipeline.jobs import JobManager, PipelineBusyError
 
 app = FastAPI(title="Ingestion Service")
 
-@app.get("/ingest")
-def run_ingestion():
+# The DVC pipeline is run as a background job so requests return immediately.
+# The stage list mirrors dvc.yaml up to the target stage and is only used to report progress.
+ingestion_jobs = JobManager(
+    pipeline="ingestion",
+    command=["dvc", "repro", "calculate_class_weights"],
+    stages=[
+        "extract_data", "load_dataset", "preprocess_tables", "prepare_features",
+        "split_data", "calculate_class_weights",
+    ],
+)
+
+@app.post("/jobs", status_code=202)
+def start_ingestion():
     try:
-        # You can call the DVC pipeline command here (or call a Python function)
-        # For example, using subprocess to call "dvc repro one_hot_encode_labels"
-        result = subprocess.run(["dvc", "repro", "one_hot_encode_labels"],
-                                capture_output=True, text=True, check=True)
-        return {"status": "success", "output": result.stdout}
-    except subprocess.CalledProcessError as e:
-        return {"status": "error", "error": e.stderr}
+        job = ingestion_jobs.submit()
+    except PipelineBusyError as e:
+        return JSONResponse(status_code=409, content={"error": str(e), "job": e.job.to_dict()})
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}")
+def get_ingestion_job(job_id: str):
+    job = ingestion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job.to_dict()
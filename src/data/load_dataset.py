@@ -2,48 +2,84 @@
 In this section, we load the handwritten text dataset from a specified directory and create a structured dataset that combines image paths with their corresponding transcription labels. We also verify the availability of image files to filter out corrupted or missing entries.
 
 - Dataset Path: We define the root path to the image dataset.
-- Word Transcriptions: We read the words.txt file, which contains metadata about the handwritten samples, including file names and corresponding transcriptions.
-- Data Integrity Check: We ensure that all referenced images exist and are not corrupted. Invalid entries are counted.
+- Image Index: We walk the words/ tree once with os.scandir and record the size of every PNG, instead of checking each referenced file separately.
+- Word Transcriptions: We stream the words.txt file, which contains metadata about the handwritten samples, including file names and corresponding transcriptions.
+- Data Integrity Check: We join the metadata against the image index to keep only images that exist and are not empty. Invalid entries are counted.
 '''
 
 import os
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
+from src.data.table_io import write_table
 
-def load_images(base_path, words_path):
-    data = []
-    inexistent_or_corrupted = 0
+COLUMNS = ['line_id', 'result', 'graylevel', 'x', 'y', 'w', 'h', 'annotation', 'transcription', 'image_path']
+NUMERIC_COLUMNS = ['graylevel', 'x', 'y', 'w', 'h']
+
+def index_images(base_path):
+    """
+    Walk the words/ tree (base_path/<form>/<form-line>/<word_id>.png) once and index every PNG.
+
+    Returns:
+        dict: word_id -> (image path, size in bytes) for files stored where words.txt expects them.
+    """
+    index = {}
+    with os.scandir(base_path) as level1:
+        for folder1 in level1:
+            if not folder1.is_dir():
+                continue
+            with os.scandir(folder1.path) as level2:
+                for folder2 in level2:
+                    if not folder2.is_dir() or not folder2.name.startswith(folder1.name + '-'):
+                        continue
+                    with os.scandir(folder2.path) as files:
+                        for entry in files:
+                            name = entry.name
+                            if name.endswith('.png') and name.startswith(folder2.name + '-') and entry.is_file():
+                                index[name[:-4]] = (entry.path, entry.stat().st_size)
+    return index
 
-    # Read words from the specified text file
+def parse_words(words_path):
+    """
+    Stream words.txt and split each metadata line once.
+
+    Returns:
+        pd.DataFrame: The metadata columns (without image_path), numeric columns as integers.
+    """
+    rows = []
     with open(words_path, "r") as f:
-        words = f.readlines()
-
-    # Iterate through each line in the words file
-    for line in tqdm(words):
-        if line.startswith("#"):
-            continue  # Skip comment lines
-        parts = line.strip().split()
-
-        # Extract fixed parts and transcription
-        fixed_part = parts[:8]
-        transcription_part = ' '.join(parts[8:])
-
-        # Derive folder and file names from the first part of the line
-        line_split = line.split(" ")
-        folder_parts = line_split[0].split('-')
-        folder1 = folder_parts[0]
-        folder2 = folder_parts[0] + '-' + folder_parts[1]
-        file_name = line_split[0] + ".png"
-        rel_path = os.path.join(base_path, folder1, folder2, file_name)
-
-        # Check if the image file exists and is not empty
-        if os.path.exists(rel_path) and os.path.getsize(rel_path) > 0:
-            data.append(fixed_part + [transcription_part, rel_path])
-        else:
-            inexistent_or_corrupted += 1
+        for line in tqdm(f, desc="Parsing words"):
+            if line.startswith("#"):
+                continue  # Skip comment lines
+            parts = line.split(None, 8)
+            if len(parts) < 8:
+                continue  # Skip empty or malformed lines
+            # The transcription is everything after the eight fixed fields
+            transcription = ' '.join(parts[8].split()) if len(parts) == 9 else ''
+            rows.append(parts[:8] + [transcription])
+
+    df = pd.DataFrame(rows, columns=COLUMNS[:-1])
+    df[NUMERIC_COLUMNS] = df[NUMERIC_COLUMNS].astype(np.int32)
+    df['result'] = df['result'].astype('category')
+    df['annotation'] = df['annotation'].astype('category')
+    return df
+
+def load_images(base_path, words_path):
+    # Index the image files once, then join the metadata against the index
+    index = index_images(base_path) if os.path.isdir(base_path) else {}
+    df = parse_words(words_path)
+
+    paths = pd.Series({word_id: path for word_id, (path, _) in index.items()}, dtype=object)
+    sizes = pd.Series({word_id: size for word_id, (_, size) in index.items()}, dtype=np.int64)
+
+    # Keep only the entries whose image file exists and is not empty
+    valid = df['line_id'].map(sizes).fillna(0).to_numpy() > 0
+    inexistent_or_corrupted = int((~valid).sum())
+    df = df[valid].reset_index(drop=True)
+    df['image_path'] = df['line_id'].map(paths)
 
     print('Inexistent or corrupted files:', inexistent_or_corrupted)
-    return pd.DataFrame(data, columns=['line_id', 'result', 'graylevel', 'x', 'y', 'w', 'h', 'annotation', 'transcription', 'image_path'])
+    return df[COLUMNS]
 
 if __name__ == "__main__":
     # Define paths
@@ -53,8 +89,7 @@ if __name__ == "__main__":
     # Load images and create DataFrame
     df = load_images(dataset_path, words_file_path)
 
-    # Save the DataFrame to a CSV file
-    output_csv_path = 'data/raw/words.csv'
-    os.makedirs(os.path.dirname(output_csv_path), exist_ok=True)  # Create the directory if it doesn't exist
-    df.to_csv(output_csv_path, index=False)  # Save the DataFrame to CSV without the index
-    print(f'Data saved to {output_csv_path}')
+    # Save the DataFrame as a Parquet table (the directory is created if it doesn't exist)
+    output_path = 'data/raw/words.parquet'
+    write_table(df, output_path)
+    print(f'Data saved to {output_path}')
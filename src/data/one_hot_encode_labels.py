@@ -6,10 +6,15 @@ os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'  # Suppress INFO and WARNING logs
 import numpy as np
 from tensorflow.keras.utils import to_categorical
 
-def one_hot_encode_labels(y_train_path, y_test_path, output_train_path, output_test_path):
-    # Load the training and testing labels
+def one_hot_encode_labels(y_train_path, y_test_path, output_train_path, output_test_path,
+                          train_indices_path=None, test_indices_path=None):
+    # Load the training and testing labels (the rows listed in the index files when given)
     Y_train = np.load(y_train_path)
     Y_test = np.load(y_test_path)
+    if train_indices_path is not None:
+        Y_train = Y_train[np.load(train_indices_path)]
+    if test_indices_path is not None:
+        Y_test = Y_test[np.load(test_indices_path)]
 
     # Determine the number of unique classes
     num_classes = max(len(np.unique(Y_train)), len(np.unique(Y_test)))
@@ -29,9 +34,11 @@ def one_hot_encode_labels(y_train_path, y_test_path, output_train_path, output_t
     print("Number of unique classes in Y_train:", len(np.unique(Y_train)))
 
 if __name__ == "__main__":
-    y_train_path = "data/processed/Y_train.npy"  # Path to the training labels
-    y_test_path = "data/processed/Y_test.npy"  # Path to the testing labels
+    labels_path = "data/processed/labels.npy"  # Path to the labels of the whole dataset
+    train_indices_path = "data/processed/train_idx.npy"  # Rows of the training set
+    test_indices_path = "data/processed/test_idx.npy"  # Rows of the testing set
     output_train_path = "data/processed/y_train_one_hot.npy"  # Path to save one-hot encoded training labels
     output_test_path = "data/processed/y_test_one_hot.npy"  # Path to save one-hot encoded testing labels
 
-    one_hot_encode_labels(y_train_path, y_test_path, output_train_path, output_test_path)
+    one_hot_encode_labels(labels_path, labels_path, output_train_path, output_test_path,
+                          train_indices_path=train_indices_path, test_indices_path=test_indices_path)
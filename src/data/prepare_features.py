@@ -1,53 +1,81 @@
+import argparse
 import numpy as np
 import pandas as pd
-from PIL import Image
 import os
+from src.data.preprocessing import decode_batch_parallel
+from src.data.table_io import read_table
 
-def prepare_features(input_file, output_features_file, output_labels_file, width=28, height=28):
+def prepare_features(input_file, output_features_file, output_labels_file, width=28, height=28,
+                     workers=None, chunk_size=256, use_processes=False, error_report_file=None):
     """
     Prepares input features (X) and labels (Y) for training a CNN.
     
     Args:
-    - input_file (str): Path to the input CSV file with image paths and encoded labels.
-    - output_features_file (str): Path to save the numpy array of features (X).
+    - input_file (str): Path to the input table (.parquet, .arrow or .csv) with image paths and encoded labels.
+    - output_features_file (str): Path to save the numpy array of features (X), raw uint8 pixels of shape (N, height, width, 1).
     - output_labels_file (str): Path to save the numpy array of labels (Y).
     - width (int): Target width of the resized images.
     - height (int): Target height of the resized images.
+    - workers (int): Number of parallel decoding workers (defaults to the number of CPUs).
+    - chunk_size (int): Number of images handed to a worker at a time.
+    - use_processes (bool): Decode with a process pool instead of a thread pool.
+    - error_report_file (str): Optional CSV listing the images that could not be processed.
     """
-    # Load the filtered DataFrame
-    df_filtered = pd.read_csv(input_file)
-
-    X, Y = [], []
-
-    # Loop through each row to process images
-    for _, row in df_filtered.iterrows():
-        try:
-            # Open image, convert to grayscale, and resize
-            image = Image.open(row['image_path']).convert('L').resize((width, height))
-            X.append(np.array(image))
-            Y.append(row['transcription_encoded'])
-        except Exception as e:
-            print(f"Error processing image {row['image_path']}: {e}")
-
-    # Normalize image data and convert to numpy arrays
-    X = np.array(X) / 255.0  # Normalize to range [0, 1]
-    Y = np.array(Y)
-
-    # Save the arrays as .npy files
+    # Load only the columns needed from the filtered DataFrame
+    df_filtered = read_table(input_file, columns=['image_path', 'transcription_encoded'])
+
+    image_paths = df_filtered['image_path'].tolist()
+
+    # Decode every image (grayscale + resize) in parallel, straight into one preallocated uint8 buffer
+    pixels, failures = decode_batch_parallel(
+        image_paths, width=width, height=height,
+        workers=workers, chunk_size=chunk_size, use_processes=use_processes,
+    )
+
+    # Collect the rows whose image could not be decoded into a side report and drop them
+    errors = pd.DataFrame(
+        [(index, image_paths[index], error) for index, error in failures],
+        columns=['row', 'image_path', 'error'],
+    )
+    if error_report_file:
+        os.makedirs(os.path.dirname(error_report_file) or '.', exist_ok=True)
+        errors.to_csv(error_report_file, index=False)
+    valid = np.ones(len(image_paths), dtype=bool)
+    valid[errors['row'].to_numpy(dtype=int)] = False
+
+    # Keep the raw uint8 pixels: normalization to [0, 1] happens batch by batch in the input pipeline,
+    # which keeps the feature store 4x smaller than float32 and lets readers memory-map it.
+    # The channel axis expected by the CNN is added here so that no later stage has to rewrite the file.
+    X = np.ascontiguousarray(pixels[valid])[..., np.newaxis]
+    Y = df_filtered['transcription_encoded'].to_numpy()[valid]
+
+    # Save the arrays as .npy files (loadable lazily with np.load(..., mmap_mode='r'))
     np.save(output_features_file, X)
     np.save(output_labels_file, Y)
 
     print(f"Features (X) saved to {output_features_file}")
     print(f"Labels (Y) saved to {output_labels_file}")
-    print(f"Min pixel value in X: {X.min():.3f}, Max pixel value in X: {X.max():.3f}")
+    print(f"Images that could not be processed: {len(errors)}" + (f" (see {error_report_file})" if error_report_file else ""))
+    print(f"Min pixel value in X: {X.min()}, Max pixel value in X: {X.max()} ({X.dtype}, {X.nbytes / 1e6:.1f} MB)")
     print(f"X and Y have the same length: {len(X) == len(Y)}")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prepare CNN input features and labels from the encoded dataset.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of decoding workers (default: number of CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Images per work item")
+    parser.add_argument("--processes", action="store_true", help="Use a process pool instead of a thread pool")
+    args = parser.parse_args()
+
     # File paths
-    input_file = "data/processed/encoded_data.csv"  # Input CSV with filtered data
+    input_file = "data/processed/encoded_data.parquet"  # Input table with encoded data
     output_features_file = "data/processed/features.npy"  # Output numpy file for features
     output_labels_file = "data/processed/labels.npy"  # Output numpy file for labels
+    error_report_file = "data/processed/feature_errors.csv"  # Images that could not be processed
 
     # Call the function
-    prepare_features(input_file, output_features_file, output_labels_file)
+    prepare_features(
+        input_file, output_features_file, output_labels_file,
+        workers=args.workers, chunk_size=args.chunk_size, use_processes=args.processes,
+        error_report_file=error_report_file,
+    )
@@ -1,26 +1,83 @@
+'''
+Split the dataset into training and testing sets.
+
+Only the row indices of each set are saved: training and evaluation read their rows straight from the
+single memory-mapped features.npy (already in NHWC shape), so no copy of the features is ever written.
+The split is stratified on the labels and fully determined by the seed, which is recorded together with
+the sizes and the SHA-256 of the labels in a small JSON manifest.
+'''
+
+import hashlib
+import json
+import os
+
 import numpy as np
 from sklearn.model_selection import train_test_split
 
-# Load preprocessed features and labels
-features_path = "data/processed/features.npy"
-labels_path = "data/processed/labels.npy"
-
-X = np.load(features_path)
-Y = np.load(labels_path)
-
-# Split the dataset into training and testing sets
-X_train, X_test, Y_train, Y_test = train_test_split(
-    X, Y,
-    test_size=0.2,  # 20% of the data will be used for testing
-    random_state=42,  # Set random seed for reproducibility
-    stratify=Y  # Ensure class distribution remains balanced between train and test sets
-)
-
-# Save the split datasets
-np.save("data/processed/X_train.npy", X_train)
-np.save("data/processed/X_test.npy", X_test)
-np.save("data/processed/Y_train.npy", Y_train)
-np.save("data/processed/Y_test.npy", Y_test)
-
-print("Data successfully split into training and testing sets.")
-print(f"Training set: {X_train.shape[0]} samples, Testing set: {X_test.shape[0]} samples")
+def split_indices(labels, test_size=0.2, seed=42):
+    """
+    Compute a stratified train/test split of the row indices.
+
+    Parameters:
+        labels (np.ndarray): Encoded label of every row.
+        test_size (float): Fraction of the rows used for testing.
+        seed (int): Random seed of the split.
+
+    Returns:
+        tuple: (train_idx, test_idx), each sorted so that rows are read in file order.
+    """
+    train_idx, test_idx = train_test_split(
+        np.arange(len(labels)),
+        test_size=test_size,
+        random_state=seed,  # Set random seed for reproducibility
+        stratify=labels  # Ensure class distribution remains balanced between train and test sets
+    )
+    return np.sort(train_idx), np.sort(test_idx)
+
+def split_data(features_path, labels_path, output_dir, test_size=0.2, seed=42):
+    """
+    Save the stratified train/test row indices and the split manifest.
+
+    Parameters:
+        features_path (str): Path to the features (only its shape is read, for the manifest).
+        labels_path (str): Path to the encoded labels.
+        output_dir (str): Directory receiving train_idx.npy, test_idx.npy and split_manifest.json.
+        test_size (float): Fraction of the rows used for testing.
+        seed (int): Random seed of the split.
+    """
+    Y = np.load(labels_path)
+    X = np.load(features_path, mmap_mode="r")  # Only the header is read
+    if len(X) != len(Y):
+        raise ValueError(f"{features_path} has {len(X)} rows but {labels_path} has {len(Y)} labels")
+
+    train_idx, test_idx = split_indices(Y, test_size, seed)
+
+    os.makedirs(output_dir, exist_ok=True)
+    np.save(os.path.join(output_dir, "train_idx.npy"), train_idx)
+    np.save(os.path.join(output_dir, "test_idx.npy"), test_idx)
+
+    with open(labels_path, "rb") as f:
+        labels_sha256 = hashlib.sha256(f.read()).hexdigest()
+    manifest = {
+        "seed": seed,
+        "test_size": test_size,
+        "stratified": True,
+        "features": features_path,
+        "feature_shape": list(X.shape),
+        "labels": labels_path,
+        "labels_sha256": labels_sha256,
+        "n_train": int(len(train_idx)),
+        "n_test": int(len(test_idx)),
+    }
+    with open(os.path.join(output_dir, "split_manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    print("Data successfully split into training and testing sets.")
+    print(f"Training set: {len(train_idx)} samples, Testing set: {len(test_idx)} samples")
+
+if __name__ == "__main__":
+    features_path = "data/processed/features.npy"
+    labels_path = "data/processed/labels.npy"
+    output_dir = "data/processed"
+
+    split_data(features_path, labels_path, output_dir, test_size=0.2, seed=42)
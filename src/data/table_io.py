@@ -0,0 +1,74 @@
+'''
+Reading and writing the intermediate tables of the data pipeline (words -> filtered -> cleaned -> encoded).
+
+The format is chosen from the file extension:
+- .parquet: columnar Parquet, the default for the DVC stages. Dtypes survive the round trip
+  (integers stay integers), text columns with few distinct values such as the transcription are stored
+  as categoricals, and readers can load only the columns they need.
+- .arrow / .feather: Arrow IPC, uncompressed and memory-mappable, useful for fast local iterations.
+- .csv: plain CSV, kept for compatibility and for inspecting tables by hand.
+'''
+
+import os
+
+import pandas as pd
+
+# Columns stored as categoricals in the columnar formats
+CATEGORICAL_COLUMNS = ('transcription', 'result', 'annotation')
+
+
+def table_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.parquet':
+        return 'parquet'
+    if extension in ('.arrow', '.feather'):
+        return 'arrow'
+    if extension == '.csv':
+        return 'csv'
+    raise ValueError(f"Unsupported table format for {path}, expected .parquet, .arrow, .feather or .csv")
+
+
+def read_table(path, columns=None):
+    """
+    Read an intermediate table.
+
+    Parameters:
+        path (str): Path to a .parquet, .arrow/.feather or .csv file.
+        columns (list): Optional subset of columns to read; columnar formats skip the others entirely.
+
+    Returns:
+        pd.DataFrame: The table.
+    """
+    fmt = table_format(path)
+    if fmt == 'parquet':
+        return pd.read_parquet(path, columns=columns)
+    if fmt == 'arrow':
+        return pd.read_feather(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+def write_table(df, path):
+    """
+    Write an intermediate table, storing low-cardinality text columns as categoricals in columnar formats.
+
+    Parameters:
+        df (pd.DataFrame): Table to write; its index is not saved.
+        path (str): Destination .parquet, .arrow/.feather or .csv file.
+    """
+    fmt = table_format(path)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    if fmt == 'csv':
+        df.to_csv(path, index=False)
+        return
+
+    df = df.reset_index(drop=True)
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns and df[column].dtype == object:
+            df[column] = df[column].astype('category')
+    # Filtering keeps the categories of dropped rows around, don't store them
+    for column in df.select_dtypes('category').columns:
+        df[column] = df[column].cat.remove_unused_categories()
+    if fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_feather(path)
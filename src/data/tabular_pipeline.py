@@ -0,0 +1,75 @@
+'''
+Fused tabular preprocessing: frequency filtering, stopword removal and label encoding in one pass.
+
+Running filter_data, clean_data and encode_data as three stages means three interpreters importing pandas,
+and three reads and writes of the same table. Here the words table is read once, the three steps are applied
+in memory with the same functions the individual scripts use, and the encoded table is written once.
+The intermediate tables (filtered_data, cleaned_data) are only written when requested, which the DVC
+stage does so that their outputs stay available to the other stages and to the tests.
+'''
+
+import argparse
+
+from src.data.clean_data import remove_stopwords
+from src.data.encode_data import encode_labels
+from src.data.filter_data import MAX_SAMPLES, MIN_SAMPLES, filter_transcriptions
+from src.data.stopwords import STOP_WORDS
+from src.data.table_io import read_table, write_table
+
+def run_tabular_pipeline(input_file, output_file, min_samples=MIN_SAMPLES, max_samples=MAX_SAMPLES,
+                         stop_words=STOP_WORDS, filtered_file=None, cleaned_file=None):
+    """
+    Filter, clean and encode the words table in one pass.
+
+    Parameters:
+        input_file (str): Path to the words table (.parquet, .arrow or .csv).
+        output_file (str): Path to save the encoded table.
+        min_samples (int): Minimum number of occurrences for a transcription to be kept.
+        max_samples (int): Maximum number of occurrences for a transcription to be kept.
+        stop_words (set): Transcriptions to remove.
+        filtered_file (str): Optional path to also save the filtered table.
+        cleaned_file (str): Optional path to also save the cleaned table.
+
+    Returns:
+        dict: Mapping from transcription to encoded label.
+    """
+    df = read_table(input_file)
+
+    df_filtered = filter_transcriptions(df, min_samples, max_samples)
+    if filtered_file:
+        write_table(df_filtered, filtered_file)
+        print('Successfully filtered data and saved to', filtered_file)
+
+    df_cleaned = remove_stopwords(df_filtered, stop_words)
+    if cleaned_file:
+        write_table(df_cleaned, cleaned_file)
+        print('Successfully cleaned data and saved to', cleaned_file)
+
+    # The cleaned table is not used afterwards, encode it in place
+    df_encoded, transcription_mapping = encode_labels(df_cleaned)
+    write_table(df_encoded, output_file)
+    print('Successfully encoded data and saved to', output_file)
+
+    print(f'{len(df)} words -> {len(df_filtered)} after filtering -> {len(df_encoded)} after cleaning, '
+          f'{len(transcription_mapping)} classes')
+    return transcription_mapping
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Filter, clean and encode the words table in one pass.")
+    parser.add_argument("--min-samples", type=int, default=MIN_SAMPLES, help="Minimum occurrences of a kept transcription")
+    parser.add_argument("--max-samples", type=int, default=MAX_SAMPLES, help="Maximum occurrences of a kept transcription")
+    parser.add_argument("--emit-intermediates", action="store_true",
+                        help="Also write the filtered and cleaned tables of the individual stages")
+    args = parser.parse_args()
+
+    # File paths
+    input_file = 'data/raw/words.parquet'
+    filtered_file = 'data/processed/filtered_data.parquet'
+    cleaned_file = 'data/processed/cleaned_data.parquet'
+    output_file = 'data/processed/encoded_data.parquet'
+
+    run_tabular_pipeline(
+        input_file, output_file, args.min_samples, args.max_samples,
+        filtered_file=filtered_file if args.emit_intermediates else None,
+        cleaned_file=cleaned_file if args.emit_intermediates else None,
+    )
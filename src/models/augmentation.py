@@ -0,0 +1,158 @@
+'''
+On-the-fly data augmentation for training.
+
+Instead of materializing augmented copies of the training set on disk (one full copy per augmentation
+factor), random transforms are applied to each batch as it goes through the input pipeline:
+- small rotations and shifts,
+- elastic distortion (a smooth random displacement field),
+- stroke-width jitter (the strokes are made one pixel thicker or thinner).
+
+All transforms of a batch are computed at once with NumPy: the rotation, shift and elastic displacement
+are combined into one sampling grid per image and applied with a single vectorized bilinear lookup.
+The random draws of a batch are seeded from (seed, epoch, batch index), so a given epoch is reproducible
+while every epoch sees different augmentations. The Augmenter is also a Keras callback that keeps track
+of the current epoch.
+'''
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.callbacks import Callback
+
+
+class Augmenter(Callback):
+    def __init__(self, seed=0, max_rotation=10.0, max_shift=0.1, elastic_alpha=1.5, elastic_grid=4,
+                 elastic_probability=0.5, stroke_probability=0.3, dark_ink=True):
+        """
+        Parameters:
+            seed (int): Base seed of the augmentations.
+            max_rotation (float): Maximum rotation in degrees, in both directions.
+            max_shift (float): Maximum shift as a fraction of the image size, in both directions.
+            elastic_alpha (float): Maximum elastic displacement in pixels.
+            elastic_grid (int): Size of the coarse grid of random displacements that is smoothly upsampled.
+            elastic_probability (float): Probability that an image is elastically distorted.
+            stroke_probability (float): Probability that the strokes of an image are thickened or thinned.
+            dark_ink (bool): Whether strokes are darker than the background (grayscale scans of handwriting).
+        """
+        super().__init__()
+        self.seed = seed
+        self.max_rotation = max_rotation
+        self.max_shift = max_shift
+        self.elastic_alpha = elastic_alpha
+        self.elastic_grid = elastic_grid
+        self.elastic_probability = elastic_probability
+        self.stroke_probability = stroke_probability
+        self.dark_ink = dark_ink
+        self.epoch = 0
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.epoch = epoch
+
+    def __call__(self, images, batch_index):
+        """
+        Augment a batch.
+
+        Parameters:
+            images (np.ndarray): float32 batch of shape (N, H, W, 1).
+            batch_index (int): Index of the batch within the epoch, used for seeding.
+
+        Returns:
+            np.ndarray: The augmented batch, same shape and dtype.
+        """
+        rng = np.random.default_rng([self.seed, self.epoch, int(batch_index)])
+        images = np.asarray(images, dtype=np.float32)
+        n, height, width = images.shape[:3]
+        pixels = images.reshape(n, height, width)
+
+        src_y, src_x = self._affine_grid(rng, n, height, width)
+        if self.elastic_alpha > 0 and self.elastic_probability > 0:
+            dy, dx = self._elastic_field(rng, n, height, width)
+            src_y += dy
+            src_x += dx
+        pixels = bilinear_sample(pixels, src_y, src_x)
+
+        if self.stroke_probability > 0:
+            pixels = self._stroke_jitter(rng, pixels)
+        return pixels.reshape(images.shape).astype(np.float32, copy=False)
+
+    def tf_map(self, batch_index, batch):
+        """tf.data map function for `dataset.enumerate()` of (pixels, label) batches."""
+        pixels, label = batch
+        augmented = tf.numpy_function(self, [pixels, batch_index], tf.float32)
+        augmented.set_shape(pixels.shape)
+        return augmented, label
+
+    def _affine_grid(self, rng, n, height, width):
+        # Inverse mapping: for every output pixel, the input position it is sampled from
+        angles = np.deg2rad(rng.uniform(-self.max_rotation, self.max_rotation, n)).astype(np.float32)[:, None, None]
+        shift_y = (rng.uniform(-self.max_shift, self.max_shift, n) * height).astype(np.float32)[:, None, None]
+        shift_x = (rng.uniform(-self.max_shift, self.max_shift, n) * width).astype(np.float32)[:, None, None]
+        center_y, center_x = np.float32((height - 1) / 2.0), np.float32((width - 1) / 2.0)
+        y, x = np.meshgrid(np.arange(height, dtype=np.float32), np.arange(width, dtype=np.float32), indexing="ij")
+        y = y[None] - center_y - shift_y
+        x = x[None] - center_x - shift_x
+        cos, sin = np.cos(angles), np.sin(angles)
+        return cos * y - sin * x + center_y, sin * y + cos * x + center_x
+
+    def _elastic_field(self, rng, n, height, width):
+        # Random displacements on a coarse grid, bilinearly upsampled into a smooth field.
+        # Bilinear upsampling is separable, so it is two small matrix products per field.
+        grid = self.elastic_grid
+        coarse = rng.uniform(-1.0, 1.0, (2, n, grid, grid)).astype(np.float32)
+        coarse *= self.elastic_alpha * (rng.random(n) < self.elastic_probability)[None, :, None, None]
+        field = _upsampling_matrix(height, grid) @ coarse @ _upsampling_matrix(width, grid).T
+        return field[0], field[1]
+
+    def _stroke_jitter(self, rng, pixels):
+        # A 3x3 minimum filter grows dark strokes, a maximum filter shrinks them (the reverse for light ink)
+        choice = rng.random(len(pixels))
+        thicker = choice < self.stroke_probability / 2
+        thinner = (choice >= self.stroke_probability / 2) & (choice < self.stroke_probability)
+        if not thicker.any() and not thinner.any():
+            return pixels
+        darkest, lightest = _min_max_3x3(pixels)
+        grow, shrink = (darkest, lightest) if self.dark_ink else (lightest, darkest)
+        pixels = np.where(thicker[:, None, None], grow, pixels)
+        return np.where(thinner[:, None, None], shrink, pixels)
+
+
+def bilinear_sample(images, src_y, src_x):
+    """
+    Sample a batch of (N, H, W) images at fractional positions, all images at once.
+    Positions outside the image take the value of the nearest edge pixel.
+    """
+    n, height, width = images.shape
+    src_y = np.clip(src_y, 0, height - 1)
+    src_x = np.clip(src_x, 0, width - 1)
+    y0 = np.floor(src_y).astype(np.int64)
+    x0 = np.floor(src_x).astype(np.int64)
+    y1 = np.minimum(y0 + 1, height - 1)
+    x1 = np.minimum(x0 + 1, width - 1)
+    wy = (src_y - y0).astype(np.float32).reshape(n, -1)
+    wx = (src_x - x0).astype(np.float32).reshape(n, -1)
+
+    flat = images.reshape(n, -1)
+
+    def gather(yy, xx):
+        return np.take_along_axis(flat, (yy * width + xx).reshape(n, -1), axis=1)
+
+    top = gather(y0, x0) * (1 - wx) + gather(y0, x1) * wx
+    bottom = gather(y1, x0) * (1 - wx) + gather(y1, x1) * wx
+    return (top * (1 - wy) + bottom * wy).reshape(src_y.shape).astype(images.dtype, copy=False)
+
+
+def _upsampling_matrix(size, grid):
+    # (size, grid) matrix of the linear interpolation weights from `grid` control points to `size` pixels
+    positions = np.linspace(0, grid - 1, size)
+    lower = np.minimum(np.floor(positions).astype(np.int64), grid - 2)
+    weight = positions - lower
+    matrix = np.zeros((size, grid), dtype=np.float32)
+    matrix[np.arange(size), lower] = 1 - weight
+    matrix[np.arange(size), lower + 1] = weight
+    return matrix
+
+
+def _min_max_3x3(pixels):
+    padded = np.pad(pixels, ((0, 0), (1, 1), (1, 1)), mode="edge")
+    height, width = pixels.shape[1:]
+    windows = [padded[:, dy:dy + height, dx:dx + width] for dy in range(3) for dx in range(3)]
+    return np.minimum.reduce(windows), np.maximum.reduce(windows)
@@ -1,35 +1,48 @@
 import os
+import argparse
 import numpy as np
 import pickle
 import dagshub
 import mlflow
 import mlflow.tensorflow
 from tensorflow.keras.models import Model
-from tensorflow.keras.layers import Input, Conv2D, MaxPooling2D, Dropout, Flatten, Dense
+from tensorflow.keras.layers import Input, Dense
 import pandas as pd
 import matplotlib.pyplot as plt
-
-def build_model(input_shape, num_classes):
+from src.data.preprocessing import normalize
+from src.models.augmentation import Augmenter
+from src.models.input_pipeline import (
+    FeatureBatches, InputStallMonitor, load_features, load_image_paths, load_split, make_feature_dataset,
+    make_image_dataset,
+)
+from src.models.model_zoo import ARCHITECTURES, profile_model
+from src.models.training_config import PRECISIONS, ThroughputMonitor, configure_runtime, load_training_config
+
+# Labels are integer class ids ("sparse") by default; "one_hot" trains on one-hot vectors built per batch
+LABEL_MODES = ("sparse", "one_hot")
+LOSSES = {"sparse": "sparse_categorical_crossentropy", "one_hot": "categorical_crossentropy"}
+
+def build_model(input_shape, num_classes, label_mode="sparse", jit_compile=False, architecture="baseline"):
     """
     Build and compile a CNN model.
 
     Parameters:
         input_shape (tuple): Shape of the input data (e.g., (28, 28, 1)).
         num_classes (int): Number of classes for classification.
+        label_mode (str): "sparse" for integer labels, "one_hot" for one-hot encoded labels.
+        jit_compile (bool): Compile the training step with XLA.
+        architecture (str): Name of the architecture in the model zoo (see src/models/model_zoo.py).
 
     Returns:
         model: Compiled CNN model.
     """
     inputs = Input(shape=input_shape)
-    x = Conv2D(32, (5, 5), activation='relu')(inputs)
-    x = MaxPooling2D(pool_size=(2, 2))(x)
-    x = Dropout(0.2)(x)
-    x = Flatten()(x)
-    x = Dense(128, activation='relu')(x)
-    outputs = Dense(num_classes, activation='softmax')(x)
+    x = ARCHITECTURES[architecture](inputs)
+    # The softmax stays in float32 under a mixed precision policy, for numerically stable probabilities
+    outputs = Dense(num_classes, activation='softmax', dtype='float32')(x)
 
-    model = Model(inputs=inputs, outputs=outputs)
-    model.compile(loss='categorical_crossentropy', optimizer='adam', metrics=['accuracy'])
+    model = Model(inputs=inputs, outputs=outputs, name=architecture)
+    model.compile(loss=LOSSES[label_mode], optimizer='adam', metrics=['accuracy'], jit_compile=jit_compile)
 
     return model
 
@@ -62,17 +75,88 @@ def load_callbacks(callback_path):
     return callbacks
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and train the CNN.")
+    parser.add_argument("--label-mode", choices=LABEL_MODES, default="sparse",
+                        help="Train on integer labels (sparse) or on one-hot labels built per batch (one_hot)")
+    parser.add_argument("--input-pipeline", choices=("tf_data", "batches"), default="tf_data",
+                        help="tf.data pipeline with prefetching (tf_data) or the plain batch loader (batches)")
+    parser.add_argument("--source", choices=("features", "images"), default="features",
+                        help="Stream the memory-mapped feature store or decode the image files (tf_data only)")
+    parser.add_argument("--cache", action="store_true",
+                        help="Cache the uint8 samples in memory after the first epoch (always on with --source images)")
+    parser.add_argument("--augment", action="store_true",
+                        help="Augment the training batches on the fly (rotations, shifts, elastic distortion, stroke width)")
+    # Training settings, read from the `train` section of params.yaml unless given here
+    parser.add_argument("--config", default="params.yaml", help="YAML file with the training settings")
+    parser.add_argument("--batch-size", type=int, help="Training batch size")
+    parser.add_argument("--epochs", type=int, help="Maximum number of epochs")
+    parser.add_argument("--intra-op-threads", type=int, help="Threads used inside one operation (0: all cores)")
+    parser.add_argument("--inter-op-threads", type=int, help="Operations run in parallel (0: all cores)")
+    parser.add_argument("--xla", action=argparse.BooleanOptionalAction, default=None,
+                        help="Compile the training step with XLA")
+    parser.add_argument("--precision", choices=PRECISIONS, help="float32 or bfloat16 mixed precision")
+    parser.add_argument("--architecture", choices=sorted(ARCHITECTURES), help="Model zoo architecture")
+    args = parser.parse_args()
+
+    config = load_training_config(args.config, overrides={
+        "batch_size": args.batch_size,
+        "epochs": args.epochs,
+        "intra_op_threads": args.intra_op_threads,
+        "inter_op_threads": args.inter_op_threads,
+        "xla": args.xla,
+        "precision": args.precision,
+        "architecture": args.architecture,
+    })
+    # Thread pools can only be set before TensorFlow runs its first operation
+    precision = configure_runtime(config)
+    batch_size = config["batch_size"]
+
     # Initialize DAGsHub MLflow Connection
     dagshub.init(repo_owner="KazemZh", repo_name="OCR_Handwritting_MLOps", mlflow=True)
 
     # Enable MLflow Autologging for TensorFlow
     mlflow.tensorflow.autolog()
 
-    # Load preprocessed data
-    X_train = np.load("data/processed/X_train_reshaped.npy")
-    y_train = np.load("data/processed/y_train_one_hot.npy")
-    X_test = np.load("data/processed/X_test_reshaped.npy")
-    y_test = np.load("data/processed/y_test_one_hot.npy")
+    # Load preprocessed data: the uint8 features are memory-mapped and normalized batch by batch,
+    # the train and test sets are row indices into the same feature file
+    features = load_features("data/processed/features.npy")
+    train_idx, test_idx = load_split("data/processed")
+    labels = np.load("data/processed/labels.npy")
+    y_train = labels[train_idx]
+    y_test = labels[test_idx]
+
+    # Define input shape and number of classes (labels are encoded as 0..num_classes-1)
+    input_shape = features.shape[1:]
+    num_classes = int(labels.max()) + 1
+
+    # In one_hot mode the integer labels are expanded batch by batch, never stored as a full matrix
+    one_hot_classes = num_classes if args.label_mode == "one_hot" else None
+    # Augmentations are seeded per epoch and batch, the Augmenter is also a callback tracking the epoch
+    augmenter = Augmenter(seed=42) if args.augment else None
+    stall_monitor = None
+    if args.input_pipeline == "batches":
+        train_batches = FeatureBatches(features, y_train, indices=train_idx, batch_size=batch_size, shuffle=True,
+                                       seed=42, one_hot_classes=one_hot_classes, augment=augmenter)
+        test_batches = FeatureBatches(features, y_test, indices=test_idx, batch_size=batch_size,
+                                      one_hot_classes=one_hot_classes)
+    elif args.source == "images":
+        image_paths = load_image_paths("data/processed/encoded_data.parquet", "data/processed/feature_errors.csv")
+        train_batches = make_image_dataset(image_paths[train_idx], y_train, batch_size=batch_size, shuffle=True,
+                                           seed=42, one_hot_classes=one_hot_classes, augment=augmenter)
+        test_batches = make_image_dataset(image_paths[test_idx], y_test, batch_size=batch_size,
+                                          one_hot_classes=one_hot_classes)
+    else:
+        train_batches = make_feature_dataset(features, y_train, indices=train_idx, batch_size=batch_size, shuffle=True,
+                                             seed=42, one_hot_classes=one_hot_classes, cache=args.cache,
+                                             augment=augmenter)
+        test_batches = make_feature_dataset(features, y_test, indices=test_idx, batch_size=batch_size,
+                                            one_hot_classes=one_hot_classes, cache=args.cache)
+    # Report per epoch the training samples/s, to size training nodes
+    throughput_monitor = ThroughputMonitor(len(train_idx))
+    if args.input_pipeline == "tf_data":
+        # Report per epoch how long training waited on the input pipeline
+        stall_monitor = InputStallMonitor()
+        train_batches = stall_monitor.wrap(train_batches)
 
     # Load class weights
     class_weights = np.load("data/processed/class_weights.npy", allow_pickle=True).item()
@@ -80,18 +164,26 @@ if __name__ == "__main__":
     # Load callbacks
     callbacks = load_callbacks("models/callbacks.keras")
 
-    # Define input shape and number of classes
-    input_shape = X_train.shape[1:]
-    num_classes = y_train.shape[1]
-
     mlflow.set_experiment("OCR_CNN_Training")
  
     with mlflow.start_run():  
         # Log training start using `set_tag()`
         mlflow.set_tag("training_status", "started")
+        mlflow.log_param("label_mode", args.label_mode)
+        mlflow.log_param("augment", args.augment)
+        mlflow.log_param("input_pipeline", args.input_pipeline if args.input_pipeline == "batches" else f"tf_data:{args.source}")
+        mlflow.log_params({
+            "train_batch_size": batch_size,
+            "intra_op_threads": config["intra_op_threads"],
+            "inter_op_threads": config["inter_op_threads"],
+            "xla": config["xla"],
+            "precision": precision,
+            "architecture": config["architecture"],
+        })
 
         # Build the model
-        model_cnn = build_model(input_shape, num_classes)
+        model_cnn = build_model(input_shape, num_classes, label_mode=args.label_mode, jit_compile=config["xla"],
+                                architecture=config["architecture"])
 
         # Log model architecture
         model_summary_path = "models/model_architecture_summary.txt"
@@ -100,15 +192,19 @@ if __name__ == "__main__":
 
         # Train the model
         history = model_cnn.fit(
-            X_train,
-            y_train,
-            validation_data=(X_test, y_test),
-            epochs=100,
+            train_batches,
+            validation_data=test_batches,
+            epochs=config["epochs"],
             class_weight=class_weights,
-            callbacks=callbacks,
+            callbacks=callbacks + [callback for callback in (augmenter, stall_monitor, throughput_monitor)
+                                   if callback is not None],
             verbose=1,
         )
 
+        # Log the cost of the architecture (parameters, FLOPs, CPU latency at batch 1 and 64) to compare
+        # it with its accuracy
+        mlflow.log_metrics(profile_model(model_cnn))
+
         # Log training completion using `set_tag()`
         mlflow.set_tag("training_status", "completed")
 
@@ -118,7 +214,7 @@ if __name__ == "__main__":
         print(f"Model training complete. Model saved as {model_path}")
 
         # Log the model in MLflow with input example and signature
-        input_example = X_train[:1]  # Example input for inference
+        input_example = normalize(features[train_idx[:1]])  # Example input for inference, normalized like served images
         mlflow.tensorflow.log_model(
             model_cnn,
             "cnn_model",
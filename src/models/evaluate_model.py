@@ -9,15 +9,16 @@ from sklearn.metrics import classification_report, confusion_matrix
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
+from src.models.input_pipeline import FeatureBatches, load_features, load_split
 
-# Load data and model
-X_test = np.load("data/processed/X_test_reshaped.npy")
-y_test = np.load("data/processed/y_test_one_hot.npy")
+# Load data and model (the uint8 features are memory-mapped, only the test rows are read and normalized)
+features = load_features("data/processed/features.npy")
+_, test_idx = load_split("data/processed")
+y_true = np.load("data/processed/labels.npy")[test_idx]
 model = load_model("models/CNN.keras")
 
 # Get predictions
-y_pred = model.predict(X_test).argmax(axis=1)
-y_true = y_test.argmax(axis=1)
+y_pred = model.predict(FeatureBatches(features, indices=test_idx, batch_size=256)).argmax(axis=1)
 
 # Classification report
 # report = classification_report(y_true, y_pred, output_dict=True)
@@ -0,0 +1,112 @@
+'''
+Export the trained Keras model to graph-optimized artifacts for CPU serving.
+
+- models/CNN_savedmodel/: a SavedModel with a single concrete `serve` function taking a float32 batch of
+  shape (None, 28, 28, 1). Calling it runs the traced graph directly, without Keras or MLflow pyfunc layers.
+- models/CNN.tflite: the same graph converted to TensorFlow Lite. The TFLite interpreter runs float
+  models through the XNNPACK delegate on CPU by default.
+
+Both are checked against the Keras model on a sample batch before the stage succeeds, the TFLite file with
+the predictor of the prediction service. The service loads either one directly through MODEL_PATH (see
+src/api/model_store.py).
+'''
+
+import os
+
+# Suppress TensorFlow logs
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'  # Suppress INFO and WARNING logs
+
+import shutil
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+
+from src.api.model_store import TFLitePredictor
+
+# Largest accepted difference between the probabilities of the Keras model and of an exported artifact
+TOLERANCE = 1e-4
+
+
+def export_saved_model(model, saved_model_dir):
+    """Write `model` as a SavedModel whose `serve` endpoint is one concrete function with a dynamic batch."""
+    shutil.rmtree(saved_model_dir, ignore_errors=True)
+    model.export(saved_model_dir, format="tf_saved_model", verbose=False)
+    return saved_model_dir
+
+
+def convert_to_tflite(saved_model_dir, tflite_path, quantization=None, representative_dataset=None):
+    """
+    Convert a SavedModel to TensorFlow Lite.
+
+    Parameters:
+        saved_model_dir (str): SavedModel written by `export_saved_model`.
+        tflite_path (str): Output .tflite file.
+        quantization (str): None for a float model, "dynamic" for int8 weights with float activations, or
+            "int8" for a full-integer model (int8 weights, activations, input and output).
+        representative_dataset (callable): Generator of calibration batches, required for "int8".
+
+    Returns:
+        str: Path of the written file.
+    """
+    converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+    if quantization is not None:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == "int8":
+        if representative_dataset is None:
+            raise ValueError("Full-integer quantization needs a representative dataset")
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    tflite_model = converter.convert()
+
+    os.makedirs(os.path.dirname(tflite_path) or ".", exist_ok=True)
+    with open(tflite_path, "wb") as f:
+        f.write(tflite_model)
+    return tflite_path
+
+
+def export_model(model_path="models/CNN.keras", saved_model_dir="models/CNN_savedmodel",
+                 tflite_path="models/CNN.tflite", sample=None):
+    """
+    Export the Keras model to a SavedModel and a TFLite file, and check both against the Keras model.
+
+    Parameters:
+        model_path (str): Trained Keras model.
+        saved_model_dir (str): Output SavedModel directory.
+        tflite_path (str): Output TFLite file.
+        sample (np.ndarray): Normalized batch used for the check; random pixels if None.
+
+    Returns:
+        dict: Largest absolute difference of each artifact's probabilities from the Keras model.
+
+    Raises:
+        ValueError: If an exported artifact does not match the Keras model.
+    """
+    model = load_model(model_path, compile=False)
+    if sample is None:
+        sample = np.random.default_rng(0).random((8,) + tuple(model.input_shape[1:]), dtype=np.float32)
+    expected = model.predict_on_batch(sample)
+
+    export_saved_model(model, saved_model_dir)
+    convert_to_tflite(saved_model_dir, tflite_path)
+
+    # Keep a reference to the loaded object: its variables are released with it
+    saved_model = tf.saved_model.load(saved_model_dir)
+    served = saved_model.serve(tf.constant(sample))
+    differences = {
+        "saved_model": float(np.abs(np.asarray(served) - expected).max()),
+        "tflite": float(np.abs(TFLitePredictor(tflite_path).predict(sample) - expected).max()),
+    }
+    for name, difference in differences.items():
+        if difference > TOLERANCE:
+            raise ValueError(f"The {name} export differs from the Keras model by {difference:.2e}")
+
+    print(f"Model exported to {saved_model_dir} and {tflite_path} "
+          f"({os.path.getsize(tflite_path) / 1024:.0f} KiB), max difference from Keras: {max(differences.values()):.2e}")
+    return differences
+
+
+if __name__ == "__main__":
+    export_model("models/CNN.keras", "models/CNN_savedmodel", "models/CNN.tflite")
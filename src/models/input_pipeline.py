@@ -0,0 +1,277 @@
+'''
+Input pipeline feeding the CNN from the uint8 feature store.
+
+The features are memory-mapped with `np.load(..., mmap_mode='r')` and only the rows of the current batch
+are read and normalized to float32, so training and evaluation memory scales with the batch size instead
+of the dataset size. The train and test sets are index arrays into the same feature file (see split_data),
+so no per-split copy of the features exists. Normalization is the shared `normalize` used by the prediction
+service, so the model always sees pixels in [0, 1] with a channel axis.
+
+Two pipelines are available:
+- FeatureBatches, a Keras PyDataset reading one batch at a time from the memory-mapped feature store.
+- make_feature_dataset / make_image_dataset, tf.data pipelines streaming from the feature store or straight
+  from the image files. Reads and decodes run in parallel maps, followed by optional cache(), a shuffle
+  buffer, batching, normalization and prefetch(AUTOTUNE), so data preparation overlaps with training.
+  InputStallMonitor reports how long each epoch waited on the input pipeline.
+Both accept an Augmenter (src/models/augmentation.py) that augments the training batches on the fly.
+'''
+
+import os
+
+# Suppress TensorFlow logs
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'  # Suppress INFO and WARNING logs
+
+import math
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.callbacks import Callback
+from tensorflow.keras.utils import PyDataset
+
+from src.data.preprocessing import IMAGE_HEIGHT, IMAGE_WIDTH, decode_image, normalize
+from src.data.table_io import read_table
+
+AUTOTUNE = tf.data.AUTOTUNE
+
+# Rows read from the memory-mapped feature store per parallel read
+READ_BLOCK_SIZE = 1024
+
+
+def load_features(path):
+    """Memory-map a feature file written by prepare_features (uint8 pixels) without reading it."""
+    return np.load(path, mmap_mode="r")
+
+
+def load_split(processed_dir="data/processed"):
+    """Load the (train_idx, test_idx) row indices written by split_data."""
+    return (np.load(os.path.join(processed_dir, "train_idx.npy")),
+            np.load(os.path.join(processed_dir, "test_idx.npy")))
+
+
+class FeatureBatches(PyDataset):
+    def __init__(self, features, labels=None, indices=None, batch_size=32, shuffle=False, seed=None,
+                 one_hot_classes=None, augment=None, **kwargs):
+        """
+        Parameters:
+            features (np.ndarray): uint8 pixels of shape (N, H, W) or (N, H, W, 1), typically memory-mapped.
+            labels (np.ndarray): Optional labels, one per selected row; batches are features only without them.
+            indices (np.ndarray): Sorted rows of `features` to iterate over, e.g. train_idx; all rows if None.
+            batch_size (int): Number of samples per batch.
+            shuffle (bool): Reshuffle the sample order at the end of every epoch.
+            seed (int): Seed of the shuffling, for reproducible epochs.
+            one_hot_classes (int): If set, integer labels are one-hot encoded batch by batch to this many classes.
+            augment (Augmenter): Optional on-the-fly augmentation applied to every batch.
+        """
+        super().__init__(**kwargs)
+        self.features = features
+        self.labels = labels
+        self.indices = indices
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.one_hot_classes = one_hot_classes
+        self.augment = augment
+        self._rng = np.random.default_rng(seed)
+        self._order = np.arange(len(features) if indices is None else len(indices))
+        if shuffle:
+            self._rng.shuffle(self._order)
+
+    def __len__(self):
+        return math.ceil(len(self._order) / self.batch_size)
+
+    def __getitem__(self, index):
+        batch = slice(index * self.batch_size, (index + 1) * self.batch_size)
+        if self.shuffle:
+            # Read the rows in file order, which is much kinder to the page cache than random order
+            batch = np.sort(self._order[batch])
+        rows = batch if self.indices is None else self.indices[batch]
+        x = normalize(self.features[rows])
+        if self.augment is not None:
+            x = self.augment(x, index)
+        if self.labels is None:
+            return x
+        y = self.labels[batch]
+        if self.one_hot_classes is not None:
+            y = np.eye(self.one_hot_classes, dtype=np.float32)[y]
+        return x, y
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self._rng.shuffle(self._order)
+
+
+def load_image_paths(encoded_file="data/processed/encoded_data.parquet",
+                     error_report_file="data/processed/feature_errors.csv"):
+    """
+    Return the image path of every row of features.npy.
+
+    prepare_features drops the images it could not decode (listed in the error report), so the rows of the
+    encoded table minus those are aligned with the feature store and its split indices.
+    """
+    image_paths = read_table(encoded_file, columns=["image_path"])["image_path"].to_numpy()
+    if error_report_file and os.path.exists(error_report_file):
+        failed = read_table(error_report_file, columns=["row"])["row"].to_numpy(dtype=int)
+        image_paths = np.delete(image_paths, failed)
+    return image_paths
+
+
+def make_feature_dataset(features, labels, indices=None, batch_size=32, shuffle=False, seed=None,
+                         one_hot_classes=None, shuffle_buffer=10000, cache=False, augment=None):
+    """
+    tf.data pipeline streaming (normalized pixels, label) batches from the memory-mapped feature store.
+
+    Rows are read in file order by blocks of READ_BLOCK_SIZE in parallel, then shuffled through a buffer,
+    so memory scales with the shuffle buffer and the batch size, not with the dataset size.
+
+    Parameters:
+        features (np.ndarray): uint8 pixels of shape (N, H, W, 1), typically memory-mapped.
+        labels (np.ndarray): Labels, one per selected row.
+        indices (np.ndarray): Sorted rows of `features` to iterate over; all rows if None.
+        batch_size (int): Number of samples per batch.
+        shuffle (bool): Shuffle the samples, differently at every epoch.
+        seed (int): Seed of the shuffling, for reproducible epochs.
+        one_hot_classes (int): If set, labels are one-hot encoded to this many classes.
+        shuffle_buffer (int): Number of samples in the shuffle buffer.
+        cache (bool or str): Cache the uint8 samples after the first epoch, in memory (True) or in a file (str).
+        augment (Augmenter): Optional on-the-fly augmentation applied to every batch (training only).
+
+    Returns:
+        tf.data.Dataset: The batched dataset.
+    """
+    rows = np.arange(len(features)) if indices is None else np.asarray(indices)
+    labels = np.asarray(labels)
+    pixel_shape = features.shape[1:]
+
+    def read_block(positions):
+        # Positions are consecutive, so the block is one sequential read of the memory map
+        return np.asarray(features[rows[positions]]), labels[positions]
+
+    def read(positions):
+        pixels, block_labels = tf.numpy_function(read_block, [positions], [features.dtype, labels.dtype])
+        pixels.set_shape((None,) + pixel_shape)
+        block_labels.set_shape((None,))
+        return pixels, block_labels
+
+    dataset = (
+        tf.data.Dataset.range(len(rows))
+        .batch(READ_BLOCK_SIZE)
+        .map(read, num_parallel_calls=AUTOTUNE)
+        .unbatch()
+        # unbatch() loses the number of samples, which Keras needs to know the number of steps per epoch
+        .apply(tf.data.experimental.assert_cardinality(len(rows)))
+    )
+    return _finish(dataset, batch_size, shuffle, seed, one_hot_classes, shuffle_buffer, cache, augment)
+
+
+def make_image_dataset(image_paths, labels, batch_size=32, shuffle=False, seed=None, one_hot_classes=None,
+                       shuffle_buffer=10000, cache=True, augment=None, width=IMAGE_WIDTH, height=IMAGE_HEIGHT):
+    """
+    tf.data pipeline decoding the image files directly, without a feature store.
+
+    Images are decoded in a parallel map with the shared `decode_image` (same grayscale conversion and
+    resize filter as prepare_features and the prediction service). By default the decoded uint8 images are
+    cached after the first epoch so later epochs skip decoding.
+
+    Parameters:
+        image_paths (sequence): Image file of each sample.
+        labels (np.ndarray): Label of each sample.
+        width (int): Target width of the resized images.
+        height (int): Target height of the resized images.
+        Other parameters as for `make_feature_dataset`.
+
+    Returns:
+        tf.data.Dataset: The batched dataset.
+    """
+    def decode(path):
+        return decode_image(path.decode("utf-8"), width, height)[..., np.newaxis]
+
+    def read(path, label):
+        pixels = tf.numpy_function(decode, [path], tf.uint8)
+        pixels.set_shape((height, width, 1))
+        return pixels, label
+
+    dataset = (
+        tf.data.Dataset.from_tensor_slices((np.asarray(image_paths, dtype=str), np.asarray(labels)))
+        .map(read, num_parallel_calls=AUTOTUNE)
+    )
+    return _finish(dataset, batch_size, shuffle, seed, one_hot_classes, shuffle_buffer, cache, augment)
+
+
+def _finish(dataset, batch_size, shuffle, seed, one_hot_classes, shuffle_buffer, cache, augment):
+    # Cache the compact uint8 samples (not the normalized floats) before shuffling, so every epoch is reshuffled
+    if cache:
+        dataset = dataset.cache(cache if isinstance(cache, str) else "")
+    if shuffle:
+        dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+
+    def prepare(pixels, label):
+        # Same scaling as `normalize`: uint8 * float32(1/255)
+        pixels = tf.cast(pixels, tf.float32) * tf.constant(1.0 / 255.0, tf.float32)
+        if one_hot_classes is not None:
+            label = tf.one_hot(label, one_hot_classes, dtype=tf.float32)
+        return pixels, label
+
+    dataset = dataset.batch(batch_size).map(prepare, num_parallel_calls=AUTOTUNE)
+    if augment is not None:
+        # The batch index is part of the augmentation seed, which keeps every epoch reproducible
+        dataset = dataset.enumerate().map(augment.tf_map, num_parallel_calls=AUTOTUNE)
+    return dataset.prefetch(AUTOTUNE)
+
+
+class InputStallMonitor(Callback):
+    """
+    Measure how long each training epoch waits on the input pipeline.
+
+    `wrap` adds a pass-through step after prefetch that timestamps the moment each batch is handed to the
+    training step; the stall of a step is the time between the start of the step and that timestamp. A
+    well-fed pipeline stalls close to zero. The first step of training also includes graph tracing and is
+    not counted. The totals are added to the epoch logs (input_stall_seconds, input_stall_fraction) so
+    they are recorded with the other metrics.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.epoch_stalls = []
+        self._delivered_at = None
+        self._step_started_at = None
+        self._epoch_started_at = None
+        self._train_ended_at = None
+        self._stall = 0.0
+        self._first_step = True
+
+    def wrap(self, dataset):
+        def mark():
+            self._delivered_at = time.perf_counter()
+            return np.float32(0.0)
+
+        def timestamp(pixels, label):
+            marked = tf.numpy_function(mark, [], tf.float32)
+            with tf.control_dependencies([marked]):
+                return tf.identity(pixels), tf.identity(label)
+
+        return dataset.map(timestamp)
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._stall = 0.0
+        self._epoch_started_at = time.perf_counter()
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self._step_started_at = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._train_ended_at = time.perf_counter()
+        delivered_at, started_at = self._delivered_at, self._step_started_at
+        if self._first_step:
+            self._first_step = False
+        elif delivered_at is not None and started_at is not None and delivered_at > started_at:
+            self._stall += delivered_at - started_at
+
+    def on_epoch_end(self, epoch, logs=None):
+        # Relative to the training steps of the epoch, validation excluded
+        duration = (self._train_ended_at or time.perf_counter()) - self._epoch_started_at
+        self.epoch_stalls.append(self._stall)
+        if logs is not None:
+            logs["input_stall_seconds"] = self._stall
+            logs["input_stall_fraction"] = self._stall / duration if duration > 0 else 0.0
+        print(f"⏱️ Epoch {epoch + 1}: waited {self._stall:.2f}s on the input pipeline "
+              f"({100 * self._stall / max(duration, 1e-9):.1f}% of {duration:.2f}s)")
@@ -0,0 +1,142 @@
+'''
+Registry of the CNN architectures that can be trained (the `architecture` training setting).
+
+Every entry maps the input tensor to a feature tensor; build_model adds the softmax classification head.
+- baseline: the original Conv2D(32, 5x5) -> Flatten -> Dense(128) network. Flatten feeds a 4608 x 128
+  dense matrix, which holds most of its weights and multiply-adds.
+- separable: depthwise-separable convolutions down to 7x7, then a global-average-pooling head.
+- gap: two convolutions and a global-average-pooling head instead of Flatten + Dense(128).
+- tiny_resnet: a small residual network with batch normalization and a global-average-pooling head.
+
+profile_model reports the cost of a built model: parameter count, FLOPs of one image (2 x the multiply-adds
+of the convolution and dense layers) and the measured CPU inference latency per batch.
+'''
+
+import time
+
+import numpy as np
+from tensorflow.keras.layers import (
+    Activation, Add, BatchNormalization, Conv2D, Dense, DepthwiseConv2D, Dropout, Flatten,
+    GlobalAveragePooling2D, MaxPooling2D, SeparableConv2D,
+)
+
+
+def baseline(inputs):
+    x = Conv2D(32, (5, 5), activation='relu')(inputs)
+    x = MaxPooling2D(pool_size=(2, 2))(x)
+    x = Dropout(0.2)(x)
+    x = Flatten()(x)
+    return Dense(128, activation='relu')(x)
+
+
+def separable(inputs):
+    # A regular convolution on the single input channel, then depthwise-separable convolutions
+    x = Conv2D(16, (3, 3), padding='same', activation='relu')(inputs)
+    x = SeparableConv2D(32, (3, 3), padding='same', activation='relu')(x)
+    x = MaxPooling2D(pool_size=(2, 2))(x)
+    x = SeparableConv2D(64, (3, 3), padding='same', activation='relu')(x)
+    x = MaxPooling2D(pool_size=(2, 2))(x)
+    x = SeparableConv2D(128, (3, 3), padding='same', activation='relu')(x)
+    x = Dropout(0.2)(x)
+    return GlobalAveragePooling2D()(x)
+
+
+def gap(inputs):
+    x = Conv2D(32, (5, 5), activation='relu')(inputs)
+    x = MaxPooling2D(pool_size=(2, 2))(x)
+    x = Conv2D(64, (3, 3), activation='relu')(x)
+    x = Dropout(0.2)(x)
+    return GlobalAveragePooling2D()(x)
+
+
+def _residual_block(x, filters, strides):
+    shortcut = x
+    x = Conv2D(filters, (3, 3), strides=strides, padding='same', use_bias=False)(x)
+    x = BatchNormalization()(x)
+    x = Activation('relu')(x)
+    x = Conv2D(filters, (3, 3), padding='same', use_bias=False)(x)
+    x = BatchNormalization()(x)
+    if strides != 1 or shortcut.shape[-1] != filters:
+        shortcut = Conv2D(filters, (1, 1), strides=strides, use_bias=False)(shortcut)
+        shortcut = BatchNormalization()(shortcut)
+    return Activation('relu')(Add()([x, shortcut]))
+
+
+def tiny_resnet(inputs):
+    x = Conv2D(16, (3, 3), padding='same', use_bias=False)(inputs)
+    x = BatchNormalization()(x)
+    x = Activation('relu')(x)
+    x = _residual_block(x, 16, 1)
+    x = _residual_block(x, 32, 2)
+    x = _residual_block(x, 64, 2)
+    x = Dropout(0.2)(x)
+    return GlobalAveragePooling2D()(x)
+
+
+ARCHITECTURES = {
+    "baseline": baseline,
+    "separable": separable,
+    "gap": gap,
+    "tiny_resnet": tiny_resnet,
+}
+
+
+def count_flops(model):
+    """
+    FLOPs of the forward pass of one image: 2 x the multiply-adds of the convolution and dense layers.
+    Activations, pooling, normalization and additions are negligible next to them and not counted.
+    """
+    multiply_adds = 0
+    for layer in model.layers:
+        if isinstance(layer, (Conv2D, DepthwiseConv2D, SeparableConv2D, Dense)):
+            input_channels = layer.input.shape[-1]
+            output_positions = int(np.prod(layer.output.shape[1:-1]))
+            output_channels = layer.output.shape[-1]
+        if isinstance(layer, SeparableConv2D):
+            kernel = int(np.prod(layer.kernel_size))
+            depthwise_channels = input_channels * layer.depth_multiplier
+            multiply_adds += output_positions * depthwise_channels * (kernel + output_channels)
+        elif isinstance(layer, DepthwiseConv2D):
+            multiply_adds += output_positions * output_channels * int(np.prod(layer.kernel_size))
+        elif isinstance(layer, Conv2D):
+            kernel = int(np.prod(layer.kernel_size))
+            multiply_adds += output_positions * output_channels * kernel * input_channels // layer.groups
+        elif isinstance(layer, Dense):
+            multiply_adds += input_channels * output_channels
+    return 2 * multiply_adds
+
+
+def time_calls(predict, batch, repeat=50, warmup=5):
+    """Median wall time in milliseconds of `predict(batch)`, after `warmup` untimed calls."""
+    for _ in range(warmup):
+        predict(batch)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predict(batch)
+        timings.append(time.perf_counter() - start)
+    return 1000 * float(np.median(timings))
+
+
+def measure_latency(model, batch_size, repeat=50, warmup=5):
+    """
+    Median CPU latency in milliseconds of one inference call on a batch of `batch_size` images.
+
+    `predict_on_batch` runs the compiled prediction function without building a data pipeline, so the
+    timing is the model itself and not the per-call setup of `predict`.
+    """
+    x = np.random.default_rng(0).random((batch_size,) + tuple(model.input_shape[1:]), dtype=np.float32)
+    return time_calls(model.predict_on_batch, x, repeat, warmup)
+
+
+def profile_model(model, batch_sizes=(1, 64), repeat=50):
+    """
+    Cost of a built model.
+
+    Returns:
+        dict: params, flops and latency_ms_batch_<n> for every batch size.
+    """
+    profile = {"params": int(model.count_params()), "flops": int(count_flops(model))}
+    for batch_size in batch_sizes:
+        profile[f"latency_ms_batch_{batch_size}"] = measure_latency(model, batch_size, repeat)
+    return profile
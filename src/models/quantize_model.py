@@ -0,0 +1,148 @@
+'''
+Post-training int8 quantization of the exported model, with an accuracy gate.
+
+Two TFLite variants are built from the SavedModel written by export_model:
+- dynamic: int8 weights, activations quantized on the fly (no calibration data needed),
+- int8: full-integer model, int8 weights and activations, calibrated on a representative sample of the
+  training rows of the feature store.
+
+Each variant is evaluated on the test rows like evaluate_model does (argmax of the predicted probabilities
+against the encoded labels) and compared with the float TFLite export, which matches the Keras model. Only a variant whose accuracy drop
+stays within `max_accuracy_drop` (the `quantize` section of params.yaml) is published as
+models/quantized/CNN_quantized.tflite, preferring the full-integer one. The published variant and its metrics are
+written next to it in CNN_quantized.json, which the prediction service logs when it loads the model. The report with the accuracy, size and
+CPU latency of every variant and their deltas from the float model is written to metrics/quantization.json.
+'''
+
+import os
+
+# Suppress TensorFlow logs
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'  # Suppress INFO and WARNING logs
+
+import argparse
+import json
+import shutil
+
+import numpy as np
+import yaml
+
+from src.data.preprocessing import normalize
+from src.api.model_store import TFLitePredictor, quantization_info_path
+from src.models.export_model import convert_to_tflite
+from src.models.input_pipeline import FeatureBatches, load_features, load_split
+from src.models.model_zoo import time_calls
+
+DEFAULT_PARAMS = {
+    "max_accuracy_drop": 0.01,
+    "calibration_samples": 500,
+}
+
+# Published variants, from the most to the least compressed
+VARIANTS = ("int8", "dynamic")
+
+PUBLISHED_FILE = "CNN_quantized.tflite"
+
+
+def representative_dataset(features, train_idx, samples=500, seed=0):
+    """Calibration generator yielding single normalized training images, sampled with a fixed seed."""
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(train_idx, size=min(samples, len(train_idx)), replace=False))
+
+    def generate():
+        for row in rows:
+            yield [normalize(features[row:row + 1])]
+
+    return generate
+
+
+def evaluate_accuracy(predict, features, test_idx, labels, batch_size=256):
+    """Accuracy of `predict(batch) -> probabilities` on the test rows, with the batching of evaluate_model."""
+    predictions = [predict(batch).argmax(axis=1) for batch in FeatureBatches(features, indices=test_idx,
+                                                                            batch_size=batch_size)]
+    return float(np.mean(np.concatenate(predictions) == labels[test_idx]))
+
+
+def quantize_model(float_tflite_path="models/CNN.tflite", saved_model_dir="models/CNN_savedmodel",
+                   features_path="data/processed/features.npy", labels_path="data/processed/labels.npy",
+                   processed_dir="data/processed", output_dir="models/quantized",
+                   report_path="metrics/quantization.json", max_accuracy_drop=0.01, calibration_samples=500):
+    """
+    Build the dynamic-range and full-integer variants, evaluate them and publish the best passing one.
+
+    Returns:
+        dict: The report, with the published variant (or None) under "published".
+    """
+    features = load_features(features_path)
+    train_idx, test_idx = load_split(processed_dir)
+    labels = np.load(labels_path)
+
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.makedirs(output_dir)
+    candidates = {
+        "dynamic": convert_to_tflite(saved_model_dir, os.path.join(output_dir, "CNN_dynamic.tflite"),
+                                     quantization="dynamic"),
+        "int8": convert_to_tflite(saved_model_dir, os.path.join(output_dir, "CNN_full_int8.tflite"),
+                                  quantization="int8",
+                                  representative_dataset=representative_dataset(features, train_idx,
+                                                                                calibration_samples)),
+    }
+
+    sample = {size: normalize(features[test_idx[:size]]) for size in (1, 64)}
+
+    def profile(predict, path):
+        return {
+            "accuracy": evaluate_accuracy(predict, features, test_idx, labels),
+            "size_kib": os.path.getsize(path) / 1024,
+            "latency_ms_batch_1": time_calls(predict, sample[1]),
+            "latency_ms_batch_64": time_calls(predict, sample[64]),
+        }
+
+    report = {"float": profile(TFLitePredictor(float_tflite_path).predict, float_tflite_path)}
+    for name, path in candidates.items():
+        result = profile(TFLitePredictor(path).predict, path)
+        result.update({f"{key}_delta": result[key] - report["float"][key] for key in report["float"]})
+        result["passed"] = -result["accuracy_delta"] <= max_accuracy_drop
+        report[name] = result
+
+    published = next((name for name in VARIANTS if report[name]["passed"]), None)
+    published_path = os.path.join(output_dir, PUBLISHED_FILE)
+    if published is not None:
+        shutil.copyfile(candidates[published], published_path)
+        with open(quantization_info_path(published_path), "w", encoding="utf-8") as f:
+            json.dump({"variant": published, **{key: report[published][key] for key in
+                                                ("accuracy", "accuracy_delta", "size_kib")}}, f, indent=2)
+    report["published"] = published
+    report["max_accuracy_drop"] = max_accuracy_drop
+
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for name in ("float",) + VARIANTS:
+        result = report[name]
+        print(f"{name:<8} accuracy {result['accuracy']:.4f}  size {result['size_kib']:8.1f} KiB  "
+              f"latency {result['latency_ms_batch_1']:.3f} ms (batch 1), {result['latency_ms_batch_64']:.3f} ms (batch 64)")
+    if published is None:
+        print(f"⚠️ No quantized model kept the accuracy drop within {max_accuracy_drop}, nothing published.")
+    else:
+        print(f"✅ Published the {published} model as {published_path}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quantize the exported model to int8 behind an accuracy gate.")
+    parser.add_argument("--params", default="params.yaml", help="YAML file with a `quantize` section")
+    parser.add_argument("--max-accuracy-drop", type=float, help="Largest accepted accuracy drop (absolute)")
+    parser.add_argument("--calibration-samples", type=int, help="Training images used for calibration")
+    args = parser.parse_args()
+
+    params = dict(DEFAULT_PARAMS)
+    if os.path.exists(args.params):
+        with open(args.params, "r", encoding="utf-8") as f:
+            params.update((yaml.safe_load(f) or {}).get("quantize") or {})
+    if args.max_accuracy_drop is not None:
+        params["max_accuracy_drop"] = args.max_accuracy_drop
+    if args.calibration_samples is not None:
+        params["calibration_samples"] = args.calibration_samples
+
+    quantize_model(max_accuracy_drop=params["max_accuracy_drop"], calibration_samples=params["calibration_samples"])
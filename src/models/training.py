@@ -1,15 +1,28 @@
 # src/models/training.py
-from fastapi import FastAPI
-import subprocess
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+from src.pipeline.jobs import JobManager, PipelineBusyError
 
 app = FastAPI(title="Training Service")
 
-@app.get("/train")
-def run_training():
+# Training runs as a background job; the stage list mirrors the stages downstream of setup_callbacks in dvc.yaml
+training_jobs = JobManager(
+    pipeline="training",
+    command=["dvc", "repro", "--downstream", "setup_callbacks"],
+    stages=["setup_callbacks", "build_train_cnn", "export_model", "quantize_model", "evaluate_model"],
+)
+
+@app.post("/jobs", status_code=202)
+def start_training():
     try:
-        # Call the training pipeline, e.g., using dvc repro with appropriate downstream targets
-        result = subprocess.run(["sh", "-c", "dvc repro --downstream setup_callbacks"],
-                                capture_output=True, text=True, check=True)
-        return {"status": "success", "output": result.stdout}
-    except subprocess.CalledProcessError as e:
-        return {"status": "error", "error": e.stderr}
+        job = training_jobs.submit()
+    except PipelineBusyError as e:
+        return JSONResponse(status_code=409, content={"error": str(e), "job": e.job.to_dict()})
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}")
+def get_training_job(job_id: str):
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job.to_dict()
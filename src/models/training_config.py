@@ -0,0 +1,133 @@
+'''
+Training configuration for CPU training nodes.
+
+The settings are read from the `train` section of params.yaml (the DVC parameters file, so changing them
+re-runs the training stage) and can be overridden on the command line of build_train_cnn:
+- batch_size, epochs,
+- intra_op_threads / inter_op_threads: TensorFlow thread pools (0 lets TensorFlow use every core),
+- xla: compile the training step with XLA (off by default on CPU-only hosts),
+- precision: "float32" or "mixed_bfloat16". bfloat16 is only fast on CPUs with bfloat16 instructions
+  (AVX512-BF16 or AMX), on other hosts training falls back to float32 with a warning,
+- architecture: the network trained, one of the model zoo (src/models/model_zoo.py).
+
+ThroughputMonitor records the training samples per second of every epoch, which together with the thread
+counts gives a predictable basis to size training nodes.
+'''
+
+import os
+import time
+import warnings
+
+import mlflow
+import tensorflow as tf
+import yaml
+from tensorflow.keras.callbacks import Callback
+
+from src.models.model_zoo import ARCHITECTURES
+
+DEFAULT_CONFIG = {
+    "batch_size": 32,
+    "epochs": 100,
+    "intra_op_threads": 0,
+    "inter_op_threads": 0,
+    "xla": False,
+    "precision": "float32",
+    "architecture": "baseline",
+}
+
+PRECISIONS = ("float32", "mixed_bfloat16")
+
+# /proc/cpuinfo flags of the CPU instructions that make bfloat16 matrix products fast
+BF16_CPU_FLAGS = ("avx512_bf16", "amx_bf16")
+
+
+def load_training_config(path="params.yaml", section="train", overrides=None):
+    """
+    Load the training configuration.
+
+    Parameters:
+        path (str): YAML parameters file; the defaults are used if it does not exist.
+        section (str): Section of the file holding the training settings.
+        overrides (dict): Values taking precedence over the file, e.g. from the command line (None is ignored).
+
+    Returns:
+        dict: The configuration, with every key of DEFAULT_CONFIG.
+    """
+    config = dict(DEFAULT_CONFIG)
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            config.update((yaml.safe_load(f) or {}).get(section) or {})
+    config.update({key: value for key, value in (overrides or {}).items() if value is not None})
+
+    unknown = set(config) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown training settings: {sorted(unknown)}")
+    if config["precision"] not in PRECISIONS:
+        raise ValueError(f"precision must be one of {PRECISIONS}, got {config['precision']!r}")
+    if config["architecture"] not in ARCHITECTURES:
+        raise ValueError(f"architecture must be one of {sorted(ARCHITECTURES)}, got {config['architecture']!r}")
+    return config
+
+
+def bfloat16_supported(cpuinfo_path="/proc/cpuinfo"):
+    """Whether a GPU is available or the CPU has bfloat16 instructions."""
+    if tf.config.list_physical_devices("GPU"):
+        return True
+    try:
+        with open(cpuinfo_path, "r", encoding="utf-8") as f:
+            flags = f.read().split()
+    except OSError:
+        return False
+    return any(flag in flags for flag in BF16_CPU_FLAGS)
+
+
+def configure_runtime(config):
+    """
+    Apply the thread counts and the precision policy. Must run before TensorFlow executes any operation.
+
+    Returns:
+        str: The precision actually used.
+    """
+    tf.config.threading.set_intra_op_parallelism_threads(config["intra_op_threads"])
+    tf.config.threading.set_inter_op_parallelism_threads(config["inter_op_threads"])
+
+    precision = config["precision"]
+    if precision == "mixed_bfloat16" and not bfloat16_supported():
+        warnings.warn("This host has no bfloat16 support, training in float32 instead")
+        precision = "float32"
+    tf.keras.mixed_precision.set_global_policy(precision)
+    return precision
+
+
+class ThroughputMonitor(Callback):
+    """
+    Measure the training throughput of every epoch in samples per second.
+
+    The time of an epoch runs from its start to the end of its last training step, validation excluded.
+    The value is added to the epoch logs (samples_per_second) and logged to the active MLflow run. The autolog
+    callback only records it if it runs after this one, so the metric is logged here explicitly.
+    """
+
+    def __init__(self, samples_per_epoch):
+        super().__init__()
+        self.samples_per_epoch = samples_per_epoch
+        self.epoch_throughputs = []
+        self._epoch_started_at = None
+        self._train_ended_at = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch_started_at = time.perf_counter()
+        self._train_ended_at = None
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._train_ended_at = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        duration = (self._train_ended_at or time.perf_counter()) - self._epoch_started_at
+        throughput = self.samples_per_epoch / duration if duration > 0 else 0.0
+        self.epoch_throughputs.append(throughput)
+        if logs is not None:
+            logs["samples_per_second"] = throughput
+        if mlflow.active_run() is not None:
+            mlflow.log_metric("samples_per_second", throughput, step=epoch)
+        print(f"🚀 Epoch {epoch + 1}: {throughput:,.0f} training samples/s")
@@ -0,0 +1,153 @@
+# src/pipeline/jobs.py
+'''
+Background job runner for the DVC pipelines triggered by the ingestion and training services.
+
+Running `dvc repro` inside a request handler ties up a worker for minutes and makes the gateway time out.
+Instead, a POST creates a job that runs the command in a background thread and returns immediately; the
+job records its status, the DVC stage it is currently running, elapsed time and the tail of its output so
+that GET /jobs/{id} can report progress. At most one job per pipeline runs at a time.
+'''
+
+import subprocess
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class PipelineBusyError(Exception):
+    def __init__(self, job):
+        super().__init__(f"Pipeline is already running job {job.job_id}")
+        self.job = job
+
+
+class Job:
+    def __init__(self, pipeline, command, stages, log_lines):
+        self.job_id = uuid.uuid4().hex
+        self.pipeline = pipeline
+        self.command = command
+        self.stages = list(stages)
+        self.status = QUEUED
+        self.current_stage = None
+        self.completed_stages = []
+        self.returncode = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.log_tail = deque(maxlen=log_lines)
+
+    def record_line(self, line):
+        """Keep the output line and update stage progress from DVC's stage messages."""
+        self.log_tail.append(line)
+        stage = _parse_stage(line)
+        if stage is None:
+            return
+        if self.current_stage is not None and self.current_stage not in self.completed_stages:
+            self.completed_stages.append(self.current_stage)
+        self.current_stage = stage
+
+    def to_dict(self):
+        end = self.finished_at or time.time()
+        return {
+            "job_id": self.job_id,
+            "pipeline": self.pipeline,
+            "status": self.status,
+            "current_stage": self.current_stage,
+            "completed_stages": list(self.completed_stages),
+            "total_stages": len(self.stages) or None,
+            "returncode": self.returncode,
+            "error": self.error,
+            "created_at": self.created_at,
+            "elapsed_seconds": round(end - self.started_at, 3) if self.started_at else 0.0,
+            "log_tail": list(self.log_tail),
+        }
+
+
+def _parse_stage(line):
+    # dvc repro prints "Running stage 'name':" or "Stage 'name' didn't change, skipping" for each stage
+    line = line.strip()
+    if line.startswith("Running stage '") or line.startswith("Stage '"):
+        return line.split("'")[1]
+    return None
+
+
+class JobManager:
+    def __init__(self, pipeline, command, stages=(), log_lines=200, max_history=50, cwd=None):
+        """
+        Parameters:
+            pipeline (str): Name of the pipeline, reported in every job.
+            command (list): Command executed for each job, e.g. ["dvc", "repro", "one_hot_encode_labels"].
+            stages (iterable): Expected DVC stages, used to report progress as completed/total.
+            log_lines (int): Number of output lines kept per job.
+            max_history (int): Number of finished jobs kept for GET /jobs/{id}.
+            cwd (str): Working directory for the command.
+        """
+        self.pipeline = pipeline
+        self.command = list(command)
+        self.stages = list(stages)
+        self.log_lines = log_lines
+        self.max_history = max_history
+        self.cwd = cwd
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._active = None
+
+    def submit(self):
+        """
+        Start a new job in the background.
+
+        Returns:
+            Job: The created job.
+
+        Raises:
+            PipelineBusyError: If a job for this pipeline is still queued or running.
+        """
+        with self._lock:
+            if self._active is not None and self._active.status in (QUEUED, RUNNING):
+                raise PipelineBusyError(self._active)
+            job = Job(self.pipeline, self.command, self.stages, self.log_lines)
+            self._active = job
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > self.max_history:
+                self._jobs.popitem(last=False)
+
+        threading.Thread(target=self._run, args=(job,), name=f"{self.pipeline}-{job.job_id}", daemon=True).start()
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def list(self):
+        return list(self._jobs.values())
+
+    def _run(self, job):
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            process = subprocess.Popen(
+                job.command,
+                cwd=self.cwd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+            )
+            for line in process.stdout:
+                job.record_line(line.rstrip("\n"))
+            job.returncode = process.wait()
+            if job.current_stage is not None and job.returncode == 0:
+                if job.current_stage not in job.completed_stages:
+                    job.completed_stages.append(job.current_stage)
+                job.current_stage = None
+            job.status = SUCCEEDED if job.returncode == 0 else FAILED
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
@@ -0,0 +1,59 @@
+import unittest
+import time
+import logging
+from src.api.auth_cache import CredentialCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestCredentialCache(unittest.TestCase):
+
+    def test_hit_after_add(self):
+        """
+        Test that verified credentials are answered from the cache and wrong passwords are not.
+        """
+        cache = CredentialCache(max_size=10, ttl_seconds=60)
+        self.assertFalse(cache.is_verified("user1", "secret", "hash1"))
+
+        cache.add("user1", "secret", "hash1")
+        self.assertTrue(cache.is_verified("user1", "secret", "hash1"))
+        self.assertFalse(cache.is_verified("user1", "wrong", "hash1"))
+        self.assertFalse(cache.is_verified("user2", "secret", "hash1"))
+        logger.info("Cache hit/miss behaviour verified.")
+
+    def test_password_change_invalidates_entry(self):
+        """
+        Test that an entry is not reused once the stored password hash changes.
+        """
+        cache = CredentialCache(max_size=10, ttl_seconds=60)
+        cache.add("user1", "secret", "hash1")
+        self.assertFalse(cache.is_verified("user1", "secret", "hash2"))
+        self.assertEqual(len(cache), 0)
+
+    def test_ttl_expiry(self):
+        """
+        Test that entries expire after the TTL.
+        """
+        cache = CredentialCache(max_size=10, ttl_seconds=0.05)
+        cache.add("user1", "secret", "hash1")
+        time.sleep(0.1)
+        self.assertFalse(cache.is_verified("user1", "secret", "hash1"))
+
+    def test_lru_eviction(self):
+        """
+        Test that the cache never grows beyond max_size and evicts the least recently used entry.
+        """
+        cache = CredentialCache(max_size=2, ttl_seconds=60)
+        cache.add("a", "pw", "h")
+        cache.add("b", "pw", "h")
+        self.assertTrue(cache.is_verified("a", "pw", "h"))  # "a" is now the most recently used
+        cache.add("c", "pw", "h")
+
+        self.assertEqual(len(cache), 2)
+        self.assertFalse(cache.is_verified("b", "pw", "h"))
+        self.assertTrue(cache.is_verified("a", "pw", "h"))
+        self.assertTrue(cache.is_verified("c", "pw", "h"))
+
+if __name__ == '__main__':
+    unittest.main()
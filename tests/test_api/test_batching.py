@@ -0,0 +1,115 @@
+import unittest
+import asyncio
+import threading
+import logging
+import numpy as np
+from src.api.batching import MicroBatcher
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestMicroBatcher(unittest.TestCase):
+
+    def setUp(self):
+        # Record the size of every batch passed to the dummy model
+        self.batch_sizes = []
+
+    def dummy_predict(self, images):
+        self.batch_sizes.append(len(images))
+        # Return the mean pixel value of each image as a single-column "prediction"
+        return images.reshape(len(images), -1).mean(axis=1, keepdims=True)
+
+    def test_concurrent_requests_are_batched(self):
+        """
+        Test that concurrent submissions are coalesced and each caller gets its own rows back.
+        """
+        async def run():
+            batcher = MicroBatcher(self.dummy_predict, max_batch_size=8, max_wait_ms=50)
+            await batcher.start()
+            try:
+                images = [np.full((28, 28, 1), i, dtype=np.float32) for i in range(8)]
+                return await asyncio.gather(*(batcher.submit(image) for image in images))
+            finally:
+                await batcher.stop()
+
+        results = asyncio.run(run())
+        logger.info("Batch sizes seen by the model: %s", self.batch_sizes)
+
+        self.assertEqual(sum(self.batch_sizes), 8)
+        self.assertLess(len(self.batch_sizes), 8, "Requests were not coalesced into batches.")
+        for i, result in enumerate(results):
+            self.assertEqual(result.shape, (1, 1))
+            self.assertAlmostEqual(float(result[0, 0]), float(i))
+
+    def test_batch_size_is_capped(self):
+        """
+        Test that no model call receives more images than max_batch_size.
+        """
+        async def run():
+            batcher = MicroBatcher(self.dummy_predict, max_batch_size=4, max_wait_ms=50)
+            await batcher.start()
+            try:
+                images = [np.zeros((28, 28, 1), dtype=np.float32) for _ in range(10)]
+                await asyncio.gather(*(batcher.submit(image) for image in images))
+            finally:
+                await batcher.stop()
+
+        asyncio.run(run())
+        logger.info("Batch sizes seen by the model: %s", self.batch_sizes)
+        self.assertTrue(all(size <= 4 for size in self.batch_sizes))
+        self.assertEqual(sum(self.batch_sizes), 10)
+
+    def test_errors_are_propagated(self):
+        """
+        Test that a failing model call raises in every request of the batch.
+        """
+        def failing_predict(images):
+            raise ValueError("model failure")
+
+        async def run():
+            batcher = MicroBatcher(failing_predict, max_batch_size=4, max_wait_ms=10)
+            await batcher.start()
+            try:
+                return await asyncio.gather(
+                    *(batcher.submit(np.zeros((28, 28, 1))) for _ in range(3)),
+                    return_exceptions=True,
+                )
+            finally:
+                await batcher.stop()
+
+        results = asyncio.run(run())
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+
+    def test_stop_fails_in_flight_requests(self):
+        """
+        Test that stopping the batcher fails the requests of the running batch, the one being collected and the queued ones.
+        """
+        release = threading.Event()
+
+        def blocking_predict(images):
+            release.wait(10)
+            return self.dummy_predict(images)
+
+        async def stop_while_busy(max_batch_size, max_wait_ms, count):
+            batcher = MicroBatcher(blocking_predict, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+            await batcher.start()
+            try:
+                requests = [asyncio.ensure_future(batcher.submit(np.zeros((28, 28, 1)))) for _ in range(count)]
+                await asyncio.sleep(0.05)
+                await batcher.stop()
+                return await asyncio.wait_for(asyncio.gather(*requests, return_exceptions=True), 5)
+            finally:
+                release.set()
+
+        # One batch running in the model, one request still queued
+        results = asyncio.run(stop_while_busy(max_batch_size=1, max_wait_ms=0, count=2))
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results), results)
+        # A batch taken off the queue, still waiting for more requests
+        release.clear()
+        results = asyncio.run(stop_while_busy(max_batch_size=8, max_wait_ms=10000, count=2))
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results), results)
+        self.assertEqual(self.batch_sizes, [1])
+
+if __name__ == '__main__':
+    unittest.main()
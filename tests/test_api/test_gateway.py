@@ -0,0 +1,188 @@
+import unittest
+import asyncio
+import base64
+import logging
+from unittest import mock
+import httpx
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+import src.api.gateway as gateway
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def keepalive_server(reader, writer):
+    # Minimal HTTP/1.1 backend answering every request on the same connection
+    try:
+        while True:
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        writer.close()
+
+class TestGatewayBackends(unittest.TestCase):
+
+    def setUp(self):
+        self.requests = []
+        self.addCleanup(setattr, gateway, "http_client", None)
+        self.addCleanup(setattr, gateway, "http_transport", None)
+
+    async def mock_backend(self, request):
+        self.requests.append(request)
+        if request.url.path == "/slow":
+            raise httpx.ReadTimeout("timed out", request=request)
+        if request.url.path == "/down":
+            raise httpx.ConnectError("connection refused", request=request)
+        if request.url.path == "/missing":
+            return httpx.Response(404, json={"detail": "not found"})
+        return httpx.Response(200, json={"ok": True})
+
+    def test_shared_client_and_timeouts(self):
+        """
+        Test that backend calls reuse the shared client and apply the timeouts of their backend.
+        """
+        async def run():
+            gateway.http_client = httpx.AsyncClient(transport=httpx.MockTransport(self.mock_backend))
+            # No client may be created per request
+            with mock.patch.object(httpx, "AsyncClient", side_effect=AssertionError("new client created")):
+                await gateway.call_backend("training", "POST", "http://training/jobs")
+                await gateway.call_backend("admin", "POST", "http://prediction/admin/model/reload")
+            await gateway.http_client.aclose()
+
+        asyncio.run(run())
+        self.assertEqual(len(self.requests), 2)
+        timeouts = [request.extensions["timeout"] for request in self.requests]
+        self.assertEqual(timeouts[0], gateway.BACKEND_TIMEOUTS["training"].as_dict())
+        self.assertEqual(timeouts[1], gateway.BACKEND_TIMEOUTS["admin"].as_dict())
+        self.assertEqual(timeouts[1]["connect"], gateway.BACKEND_CONNECT_TIMEOUT_SECONDS)
+
+    def test_backend_error_status(self):
+        """
+        Test that timeouts map to 504, connection failures to 502 and backend errors keep their status.
+        """
+        async def status_of(path):
+            try:
+                await gateway.call_backend("prediction", "GET", f"http://prediction{path}")
+            except httpx.HTTPError as exc:
+                return gateway.backend_error_status(exc)
+
+        async def run():
+            gateway.http_client = httpx.AsyncClient(transport=httpx.MockTransport(self.mock_backend))
+            try:
+                return [await status_of(path) for path in ("/slow", "/down", "/missing")]
+            finally:
+                await gateway.http_client.aclose()
+
+        self.assertEqual(asyncio.run(run()), [504, 502, 404])
+        in_flight = REGISTRY.get_sample_value("gateway_backend_requests_in_flight", {"backend": "prediction"})
+        self.assertEqual(in_flight, 0)
+
+    def test_pool_connection_metrics(self):
+        """
+        Test that the pool metrics see the keep-alive connection of the startup transport (guards httpx upgrades).
+        """
+        async def run():
+            server = await asyncio.start_server(keepalive_server, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            await gateway.open_http_client()
+            try:
+                for _ in range(3):
+                    await gateway.call_backend("prediction", "GET", f"http://127.0.0.1:{port}/health")
+                return gateway.pool_connection_count(idle=True), gateway.pool_connection_count(idle=False)
+            finally:
+                await gateway.close_http_client()
+                server.close()
+                await server.wait_closed()
+
+        self.assertEqual(asyncio.run(run()), (1, 0))
+        logger.info("One idle keep-alive connection reused for three backend calls.")
+
+class TestGatewayUploads(unittest.TestCase):
+
+    def setUp(self):
+        # Gateway app with the shared client replaced by a mock prediction service recording the raw bodies
+        self.bodies = []
+        self.client = TestClient(gateway.app)
+        self.client.__enter__()
+        self.addCleanup(self.client.__exit__, None, None, None)
+        real_client = gateway.http_client
+        gateway.http_client = httpx.AsyncClient(transport=httpx.MockTransport(self.mock_prediction))
+        self.addCleanup(setattr, gateway, "http_client", real_client)
+        self.auth = ("user1", "1resu")
+
+    async def mock_prediction(self, request):
+        self.bodies.append((request.url.path, request.headers["content-type"], await request.aread()))
+        return httpx.Response(200, json={"predicted_text": "A"})
+
+    def multipart(self, size):
+        boundary = "testboundary"
+        body = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="a.png"\r\n'
+                f'Content-Type: image/png\r\n\r\n').encode() + bytes(range(256)) * (size // 256) + f'\r\n--{boundary}--\r\n'.encode()
+        return body, {"content-type": f"multipart/form-data; boundary={boundary}"}
+
+    def test_body_streamed_unchanged(self):
+        """
+        Test that single and batch uploads reach the prediction service byte-for-byte, with their content type.
+        """
+        body, headers = self.multipart(4096)
+        for path in ("/predict", "/predict/batch"):
+            with self.subTest(path=path):
+                response = self.client.post(path, content=body, headers=headers, auth=self.auth)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), {"prediction_result": {"predicted_text": "A"}})
+                self.assertEqual(self.bodies[-1], (path, headers["content-type"], body))
+
+    def test_content_length_over_limit(self):
+        """
+        Test that an upload whose Content-Length exceeds the limit is rejected with a 413 before being forwarded.
+        """
+        body, headers = self.multipart(4096)
+        with mock.patch.object(gateway, "MAX_UPLOAD_BYTES", 1024):
+            response = self.client.post("/predict", content=body, headers=headers, auth=self.auth)
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(self.bodies, [])
+
+    def test_chunked_body_over_limit(self):
+        """
+        Test that an upload without Content-Length is cut off with a 413 once the streamed bytes exceed the limit.
+        """
+        body, headers = self.multipart(4096)
+        chunks = (body[i:i + 512] for i in range(0, len(body), 512))
+        with mock.patch.object(gateway, "MAX_UPLOAD_BYTES", 1024):
+            response = self.client.post("/predict", content=chunks, headers=headers, auth=self.auth)
+        self.assertEqual(response.status_code, 413)
+        self.assertIn("1024 bytes", response.json()["detail"])
+
+        small = (body[i:i + 512] for i in range(0, len(body), 512))
+        response = self.client.post("/predict", content=small, headers=headers, auth=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.bodies[-1][2], body)
+
+    def test_admin_credentials_forwarded(self):
+        """
+        Test that model admin calls carry the admin's credentials to the prediction service, which checks them again.
+        """
+        headers = []
+
+        async def mock_admin(request):
+            headers.append(request.headers.get("authorization"))
+            return httpx.Response(200, json={"swapped": True})
+
+        gateway.http_client = httpx.AsyncClient(transport=httpx.MockTransport(mock_admin))
+        self.assertEqual(self.client.post("/admin/model/rollback", auth=self.auth).status_code, 403)
+        response = self.client.post("/admin/model/rollback", auth=("admin1", "1nimda"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(headers, ["Basic " + base64.b64encode(b"admin1:1nimda").decode()])
+
+    def test_non_multipart_body(self):
+        """
+        Test that a body which is not a multipart upload is rejected with a 415.
+        """
+        response = self.client.post("/predict", json={"image": "..."}, auth=self.auth)
+        self.assertEqual(response.status_code, 415)
+        self.assertEqual(self.bodies, [])
+
+if __name__ == '__main__':
+    unittest.main()
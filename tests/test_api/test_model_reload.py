@@ -0,0 +1,156 @@
+import unittest
+import time
+import logging
+import numpy as np
+from src.api.model_store import LoadedModel
+from src.api.model_reload import ModelManager
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ConstantPredictor:
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def predict(self, batch):
+        self.calls += 1
+        return np.full((len(batch), 1), self.value)
+
+class InMemoryStore:
+    # Serves versions "v1", "v2", ... where the latest one can be changed by the test
+    def __init__(self):
+        self.latest = "v1"
+
+    def load(self):
+        return self.load_version(self.latest)
+
+    def latest_version(self):
+        return self.latest
+
+    def load_version(self, version):
+        return LoadedModel(ConstantPredictor(int(version[1:])), version, "registry")
+
+class UnavailableStore(InMemoryStore):
+    # No model can be loaded until `available` is set, e.g. the registry is down at startup
+    def __init__(self):
+        super().__init__()
+        self.available = False
+
+    def load(self):
+        if not self.available:
+            raise ConnectionError("registry unreachable")
+        return super().load()
+
+class TestModelManager(unittest.TestCase):
+
+    def setUp(self):
+        self.store = InMemoryStore()
+        self.manager = ModelManager(self.store)
+        self.manager.load_initial()
+
+    def test_initial_model_is_warmed_up(self):
+        """
+        Test that the first model is loaded and received a warm-up batch before serving.
+        """
+        self.assertEqual(self.manager.current.version, "v1")
+        self.assertEqual(self.manager.current.model.calls, 1)
+
+    def test_reload_swaps_only_new_versions(self):
+        """
+        Test that a reload is a no-op for the served version and swaps in a newer one.
+        """
+        self.assertFalse(self.manager.reload()["swapped"])
+
+        self.store.latest = "v2"
+        result = self.manager.reload()
+        logger.info("Reload result: %s", result)
+        self.assertTrue(result["swapped"])
+        self.assertEqual(self.manager.current.version, "v2")
+        self.assertEqual(self.manager.previous.version, "v1")
+        self.assertEqual(self.manager.current.model.calls, 1, "New model was not warmed up before the swap.")
+
+    def test_rollback(self):
+        """
+        Test that rollback restores the previously served model.
+        """
+        with self.assertRaises(RuntimeError):
+            self.manager.rollback()
+
+        self.store.latest = "v2"
+        self.manager.reload()
+        self.manager.rollback()
+        self.assertEqual(self.manager.current.version, "v1")
+
+    def test_rollback_holds_against_reloads(self):
+        """
+        Test that reloads and the watcher keep the rolled-back model until a newer version or a forced reload.
+        """
+        self.store.latest = "v2"
+        self.manager.reload()
+        self.manager.rollback()
+
+        result = self.manager.reload()
+        self.assertFalse(result["swapped"])
+        self.assertEqual(result["rolled_back_version"], "v2")
+        self.manager.start_watching(0.01)
+        self.addCleanup(self.manager.stop_watching)
+        time.sleep(0.1)
+        self.assertEqual(self.manager.current.version, "v1")
+
+        self.store.latest = "v3"
+        deadline = time.monotonic() + 5
+        while self.manager.current.version != "v3" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.manager.current.version, "v3")
+        self.assertIsNone(self.manager.rolled_back_version)
+
+        self.manager.stop_watching()
+        self.manager.rollback()
+        self.store.latest = "v3"
+        self.assertTrue(self.manager.reload(force=True)["swapped"])
+        self.assertEqual(self.manager.current.version, "v3")
+
+    def test_on_swap_callback(self):
+        """
+        Test that the swap callback sees every swapped-in model, including rollbacks, but not no-op reloads.
+        """
+        swapped = []
+        manager = ModelManager(self.store, on_swap=lambda loaded: swapped.append(loaded.version))
+        manager.load_initial()
+        manager.reload()
+        self.store.latest = "v2"
+        manager.reload()
+        manager.rollback()
+        self.assertEqual(swapped, ["v1", "v2", "v1"])
+
+    def test_watcher_retries_failed_initial_load(self):
+        """
+        Test that the watcher retries the initial load until it succeeds, then keeps reloading new versions.
+        """
+        store = UnavailableStore()
+        manager = ModelManager(store)
+        with self.assertRaises(ConnectionError):
+            manager.load_initial()
+        self.assertEqual(manager.load_error, "registry unreachable")
+
+        manager.start_watching(0.01)
+        self.addCleanup(manager.stop_watching)
+        time.sleep(0.05)
+        self.assertIsNone(manager.current)
+        store.available = True
+        deadline = time.monotonic() + 5
+        while manager.current is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(manager.current.version, "v1")
+        self.assertIsNone(manager.load_error)
+
+        store.latest = "v2"
+        while manager.current.version != "v2" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(manager.current.version, "v2")
+        self.assertEqual(manager.previous.version, "v1")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+import logging
+import subprocess
+import importlib.util
+from src.api.model_store import ModelStore, hash_path, MANIFEST_FILE, LATEST_FILE
+
+# The lightweight serving mode needs a standalone TFLite interpreter
+HAS_LITE_RUNTIME = any(importlib.util.find_spec(name) for name in ("ai_edge_litert", "tflite_runtime"))
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestModelStore(unittest.TestCase):
+
+    def setUp(self):
+        # Temporary cache directory with one cached "model" for run abc123
+        self.cache_dir = tempfile.mkdtemp()
+        self.model_dir = os.path.join(self.cache_dir, "abc123", "model")
+        os.makedirs(self.model_dir)
+        with open(os.path.join(self.model_dir, "MLmodel"), "w") as f:
+            f.write("flavors: {}\n")
+        with open(os.path.join(self.cache_dir, "abc123", MANIFEST_FILE), "w") as f:
+            json.dump({"run_id": "abc123", "sha256": hash_path(self.model_dir)}, f)
+        with open(os.path.join(self.cache_dir, LATEST_FILE), "w") as f:
+            f.write("abc123")
+        self.store = ModelStore("http://unused", "unused", self.cache_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_hash_path_detects_changes(self):
+        """
+        Test that the content hash changes when a file of the model changes.
+        """
+        before = hash_path(self.model_dir)
+        self.assertEqual(before, hash_path(self.model_dir))
+        with open(os.path.join(self.model_dir, "MLmodel"), "a") as f:
+            f.write("# changed\n")
+        self.assertNotEqual(before, hash_path(self.model_dir))
+        logger.info("Content hash changes with the model files.")
+
+    def test_latest_cached_run_id(self):
+        """
+        Test that the last downloaded run is picked up from the cache pointer.
+        """
+        self.assertEqual(self.store._latest_cached_run_id(), "abc123")
+        self.assertIsNone(ModelStore("http://unused", "unused", tempfile.gettempdir() + "/missing")._latest_cached_run_id())
+
+    def test_corrupted_cache_entry_is_discarded(self):
+        """
+        Test that a cached model whose files no longer match the manifest is removed instead of loaded.
+        """
+        with open(os.path.join(self.model_dir, "MLmodel"), "w") as f:
+            f.write("truncated")
+        self.assertIsNone(self.store._load_cached("abc123"))
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, "abc123")))
+
+    def test_missing_cache_entry(self):
+        """
+        Test that an unknown run id is reported as a cache miss.
+        """
+        self.assertIsNone(self.store._load_cached("unknown"))
+
+    def test_registry_disabled(self):
+        """
+        Test that without the registry a missing pinned model is an error instead of an MLflow lookup.
+        """
+        store = ModelStore("http://unused", "unused", self.cache_dir, pinned_path="missing.tflite", allow_registry=False)
+        with self.assertRaises(RuntimeError):
+            store.load()
+        with self.assertRaises(RuntimeError):
+            store.latest_version()
+
+    @unittest.skipUnless(HAS_LITE_RUNTIME, "no standalone TFLite interpreter installed")
+    def test_lite_mode_imports(self):
+        """
+        Test that the lite serving mode loads and serves a .tflite model without importing TensorFlow or MLflow.
+        """
+        from src.models.build_train_cnn import build_model
+        from src.models.export_model import convert_to_tflite, export_saved_model
+
+        saved_model_dir = export_saved_model(build_model((28, 28, 1), 4), os.path.join(self.cache_dir, "saved_model"))
+        tflite_path = convert_to_tflite(saved_model_dir, os.path.join(self.cache_dir, "CNN.tflite"))
+        script = (
+            "import sys, numpy as np\n"
+            "import src.api.prediction as prediction\n"
+            "prediction.model_manager.load_initial()\n"
+            "print(prediction.run_inference(np.zeros((3, 28, 28, 1), dtype=np.float32)).shape)\n"
+            "print(sorted(name for name in ('tensorflow', 'mlflow', 'pandas') if name in sys.modules))\n"
+        )
+        env = dict(os.environ, SERVING_MODE="lite", MODEL_PATH=tflite_path, MODEL_CACHE_DIR=self.cache_dir)
+        result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.split("\n")[-3:-1], ["(3, 4)", "[]"])
+        logger.info("Lite mode served the model without TensorFlow, MLflow or pandas.")
+
+if __name__ == '__main__':
+    unittest.main()
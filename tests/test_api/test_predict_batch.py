@@ -0,0 +1,135 @@
+import unittest
+import io
+import tarfile
+import zipfile
+import logging
+from unittest import mock
+import numpy as np
+from PIL import Image
+from fastapi.testclient import TestClient
+import src.api.prediction as prediction
+from src.api.model_store import LoadedModel
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class BrightnessPredictor:
+    # One-hot "probabilities": the label index is the mean brightness of the image scaled to the label count
+    def predict(self, batch):
+        labels = np.minimum((batch.reshape(len(batch), -1).mean(axis=1) * len(prediction.class_labels)).astype(int),
+                            len(prediction.class_labels) - 1)
+        return np.eye(len(prediction.class_labels), dtype=np.float32)[labels]
+
+def png(gray):
+    buffer = io.BytesIO()
+    Image.new("L", (60, 30), gray).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def label_of(gray):
+    return prediction.class_labels[min(int(gray / 255 * len(prediction.class_labels)), len(prediction.class_labels) - 1)]
+
+def zip_of(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+def tar_gz_of(members):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+class TestPredictBatch(unittest.TestCase):
+
+    def setUp(self):
+        # Serve a stub model, without the background loading from MLflow
+        patcher = mock.patch.object(prediction, "load_model_in_background", lambda: None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        prediction.model_manager.current = LoadedModel(BrightnessPredictor(), "test", "pinned")
+        prediction.prediction_cache.invalidate()
+        self.client = TestClient(prediction.app)
+        self.client.__enter__()
+        self.addCleanup(self.client.__exit__, None, None, None)
+        self.addCleanup(setattr, prediction.model_manager, "current", None)
+
+    def post(self, *files):
+        return self.client.post("/predict/batch", files=[("files", file) for file in files])
+
+    def test_plain_files_and_archives(self):
+        """
+        Test that plain images and the members of zip and tar.gz archives are predicted in upload order.
+        """
+        response = self.post(
+            ("a.png", png(10)),
+            ("crops.zip", zip_of({"b.png": png(100), "dir/c.png": png(200)})),
+            ("crops.tar.gz", tar_gz_of({"d.png": png(250)})),
+        )
+        self.assertEqual(response.status_code, 200)
+        predictions = response.json()["predictions"]
+        logger.info("Batch predictions: %s", predictions)
+        self.assertEqual([p["filename"] for p in predictions], ["a.png", "b.png", "dir/c.png", "d.png"])
+        self.assertEqual([p["predicted_text"] for p in predictions], [label_of(g) for g in (10, 100, 200, 250)])
+
+    def test_decode_errors_per_item(self):
+        """
+        Test that an undecodable image is reported in its own item while the other images are predicted.
+        """
+        response = self.post(("a.png", png(10)), ("notes.txt", b"not an image"), ("b.png", png(200)))
+        self.assertEqual(response.status_code, 200)
+        first, broken, last = response.json()["predictions"]
+        self.assertEqual(first["predicted_text"], label_of(10))
+        self.assertEqual(broken["filename"], "notes.txt")
+        self.assertIn("error", broken)
+        self.assertNotIn("predicted_text", broken)
+        self.assertEqual(last["predicted_text"], label_of(200))
+
+    def test_corrupt_archive(self):
+        """
+        Test that a truncated archive is rejected with a 400.
+        """
+        response = self.post(("crops.tar.gz", tar_gz_of({"a.png": png(10)})[:40]))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Invalid archive", response.json()["error"])
+
+    def test_too_many_files(self):
+        """
+        Test that a request with more images than MAX_FILES_PER_REQUEST is rejected with a 413.
+        """
+        with mock.patch.object(prediction, "MAX_FILES_PER_REQUEST", 2):
+            response = self.post(("crops.zip", zip_of({f"{i}.png": png(10) for i in range(3)})))
+            self.assertEqual(response.status_code, 413)
+            self.assertEqual(self.post(("a.png", png(10)), ("b.png", png(10))).status_code, 200)
+            self.assertEqual(self.post(*[(f"{i}.png", png(10)) for i in range(3)]).status_code, 413)
+
+    def test_archive_byte_cap(self):
+        """
+        Test that archives expanding beyond MAX_ARCHIVE_BYTES are rejected with a 413 before being extracted.
+        """
+        bomb = {"bomb.png": b"\0" * 10 * 1024 * 1024}
+        with mock.patch.object(prediction, "MAX_ARCHIVE_BYTES", 1024 * 1024):
+            for name, archive in (("bomb.zip", zip_of(bomb)), ("bomb.tar.gz", tar_gz_of(bomb))):
+                with self.subTest(archive=name):
+                    self.assertLess(len(archive), 64 * 1024)
+                    response = self.post((name, archive))
+                    self.assertEqual(response.status_code, 413)
+                    self.assertIn("bytes", response.json()["error"])
+
+    def test_lying_member_size(self):
+        """
+        Test that a member larger than its declared size still cannot go over the byte budget.
+        """
+        stream = io.BytesIO(b"\0" * 5000)
+        with mock.patch.object(prediction, "ARCHIVE_READ_CHUNK_BYTES", 1024):
+            with self.assertRaises(prediction.UploadLimitExceeded):
+                prediction.read_capped(stream, 4096)
+            self.assertEqual(len(prediction.read_capped(io.BytesIO(b"\0" * 4096), 4096)), 4096)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import logging
+from unittest import mock
+import numpy as np
+from fastapi.testclient import TestClient
+import src.api.prediction as prediction
+from src.api.model_store import LoadedModel
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ZeroPredictor:
+    def predict(self, batch):
+        return np.zeros((len(batch), len(prediction.class_labels)), dtype=np.float32)
+
+class TestPredictionAdmin(unittest.TestCase):
+
+    def setUp(self):
+        # Serve a stub model, without the background loading from MLflow
+        patcher = mock.patch.object(prediction, "load_model_in_background", lambda: None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        prediction.model_manager.current = LoadedModel(ZeroPredictor(), "test", "pinned")
+        self.addCleanup(setattr, prediction.model_manager, "current", None)
+        self.client = TestClient(prediction.app)
+        self.client.__enter__()
+        self.addCleanup(self.client.__exit__, None, None, None)
+
+    def test_admin_endpoints_need_admin_credentials(self):
+        """
+        Test that reload and rollback reject anonymous clients, wrong passwords and non-admin users.
+        """
+        for path in ("/admin/model/reload", "/admin/model/rollback"):
+            with self.subTest(path=path):
+                self.assertEqual(self.client.post(path).status_code, 401)
+                self.assertEqual(self.client.post(path, auth=("admin1", "wrong")).status_code, 401)
+                self.assertEqual(self.client.post(path, auth=("user1", "1resu")).status_code, 403)
+        self.assertEqual(prediction.model_manager.current.version, "test")
+
+    def test_admin_can_roll_back(self):
+        """
+        Test that an admin reaches the model manager.
+        """
+        response = self.client.post("/admin/model/rollback", auth=("admin1", "1nimda"))
+        # Nothing to roll back to: the request got past the credential check
+        self.assertEqual(response.status_code, 409)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+import time
+import logging
+import numpy as np
+from src.api.prediction_cache import PredictionCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class RecordingMetric:
+    # Minimal stand-in for a labelled Prometheus Counter/Gauge
+    def __init__(self):
+        self.values = {}
+
+    def labels(self, label):
+        self.label = label
+        return self
+
+    def inc(self, amount=1):
+        self.values[self.label] = self.values.get(self.label, 0) + amount
+
+    def set(self, value):
+        self.values[getattr(self, "label", None)] = value
+
+class TestPredictionCache(unittest.TestCase):
+
+    def test_hit_after_put(self):
+        """
+        Test that a result is served for the same bytes and model version only.
+        """
+        cache = PredictionCache(max_size=10, ttl_seconds=60)
+        probabilities = np.array([0.1, 0.9], dtype=np.float32)
+        self.assertIsNone(cache.get(cache.key("bytes", b"image", "v1")))
+
+        cache.put(cache.key("bytes", b"image", "v1"), probabilities)
+        np.testing.assert_array_equal(cache.get(cache.key("bytes", b"image", "v1")), probabilities)
+        self.assertIsNone(cache.get(cache.key("bytes", b"other image", "v1")))
+        self.assertIsNone(cache.get(cache.key("bytes", b"image", "v2")))
+        self.assertIsNone(cache.get(cache.key("pixels", b"image", "v1")))
+        logger.info("Cache hit/miss behaviour verified.")
+
+    def test_pixel_tier(self):
+        """
+        Test that pixel buffers are keyed by content, and that cached results cannot be modified by callers.
+        """
+        cache = PredictionCache(max_size=10, ttl_seconds=60)
+        pixels = np.arange(28 * 28, dtype=np.uint8).reshape(28, 28)
+        cache.put(cache.key("pixels", pixels, "v1"), np.array([1.0, 0.0]))
+
+        result = cache.get(cache.key("pixels", pixels.copy(), "v1"))
+        self.assertIsNotNone(result)
+        self.assertIsNotNone(cache.get(cache.key("pixels", np.asfortranarray(pixels), "v1")))
+        with self.assertRaises(ValueError):
+            result[0] = 0.5
+
+    def test_ttl_expiry(self):
+        """
+        Test that entries expire after the TTL.
+        """
+        evictions = RecordingMetric()
+        cache = PredictionCache(max_size=10, ttl_seconds=0.05, eviction_counter=evictions)
+        cache.put(cache.key("bytes", b"image", "v1"), np.zeros(2))
+        time.sleep(0.1)
+        self.assertIsNone(cache.get(cache.key("bytes", b"image", "v1")))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(evictions.values, {"expired": 1})
+
+    def test_lru_eviction(self):
+        """
+        Test that the cache never grows beyond max_size and evicts the least recently used entry.
+        """
+        evictions, size = RecordingMetric(), RecordingMetric()
+        cache = PredictionCache(max_size=2, ttl_seconds=60, eviction_counter=evictions, size_gauge=size)
+        cache.put(cache.key("bytes", b"a", "v1"), np.zeros(2))
+        cache.put(cache.key("bytes", b"b", "v1"), np.zeros(2))
+        self.assertIsNotNone(cache.get(cache.key("bytes", b"a", "v1")))  # "a" is now the most recently used
+        cache.put(cache.key("bytes", b"c", "v1"), np.zeros(2))
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(cache.key("bytes", b"b", "v1")))
+        self.assertIsNotNone(cache.get(cache.key("bytes", b"a", "v1")))
+        self.assertEqual(evictions.values, {"size": 1})
+        self.assertEqual(size.values[None], 2)
+
+    def test_invalidate_and_metrics(self):
+        """
+        Test that a model swap empties the cache, and that hits, misses and the hit ratio are reported per tier.
+        """
+        hits, misses, ratio, evictions = RecordingMetric(), RecordingMetric(), RecordingMetric(), RecordingMetric()
+        cache = PredictionCache(max_size=10, ttl_seconds=60, hit_counter=hits, miss_counter=misses,
+                                hit_ratio_gauge=ratio, eviction_counter=evictions)
+        cache.get(cache.key("bytes", b"image", "v1"))
+        cache.put(cache.key("bytes", b"image", "v1"), np.zeros(2))
+        cache.put(cache.key("pixels", b"pixels", "v1"), np.zeros(2))
+        cache.get(cache.key("bytes", b"image", "v1"))
+        self.assertEqual((hits.values, misses.values), ({"bytes": 1}, {"bytes": 1}))
+        self.assertEqual(ratio.values["bytes"], 0.5)
+
+        cache.invalidate()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(evictions.values, {"model_swap": 2})
+        self.assertIsNone(cache.get(cache.key("bytes", b"image", "v1")))
+
+    def test_disabled(self):
+        """
+        Test that a cache of size 0 never stores anything.
+        """
+        cache = PredictionCache(max_size=0)
+        self.assertIsNone(cache.key("bytes", b"image", "v1"))
+        cache.put(cache.key("bytes", b"image", "v1"), np.zeros(2))
+        self.assertIsNone(cache.get(cache.key("bytes", b"image", "v1")))
+        self.assertEqual(len(cache), 0)
+
+if __name__ == '__main__':
+    unittest.main()
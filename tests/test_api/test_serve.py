@@ -0,0 +1,170 @@
+import unittest
+import io
+import os
+import json
+import sys
+import time
+import socket
+import shutil
+import signal
+import tempfile
+import logging
+import subprocess
+import http.client
+import importlib.util
+from unittest import mock
+from PIL import Image
+import src.api.serve as serve
+from src.api.serve import PreforkServer, bind_socket, limit_threads, map_model, threads_per_worker
+
+# The lightweight serving mode needs a standalone TFLite interpreter
+HAS_LITE_RUNTIME = any(importlib.util.find_spec(name) for name in ("ai_edge_litert", "tflite_runtime"))
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class CrashingServer(PreforkServer):
+    # Workers that fail right after their start, e.g. on a model that cannot be loaded
+    def serve(self):
+        os._exit(3)
+
+class TestServe(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_thread_limits(self):
+        """
+        Test that the workers split the cores between them, with at least one thread each.
+        """
+        self.assertEqual(threads_per_worker(4, cpus=8), 2)
+        self.assertEqual(threads_per_worker(3, cpus=8), 2)
+        self.assertEqual(threads_per_worker(16, cpus=8), 1)
+
+        environ = {}
+        limit_threads(2, environ)
+        self.assertEqual(environ["MODEL_NUM_THREADS"], "2")
+        self.assertEqual(environ["OMP_NUM_THREADS"], "2")
+        self.assertEqual(environ["TF_NUM_INTEROP_THREADS"], "1")
+
+    def test_map_model(self):
+        """
+        Test that only .tflite files are memory-mapped, read-only.
+        """
+        path = os.path.join(self.tmp_dir, "CNN.tflite")
+        with open(path, "wb") as f:
+            f.write(os.urandom(10000))
+        mapping = map_model(path)
+        self.assertEqual(len(mapping), 10000)
+        with self.assertRaises(TypeError):
+            mapping[0] = 0
+        mapping.close()
+        self.assertIsNone(map_model(os.path.join(self.tmp_dir, "CNN.keras")))
+        self.assertIsNone(map_model(None))
+
+    def test_socket_is_tcp(self):
+        """
+        Test that the shared socket is explicitly TCP, so asyncio disables Nagle's algorithm on its connections.
+        """
+        sock = bind_socket("127.0.0.1", 0)
+        try:
+            self.assertEqual(sock.proto, socket.IPPROTO_TCP)
+            self.assertTrue(sock.get_inheritable())
+        finally:
+            sock.close()
+
+    def test_crashing_workers_give_up(self):
+        """
+        Test that workers dying right after their spawn are respawned with a doubling delay, until the launcher gives up with 1.
+        """
+        server = CrashingServer(None, None, 1, min_uptime_seconds=30, max_fast_failures=4, backoff_seconds=0.05)
+        start = time.monotonic()
+        with mock.patch.object(server, "spawn", wraps=server.spawn) as spawn:
+            self.assertEqual(server.run(), 1)
+        elapsed = time.monotonic() - start
+        # Delays of 0.05, 0.1 and 0.2 s between the four spawns
+        self.assertEqual(spawn.call_count, 4)
+        self.assertGreaterEqual(elapsed, 0.35)
+        self.assertEqual(server.pids, set())
+        self.assertIs(signal.getsignal(signal.SIGTERM), signal.SIG_DFL)
+        logger.info("Gave up after 4 fast failures in %.2f s.", elapsed)
+
+    def test_metrics_dir_removed(self):
+        """
+        Test that the PROMETHEUS_MULTIPROC_DIR created by the launcher is removed when it exits, with its exit status.
+        """
+        created = []
+
+        def run(server):
+            created.append(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+            self.assertTrue(os.path.isdir(created[0]))
+            return 1
+
+        argv = ["serve", "--app", "json:dumps", "--host", "127.0.0.1", "--port", "0", "--workers", "2"]
+        with mock.patch.dict(os.environ), mock.patch.object(sys, "argv", argv), \
+                mock.patch.object(PreforkServer, "run", run):
+            os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+            self.assertEqual(serve.main(), 1)
+        self.assertEqual(len(created), 1)
+        self.assertFalse(os.path.exists(created[0]))
+
+    @unittest.skipUnless(HAS_LITE_RUNTIME, "no standalone TFLite interpreter installed")
+    def test_prefork_workers(self):
+        """
+        Test that the forked workers serve predictions on the shared socket.
+        """
+        from src.api.prediction import class_labels
+        from src.models.build_train_cnn import build_model
+        from src.models.export_model import convert_to_tflite, export_saved_model
+
+        saved_model_dir = export_saved_model(build_model((28, 28, 1), len(class_labels)),
+                                             os.path.join(self.tmp_dir, "saved_model"))
+        tflite_path = convert_to_tflite(saved_model_dir, os.path.join(self.tmp_dir, "CNN.tflite"))
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        env = dict(os.environ, SERVING_MODE="lite", MODEL_PATH=tflite_path, MODEL_CACHE_DIR=self.tmp_dir)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "src.api.serve", "--host", "127.0.0.1", "--port", str(port), "--workers", "2"],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            deadline = time.monotonic() + 60
+            ready = 0
+            while ready < 8 and time.monotonic() < deadline:
+                try:
+                    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+                    connection.request("GET", "/ready")
+                    ready = ready + 1 if connection.getresponse().status == 200 else 0
+                    connection.close()
+                except OSError:
+                    ready = 0
+                if ready == 0:
+                    time.sleep(0.2)
+            self.assertEqual(ready, 8)
+
+            image = io.BytesIO()
+            Image.new("L", (60, 30), 200).save(image, format="PNG")
+            body = (b'--b\r\nContent-Disposition: form-data; name="file"; filename="word.png"\r\n'
+                    b'Content-Type: image/png\r\n\r\n' + image.getvalue() + b'\r\n--b--\r\n')
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            connection.request("POST", "/predict", body=body, headers={"Content-Type": "multipart/form-data; boundary=b"})
+            response = connection.getresponse()
+            self.assertEqual(response.status, 200)
+            self.assertIn(json.loads(response.read())["predicted_text"], class_labels)
+            connection.close()
+
+            with open(f"/proc/{server.pid}/task/{server.pid}/children") as f:
+                self.assertEqual(len(f.read().split()), 2)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            self.assertEqual(server.wait(timeout=30), 0)
+        logger.info("Two pre-forked workers served the model and shut down cleanly.")
+
+if __name__ == '__main__':
+    unittest.main()
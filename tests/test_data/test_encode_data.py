@@ -13,8 +13,8 @@ logger = logging.getLogger(__name__)
 class TestDataEncoding(unittest.TestCase):
 
     def setUp(self):
-        self.input_file = 'data/processed/cleaned_data.csv'
-        self.output_file = 'data/processed/encoded_data.csv'
+        self.input_file = 'data/processed/cleaned_data.parquet'
+        self.output_file = 'data/processed/encoded_data.parquet'
 
     def test_encode_data(self):
         """ Test that the encode_data function works correctly. """
@@ -26,7 +26,7 @@ class TestDataEncoding(unittest.TestCase):
 
         logger.info("Starting data encoding process...")
         # Call the data encoding process (runs the code in encode_data.py)
-        result = subprocess.run(['python3', 'src/data/encode_data.py'], capture_output=True, text=True)
+        result = subprocess.run(['python3', '-m', 'src.data.encode_data'], capture_output=True, text=True)
 
         self.assertEqual(result.returncode, 0, "Script execution failed.")
         logger.info("Data encoding script executed successfully.")
@@ -36,7 +36,7 @@ class TestDataEncoding(unittest.TestCase):
         logger.info("Output file created: %s", self.output_file)
 
         # Load the encoded data and verify it's correct
-        df_encoded = pd.read_csv(self.output_file)
+        df_encoded = pd.read_parquet(self.output_file)
 
         # Verify that the 'transcription_encoded' column exists
         self.assertIn('transcription_encoded', df_encoded.columns, "Encoded column is missing.")
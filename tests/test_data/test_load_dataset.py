@@ -73,5 +73,24 @@ class TestLoadDataset(unittest.TestCase):
         self.assertIn("quick", df["transcription"].values)  # Verify transcription is correct
         logger.info("The transcription 'quick' is present in the DataFrame.")
 
+    def test_missing_and_empty_images_are_skipped(self):
+        # Reference a missing image and an empty image in addition to the two valid ones
+        with open(self.test_words_file, "a") as f:
+            f.write("a01-000u-02-00 ok 128 1800 442 751 1778 1986 brown\n")
+            f.write("a01-000u-03-00 err 128 -1 -1 -1 -1 NN fox\n")
+        open(os.path.join(self.test_base_path, "a01/a01-000u/a01-000u-03-00.png"), "wb").close()
+
+        df = load_images(self.test_base_path, self.test_words_file)
+
+        self.assertListEqual(list(df["transcription"]), ["The", "quick"])
+        self.assertEqual(df.loc[0, "image_path"], os.path.join(self.test_base_path, "a01", "a01-000u", "a01-000u-00-00.png"))
+        logger.info("Missing and empty images were skipped.")
+
+        # Numeric metadata is parsed as integers instead of strings
+        for column in ["graylevel", "x", "y", "w", "h"]:
+            self.assertTrue(pd.api.types.is_integer_dtype(df[column]), f"Column {column} is not numeric.")
+        self.assertEqual(df.loc[1, "x"], 1784)
+        logger.info("Numeric columns are typed.")
+
 if __name__ == "__main__":
     unittest.main()
@@ -14,7 +14,7 @@ class TestFeaturePreparation(unittest.TestCase):
         """
         Test that the prepare_features function works correctly.
         """
-        input_file = 'data/processed/encoded_data.csv'
+        input_file = 'data/processed/encoded_data.parquet'
         output_features_file = 'data/processed/features.npy'
         output_labels_file = 'data/processed/labels.npy'
 
@@ -47,9 +47,10 @@ class TestFeaturePreparation(unittest.TestCase):
         self.assertGreater(Y.shape[0], 0, "No samples in labels.")
         logger.info("Number of samples in features and labels match: %d", X.shape[0])
 
-        # Verify the range of pixel values (0 to 1 due to normalization)
-        self.assertTrue((X >= 0).all() and (X <= 1).all(), "Feature values are not normalized properly.")
-        logger.info("Feature values are normalized properly.")
+        # Verify the features are stored as raw uint8 pixels (normalization happens in the input pipeline)
+        self.assertEqual(X.dtype, np.uint8, "Features are not stored as uint8 pixels.")
+        self.assertEqual(X.shape[1:], (28, 28, 1), "Features are not stored in NHWC shape.")
+        logger.info("Features are stored as uint8 pixels.")
 
 if __name__ == '__main__':
     unittest.main()
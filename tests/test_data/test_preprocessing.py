@@ -0,0 +1,96 @@
+import unittest
+import os
+import shutil
+import tempfile
+import logging
+import numpy as np
+from PIL import Image
+from src.data.preprocessing import decode_image, decode_batch, decode_batch_parallel, normalize, preprocess_batch
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestPreprocessing(unittest.TestCase):
+
+    def setUp(self):
+        # Create a few random grayscale and RGB PNG images of different sizes, plus a corrupted file
+        self.temp_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(0)
+        self.paths = []
+        for i, (size, mode) in enumerate([((60, 30), "L"), ((45, 80), "RGB"), ((28, 28), "L")]):
+            shape = (size[1], size[0]) if mode == "L" else (size[1], size[0], 3)
+            path = os.path.join(self.temp_dir, f"image_{i}.png")
+            Image.fromarray(rng.integers(0, 256, shape, dtype=np.uint8), mode).save(path)
+            self.paths.append(path)
+        self.corrupted_path = os.path.join(self.temp_dir, "corrupted.png")
+        with open(self.corrupted_path, "wb") as f:
+            f.write(b"not an image")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_matches_per_image_pipeline(self):
+        """
+        Test that the batch pipeline gives the same pixels as the original per-image PIL code.
+        """
+        features, failures = preprocess_batch(self.paths)
+        self.assertEqual(failures, [])
+        self.assertEqual(features.shape, (3, 28, 28, 1))
+        self.assertEqual(features.dtype, np.float32)
+
+        for i, path in enumerate(self.paths):
+            expected = np.array(Image.open(path).convert('L').resize((28, 28))) / 255.0
+            np.testing.assert_allclose(features[i, :, :, 0], expected, atol=1e-6)
+        logger.info("Batch preprocessing matches the per-image pipeline.")
+
+    def test_failures_are_reported(self):
+        """
+        Test that undecodable images are reported with their index and leave a zero row.
+        """
+        pixels, failures = decode_batch([self.paths[0], self.corrupted_path, self.paths[1]])
+        self.assertEqual(pixels.dtype, np.uint8)
+        self.assertEqual([index for index, _ in failures], [1])
+        self.assertFalse(pixels[1].any())
+
+    def test_preallocated_buffer_is_used(self):
+        """
+        Test that decoding writes into the provided buffer.
+        """
+        buffer = np.empty((3, 28, 28), dtype=np.uint8)
+        pixels, _ = decode_batch(self.paths, out=buffer)
+        self.assertIs(pixels, buffer)
+        np.testing.assert_array_equal(buffer[2], decode_image(self.paths[2]))
+
+    def test_parallel_decoding_matches_serial(self):
+        """
+        Test that thread and process pools return the same ordered pixels and failure indices as the serial path.
+        """
+        sources = (self.paths + [self.corrupted_path]) * 5
+        expected_pixels, expected_failures = decode_batch(sources)
+
+        for use_processes in (False, True):
+            pixels, failures = decode_batch_parallel(sources, workers=3, chunk_size=4, use_processes=use_processes)
+            np.testing.assert_array_equal(pixels, expected_pixels)
+            self.assertEqual(sorted(index for index, _ in failures), [index for index, _ in expected_failures])
+            logger.info("Parallel decoding (processes=%s) matches the serial path.", use_processes)
+
+    def test_normalize_range(self):
+        """
+        Test that normalization maps 0..255 to 0..1.
+        """
+        features = normalize(np.array([[[0, 255]]], dtype=np.uint8))
+        self.assertEqual(features.shape, (1, 1, 2, 1))
+        self.assertEqual(float(features.min()), 0.0)
+        self.assertAlmostEqual(float(features.max()), 1.0, places=6)
+
+    def test_normalize_keeps_channel_axis(self):
+        """
+        Test that batches already in NHWC shape are not given a second channel axis.
+        """
+        features = normalize(np.full((2, 28, 28, 1), 255, dtype=np.uint8))
+        self.assertEqual(features.shape, (2, 28, 28, 1))
+        self.assertEqual(features.dtype, np.float32)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,11 @@
 import unittest
 import numpy as np
 import os
+import json
 import logging
 import subprocess
-from src.data.split_data import *  # Import everything from split_data.py
+import tempfile
+from src.data.split_data import split_data, split_indices
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -13,16 +15,15 @@ class TestDataSplitting(unittest.TestCase):
 
     def test_split_data(self):
         """
-        Test that the split_data function works correctly.
+        Test that the split_data script writes the train/test indices and the manifest.
         """
         # Define file paths
-        X_train_path = 'data/processed/X_train.npy'
-        X_test_path = 'data/processed/X_test.npy'
-        Y_train_path = 'data/processed/Y_train.npy'
-        Y_test_path = 'data/processed/Y_test.npy'
+        train_idx_path = 'data/processed/train_idx.npy'
+        test_idx_path = 'data/processed/test_idx.npy'
+        manifest_path = 'data/processed/split_manifest.json'
 
         # Ensure the output files do not exist before testing
-        for path in [X_train_path, X_test_path, Y_train_path, Y_test_path]:
+        for path in [train_idx_path, test_idx_path, manifest_path]:
             if os.path.exists(path):
                 os.remove(path)
                 logger.info("Removed existing file: %s", path)
@@ -36,30 +37,58 @@ class TestDataSplitting(unittest.TestCase):
         logger.info("Script executed successfully.")
 
         # Check if the files are created
-        for path in [X_train_path, X_test_path, Y_train_path, Y_test_path]:
+        for path in [train_idx_path, test_idx_path, manifest_path]:
             self.assertTrue(os.path.exists(path), f"{path} was not created.")
             logger.info("Output file created: %s", path)
 
-        # Load the split data files
-        X_train = np.load(X_train_path)
-        X_test = np.load(X_test_path)
-        Y_train = np.load(Y_train_path)
-        Y_test = np.load(Y_test_path)
-        logger.info("Loaded data: X_train shape=%s, X_test shape=%s, Y_train shape=%s, Y_test shape=%s",
-                    X_train.shape, X_test.shape, Y_train.shape, Y_test.shape)
+        # Load the split indices
+        train_idx = np.load(train_idx_path)
+        test_idx = np.load(test_idx_path)
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        logger.info("Loaded indices: train=%d, test=%d, manifest=%s", len(train_idx), len(test_idx), manifest)
 
         # Check if the data is split into training and testing sets
-        self.assertGreater(len(X_train), 0, "Training data is empty.")
-        self.assertGreater(len(X_test), 0, "Test data is empty.")
-        logger.info("Training and test data loaded successfully with non-zero lengths.")
+        self.assertGreater(len(train_idx), 0, "Training data is empty.")
+        self.assertGreater(len(test_idx), 0, "Test data is empty.")
+        self.assertEqual(len(np.intersect1d(train_idx, test_idx)), 0, "Training and test sets overlap.")
+        self.assertEqual(manifest['n_train'], len(train_idx))
+        self.assertEqual(manifest['n_test'], len(test_idx))
 
         # Check that the split ratio is roughly 80% train and 20% test
-        total_data = len(X_train) + len(X_test)
-        self.assertAlmostEqual(len(X_train) / total_data, 0.8, delta=0.1,
+        total_data = len(train_idx) + len(test_idx)
+        self.assertAlmostEqual(len(train_idx) / total_data, 0.8, delta=0.1,
                                msg="Training data is not approximately 80% of the total data.")
-        self.assertAlmostEqual(len(X_test) / total_data, 0.2, delta=0.1,
+        self.assertAlmostEqual(len(test_idx) / total_data, 0.2, delta=0.1,
                                msg="Test data is not approximately 20% of the total data.")
-        logger.info("Data split ratio verified: Training=%d, Testing=%d", len(X_train), len(X_test))
+        logger.info("Data split ratio verified: Training=%d, Testing=%d", len(train_idx), len(test_idx))
+
+    def test_split_indices_stratified_and_deterministic(self):
+        """
+        Test that the split is stratified, sorted, covers every row once and only depends on the seed.
+        """
+        labels = np.repeat(np.arange(4), 25)
+        train_idx, test_idx = split_indices(labels, test_size=0.2, seed=7)
+
+        np.testing.assert_array_equal(np.sort(np.concatenate([train_idx, test_idx])), np.arange(100))
+        np.testing.assert_array_equal(train_idx, np.sort(train_idx))
+        np.testing.assert_array_equal(np.bincount(labels[test_idx]), [5, 5, 5, 5])
+
+        again_train, again_test = split_indices(labels, test_size=0.2, seed=7)
+        np.testing.assert_array_equal(train_idx, again_train)
+        np.testing.assert_array_equal(test_idx, again_test)
+
+    def test_split_rejects_misaligned_files(self):
+        """
+        Test that features and labels with different row counts are rejected.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            features_path = os.path.join(tmp_dir, 'features.npy')
+            labels_path = os.path.join(tmp_dir, 'labels.npy')
+            np.save(features_path, np.zeros((10, 28, 28, 1), dtype=np.uint8))
+            np.save(labels_path, np.zeros(9, dtype=np.int64))
+            with self.assertRaises(ValueError):
+                split_data(features_path, labels_path, tmp_dir)
 
 if __name__ == '__main__':
     unittest.main()
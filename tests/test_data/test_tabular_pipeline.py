@@ -0,0 +1,69 @@
+import unittest
+import os
+import sys
+import tempfile
+import logging
+import pandas as pd
+from src.data.filter_data import filter_data
+from src.data.clean_data import clean_data
+from src.data.encode_data import encode_data
+from src.data.tabular_pipeline import run_tabular_pipeline
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestTabularPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.words_file = os.path.join(self.tmp_dir.name, 'words.parquet')
+        # 'the' and ':' are frequent enough to pass the filter but are removed as stopwords,
+        # 'rare' is below the minimum count and 'often' above the maximum
+        transcriptions = ['house'] * 4 + ['the'] * 3 + [':'] * 3 + ['river'] * 5 + ['rare'] + ['often'] * 9
+        df = pd.DataFrame({
+            'word_id': [f'a01-000u-00-{i:02d}' for i in range(len(transcriptions))],
+            'transcription': transcriptions,
+            'image_path': [f'img_{i}.png' for i in range(len(transcriptions))],
+        })
+        df.to_parquet(self.words_file, index=False)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp_dir.name, name)
+
+    def test_fused_pass_matches_individual_stages(self):
+        """The fused pass writes the same filtered, cleaned and encoded tables as the three stages."""
+        filter_data(self.words_file, self.path('filtered_stage.parquet'), 3, 5)
+        clean_data(self.path('filtered_stage.parquet'), self.path('cleaned_stage.parquet'))
+        encode_data(self.path('cleaned_stage.parquet'), self.path('encoded_stage.parquet'))
+
+        mapping = run_tabular_pipeline(
+            self.words_file, self.path('encoded_fused.parquet'), 3, 5,
+            filtered_file=self.path('filtered_fused.parquet'), cleaned_file=self.path('cleaned_fused.parquet'),
+        )
+
+        for name in ('filtered', 'cleaned', 'encoded'):
+            pd.testing.assert_frame_equal(
+                pd.read_parquet(self.path(f'{name}_fused.parquet')),
+                pd.read_parquet(self.path(f'{name}_stage.parquet')),
+            )
+        encoded = pd.read_parquet(self.path('encoded_fused.parquet'))
+        self.assertEqual(mapping, {'house': 0, 'river': 1})
+        self.assertEqual(sorted(encoded['transcription'].unique()), ['house', 'river'])
+        logger.info("Fused pass matches the individual stages: %s", mapping)
+
+    def test_intermediates_are_optional(self):
+        """Without intermediate paths only the encoded table is written."""
+        run_tabular_pipeline(self.words_file, self.path('encoded.parquet'), 3, 5)
+
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)), ['encoded.parquet', 'words.parquet'])
+
+    def test_no_nltk_import(self):
+        """Cleaning uses the bundled stopword list and never imports nltk."""
+        self.assertNotIn('nltk', sys.modules)
+
+if __name__ == '__main__':
+    unittest.main()
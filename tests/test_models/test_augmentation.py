@@ -0,0 +1,77 @@
+import unittest
+import logging
+import numpy as np
+from src.data.preprocessing import normalize
+from src.models.augmentation import Augmenter
+from src.models.input_pipeline import FeatureBatches, make_feature_dataset
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestAugmentation(unittest.TestCase):
+
+    def setUp(self):
+        # Light background with a dark horizontal stroke
+        rng = np.random.default_rng(0)
+        self.features = rng.integers(200, 256, (20, 28, 28, 1), dtype=np.uint8)
+        self.features[:, 12:16, 4:24] = 10
+        self.labels = np.arange(20) % 3
+        self.batch = normalize(self.features[:8])
+
+    def test_shape_dtype_and_range(self):
+        """Augmented batches keep their shape, dtype and pixel range."""
+        augmented = Augmenter(seed=1)(self.batch, 0)
+
+        self.assertEqual(augmented.shape, self.batch.shape)
+        self.assertEqual(augmented.dtype, np.float32)
+        self.assertGreaterEqual(augmented.min(), 0.0)
+        self.assertLessEqual(augmented.max(), 1.0)
+
+    def test_reproducible_per_epoch_and_batch(self):
+        """The same (seed, epoch, batch) gives the same augmentation, another epoch a different one."""
+        augmenter = Augmenter(seed=1)
+        first = augmenter(self.batch, 3)
+        np.testing.assert_array_equal(augmenter(self.batch, 3), first)
+        self.assertFalse(np.array_equal(augmenter(self.batch, 4), first))
+
+        augmenter.on_epoch_begin(1)
+        self.assertFalse(np.array_equal(augmenter(self.batch, 3), first))
+        logger.info("Augmentations are reproducible per (epoch, batch) and change across epochs")
+
+    def test_zero_magnitudes_are_identity(self):
+        """With every transform disabled the batch is returned unchanged."""
+        augmenter = Augmenter(max_rotation=0, max_shift=0, elastic_alpha=0, stroke_probability=0)
+
+        np.testing.assert_allclose(augmenter(self.batch, 0), self.batch, atol=1e-6)
+
+    def test_stroke_jitter(self):
+        """Thickening dark strokes only darkens pixels, thinning only lightens them."""
+        thicker = Augmenter(max_rotation=0, max_shift=0, elastic_alpha=0, stroke_probability=1.0)
+        augmented = thicker(self.batch, 0)
+
+        difference = (augmented - self.batch).reshape(len(self.batch), -1)
+        darker = (difference <= 0).all(axis=1)
+        lighter = (difference >= 0).all(axis=1)
+        self.assertTrue((darker ^ lighter).all())
+
+    def test_pipelines_apply_augmentation(self):
+        """Both input pipelines augment the batches and leave the labels untouched."""
+        augmenter = Augmenter(seed=2)
+        plain = list(make_feature_dataset(self.features, self.labels, batch_size=8).as_numpy_iterator())
+        augmented = list(make_feature_dataset(self.features, self.labels, batch_size=8,
+                                              augment=augmenter).as_numpy_iterator())
+
+        self.assertEqual(len(augmented), len(plain))
+        for (x_plain, y_plain), (x_aug, y_aug) in zip(plain, augmented):
+            np.testing.assert_array_equal(y_aug, y_plain)
+            self.assertEqual(x_aug.shape, x_plain.shape)
+            self.assertFalse(np.array_equal(x_aug, x_plain))
+
+        batches = FeatureBatches(self.features, self.labels, batch_size=8, augment=augmenter)
+        x, y = batches[1]
+        np.testing.assert_array_equal(x, augmenter(normalize(self.features[8:16]), 1))
+        np.testing.assert_array_equal(y, self.labels[8:16])
+
+if __name__ == '__main__':
+    unittest.main()
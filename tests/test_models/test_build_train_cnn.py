@@ -54,6 +54,20 @@ class TestBuildTrainCNN(unittest.TestCase):
         self.assertEqual(model.output_shape, (None, num_classes), "Output shape does not match expected shape.")
         logger.info("Output layer shape verified: %s", model.output_shape)
 
+    def test_label_modes(self):
+        # Integer labels use the sparse loss, one-hot labels the categorical loss
+        sparse_model = build_model((28, 28, 1), 10)
+        one_hot_model = build_model((28, 28, 1), 10, label_mode="one_hot")
+        self.assertEqual(sparse_model.loss, "sparse_categorical_crossentropy")
+        self.assertEqual(one_hot_model.loss, "categorical_crossentropy")
+
+        # The sparse model trains on integer labels
+        x = np.random.rand(8, 28, 28, 1).astype("float32")
+        y = np.arange(8) % 10
+        history = sparse_model.fit(x, y, epochs=1, verbose=0)
+        self.assertIn("loss", history.history)
+        logger.info("Sparse model trained on integer labels: %s", history.history)
+
     def test_save_model_summary(self):
         # Define dummy input shape and number of classes
         input_shape = (28, 28, 1)
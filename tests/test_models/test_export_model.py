@@ -0,0 +1,52 @@
+import unittest
+import os
+import tempfile
+import logging
+import numpy as np
+from src.api.model_store import KerasPredictor, SavedModelPredictor, TFLitePredictor, load_local_model
+from src.models.build_train_cnn import build_model
+from src.models.export_model import export_model
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestExportModel(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # One small trained-shape model exported once for every test
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.model_path = os.path.join(cls.tmp_dir.name, 'CNN.keras')
+        cls.saved_model_dir = os.path.join(cls.tmp_dir.name, 'CNN_savedmodel')
+        cls.tflite_path = os.path.join(cls.tmp_dir.name, 'CNN.tflite')
+        cls.model = build_model((28, 28, 1), 5, architecture='gap')
+        cls.model.save(cls.model_path)
+        cls.differences = export_model(cls.model_path, cls.saved_model_dir, cls.tflite_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_exports_match_keras(self):
+        """Both exported artifacts are written and reproduce the Keras probabilities."""
+        self.assertTrue(os.path.exists(os.path.join(self.saved_model_dir, 'saved_model.pb')))
+        self.assertTrue(os.path.exists(self.tflite_path))
+        self.assertLess(max(self.differences.values()), 1e-4)
+        logger.info("Export differences from Keras: %s", self.differences)
+
+    def test_serving_backends(self):
+        """The prediction service picks the backend from the artifact and serves any batch size."""
+        expected = {'keras': KerasPredictor, 'saved_model': SavedModelPredictor, 'tflite': TFLitePredictor}
+        paths = {'keras': self.model_path, 'saved_model': self.saved_model_dir, 'tflite': self.tflite_path}
+        rng = np.random.default_rng(0)
+        for name, path in paths.items():
+            with self.subTest(backend=name):
+                predictor = load_local_model(path)
+                self.assertIsInstance(predictor, expected[name])
+                for size in (1, 7, 1):
+                    batch = rng.random((size, 28, 28, 1), dtype=np.float32)
+                    np.testing.assert_allclose(predictor.predict(batch), self.model.predict_on_batch(batch), atol=1e-4)
+
+if __name__ == '__main__':
+    unittest.main()
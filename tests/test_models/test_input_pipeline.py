@@ -0,0 +1,153 @@
+import unittest
+import os
+import tempfile
+import logging
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+from PIL import Image
+from src.data.preprocessing import decode_image, normalize
+from src.models.input_pipeline import (
+    FeatureBatches, InputStallMonitor, load_features, load_image_paths, make_feature_dataset, make_image_dataset,
+)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestInputPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.features_path = os.path.join(self.tmp_dir.name, 'features.npy')
+        self.pixels = np.arange(10 * 28 * 28, dtype=np.int64).reshape(10, 28, 28, 1).astype(np.uint8)
+        self.labels = np.arange(10)
+        np.save(self.features_path, self.pixels)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_load_features_is_memory_mapped(self):
+        """The feature store is opened lazily and keeps its uint8 dtype."""
+        features = load_features(self.features_path)
+        self.assertIsInstance(features, np.memmap)
+        self.assertEqual(features.dtype, np.uint8)
+
+    def test_batches_are_normalized(self):
+        """Each batch is read from the memory map and normalized to float32 in [0, 1]."""
+        batches = FeatureBatches(load_features(self.features_path), self.labels, batch_size=4)
+
+        self.assertEqual(len(batches), 3)
+        x, y = batches[2]
+        self.assertEqual(x.shape, (2, 28, 28, 1))
+        self.assertEqual(x.dtype, np.float32)
+        np.testing.assert_allclose(x, self.pixels[8:] / 255.0, rtol=1e-6)
+        np.testing.assert_array_equal(y, [8, 9])
+        logger.info("Last batch shape: %s", x.shape)
+
+    def test_shuffled_epoch_covers_every_sample(self):
+        """A shuffled epoch visits every sample once and keeps features and labels aligned."""
+        batches = FeatureBatches(load_features(self.features_path), self.labels, batch_size=3, shuffle=True, seed=0)
+
+        seen = []
+        for index in range(len(batches)):
+            x, y = batches[index]
+            np.testing.assert_allclose(x, self.pixels[y] / 255.0, rtol=1e-6)
+            seen.extend(y.tolist())
+        self.assertEqual(sorted(seen), list(range(10)))
+
+    def test_batches_over_indices(self):
+        """With indices, batches read only the selected rows of the shared feature file."""
+        indices = np.array([1, 4, 5, 9])
+        batches = FeatureBatches(load_features(self.features_path), self.labels[indices], indices=indices,
+                                 batch_size=3, shuffle=True, seed=0)
+
+        self.assertEqual(len(batches), 2)
+        seen = []
+        for index in range(len(batches)):
+            x, y = batches[index]
+            np.testing.assert_allclose(x, self.pixels[y] / 255.0, rtol=1e-6)
+            seen.extend(y.tolist())
+        self.assertEqual(sorted(seen), [1, 4, 5, 9])
+
+    def test_one_hot_labels_per_batch(self):
+        """With one_hot_classes, integer labels are one-hot encoded batch by batch."""
+        batches = FeatureBatches(load_features(self.features_path), self.labels, batch_size=4, one_hot_classes=10)
+
+        _, y = batches[0]
+        self.assertEqual(y.shape, (4, 10))
+        self.assertEqual(y.dtype, np.float32)
+        np.testing.assert_array_equal(y.argmax(axis=1), [0, 1, 2, 3])
+
+    def test_batches_without_labels(self):
+        """Without labels, batches hold the features only (used for predictions)."""
+        batches = FeatureBatches(load_features(self.features_path), batch_size=8)
+        self.assertEqual(batches[0].shape, (8, 28, 28, 1))
+
+    def test_feature_dataset_matches_normalize(self):
+        """The tf.data pipeline yields the same normalized pixels and labels as the shared normalize."""
+        indices = np.array([0, 2, 3, 7])
+        dataset = make_feature_dataset(load_features(self.features_path), self.labels[indices], indices=indices,
+                                       batch_size=3)
+
+        self.assertEqual(int(dataset.cardinality()), 2)
+        batches = list(dataset.as_numpy_iterator())
+        x = np.concatenate([x for x, _ in batches])
+        y = np.concatenate([y for _, y in batches])
+        np.testing.assert_array_equal(x, normalize(self.pixels[indices]))
+        np.testing.assert_array_equal(y, indices)
+
+    def test_feature_dataset_shuffles_each_epoch(self):
+        """Shuffled epochs keep features and labels aligned and differ from one another."""
+        dataset = make_feature_dataset(load_features(self.features_path), self.labels, batch_size=10, shuffle=True,
+                                       seed=1, one_hot_classes=10, cache=True)
+
+        epochs = []
+        for _ in range(3):
+            x, y = next(dataset.as_numpy_iterator())
+            labels = y.argmax(axis=1)
+            np.testing.assert_array_equal(x, normalize(self.pixels[labels]))
+            epochs.append(labels.tolist())
+        self.assertEqual(sorted(epochs[0]), list(range(10)))
+        self.assertTrue(epochs[0] != epochs[1] or epochs[1] != epochs[2])
+
+    def test_image_dataset_matches_decode_image(self):
+        """Images decoded by the tf.data pipeline match the shared decode_image."""
+        rng = np.random.default_rng(0)
+        paths = []
+        for i in range(3):
+            path = os.path.join(self.tmp_dir.name, f'img_{i}.png')
+            Image.fromarray(rng.integers(0, 256, (40, 60), dtype=np.uint8)).save(path)
+            paths.append(path)
+
+        x, y = next(make_image_dataset(paths, np.array([0, 1, 2]), batch_size=3).as_numpy_iterator())
+        expected = normalize(np.stack([decode_image(path) for path in paths]))
+        np.testing.assert_array_equal(x, expected)
+        np.testing.assert_array_equal(y, [0, 1, 2])
+
+    def test_load_image_paths_skips_failed_rows(self):
+        """Image paths stay aligned with the feature store when some images could not be decoded."""
+        encoded_file = os.path.join(self.tmp_dir.name, 'encoded_data.parquet')
+        errors_file = os.path.join(self.tmp_dir.name, 'feature_errors.csv')
+        pd.DataFrame({'image_path': ['a.png', 'b.png', 'c.png', 'd.png']}).to_parquet(encoded_file, index=False)
+        pd.DataFrame({'row': [1], 'image_path': ['b.png'], 'error': ['broken']}).to_csv(errors_file, index=False)
+
+        self.assertEqual(load_image_paths(encoded_file, errors_file).tolist(), ['a.png', 'c.png', 'd.png'])
+
+    def test_stall_monitor_logs_each_epoch(self):
+        """The stall monitor adds the input stall time of every epoch to the training logs."""
+        model = tf.keras.Sequential([
+            tf.keras.Input((28, 28, 1)), tf.keras.layers.Flatten(), tf.keras.layers.Dense(10, activation='softmax'),
+        ])
+        model.compile(loss='sparse_categorical_crossentropy', optimizer='adam')
+        monitor = InputStallMonitor()
+        dataset = monitor.wrap(make_feature_dataset(load_features(self.features_path), self.labels, batch_size=2))
+
+        history = model.fit(dataset, epochs=2, callbacks=[monitor], verbose=0)
+        self.assertEqual(len(monitor.epoch_stalls), 2)
+        self.assertEqual(len(history.history['input_stall_seconds']), 2)
+        self.assertTrue(all(0.0 <= fraction <= 1.0 for fraction in history.history['input_stall_fraction']))
+        logger.info("Input stall per epoch: %s", monitor.epoch_stalls)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import logging
+import numpy as np
+from src.models.build_train_cnn import build_model
+from src.models.model_zoo import ARCHITECTURES, count_flops, profile_model
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestModelZoo(unittest.TestCase):
+
+    def test_architectures_train(self):
+        """Every architecture builds with the classification head and trains on integer labels."""
+        x = np.random.rand(8, 28, 28, 1).astype('float32')
+        y = np.arange(8) % 10
+        for name in ARCHITECTURES:
+            with self.subTest(architecture=name):
+                model = build_model((28, 28, 1), 10, architecture=name)
+                self.assertEqual(model.output_shape, (None, 10))
+                history = model.fit(x, y, epochs=1, verbose=0)
+                self.assertIn('loss', history.history)
+
+    def test_baseline_flops(self):
+        """FLOPs are twice the multiply-adds of the convolution and dense layers."""
+        model = build_model((28, 28, 1), 10)
+        conv = 24 * 24 * 32 * 5 * 5
+        dense = 12 * 12 * 32 * 128 + 128 * 10
+
+        self.assertEqual(count_flops(model), 2 * (conv + dense))
+
+    def test_smaller_heads(self):
+        """The global-average-pooling heads have far fewer weights than the Flatten + Dense baseline."""
+        baseline = build_model((28, 28, 1), 100).count_params()
+        for name in ('separable', 'gap', 'tiny_resnet'):
+            with self.subTest(architecture=name):
+                self.assertLess(build_model((28, 28, 1), 100, architecture=name).count_params(), baseline / 4)
+
+    def test_profile(self):
+        """The profile reports parameters, FLOPs and a latency per batch size."""
+        model = build_model((28, 28, 1), 10, architecture='gap')
+        profile = profile_model(model, batch_sizes=(1, 4), repeat=3)
+
+        self.assertEqual(profile['params'], model.count_params())
+        self.assertGreater(profile['flops'], 0)
+        self.assertGreater(profile['latency_ms_batch_1'], 0)
+        self.assertGreater(profile['latency_ms_batch_4'], 0)
+        logger.info("Profile of the gap architecture: %s", profile)
+
+if __name__ == '__main__':
+    unittest.main()
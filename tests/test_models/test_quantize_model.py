@@ -0,0 +1,88 @@
+import unittest
+import os
+import json
+import tempfile
+import logging
+import numpy as np
+from src.api.model_store import TFLitePredictor, read_quantization_info
+from src.models.build_train_cnn import build_model
+from src.models.export_model import export_model
+from src.models.quantize_model import quantize_model
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestQuantizeModel(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Small feature store, split and float export shared by the tests
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        labels = np.arange(60) % 3
+        features = rng.integers(180, 256, (60, 28, 28, 1), dtype=np.uint8)
+        for label in range(3):
+            features[labels == label, 8 * label:8 * label + 8] = 20
+        np.save(cls.path('features.npy'), features)
+        np.save(cls.path('labels.npy'), labels)
+        np.save(cls.path('train_idx.npy'), np.arange(40))
+        np.save(cls.path('test_idx.npy'), np.arange(40, 60))
+
+        model = build_model((28, 28, 1), 3, architecture='gap')
+        model.fit(features[:40] / 255.0, labels[:40], epochs=3, verbose=0)
+        model.save(cls.path('CNN.keras'))
+        export_model(cls.path('CNN.keras'), cls.path('CNN_savedmodel'), cls.path('CNN.tflite'))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    @classmethod
+    def path(cls, name):
+        return os.path.join(cls.tmp_dir.name, name)
+
+    def quantize(self, max_accuracy_drop):
+        return quantize_model(
+            self.path('CNN.tflite'), self.path('CNN_savedmodel'), self.path('features.npy'), self.path('labels.npy'),
+            processed_dir=self.tmp_dir.name, output_dir=self.path('quantized'), report_path=self.path('report.json'),
+            max_accuracy_drop=max_accuracy_drop, calibration_samples=20,
+        )
+
+    def test_publishes_within_threshold(self):
+        """A quantized model within the accuracy threshold is published and reported with its deltas."""
+        report = self.quantize(max_accuracy_drop=1.0)
+
+        self.assertEqual(report['published'], 'int8')
+        self.assertTrue(os.path.exists(self.path('quantized/CNN_quantized.tflite')))
+        info = read_quantization_info(self.path('quantized/CNN_quantized.tflite'))
+        self.assertEqual(info['variant'], 'int8')
+        self.assertEqual(info['accuracy'], report['int8']['accuracy'])
+        for name in ('dynamic', 'int8'):
+            self.assertLess(report[name]['size_kib'], report['float']['size_kib'])
+            self.assertIn('latency_ms_batch_64_delta', report[name])
+        with open(self.path('report.json'), encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['published'], 'int8')
+        logger.info("Quantization report: %s", report)
+
+    def test_gate_blocks_publication(self):
+        """Nothing is published when no variant satisfies the threshold."""
+        report = self.quantize(max_accuracy_drop=-1.0)
+
+        self.assertIsNone(report['published'])
+        self.assertFalse(os.path.exists(self.path('quantized/CNN_quantized.tflite')))
+
+    def test_serving_full_integer_model(self):
+        """The prediction service serves the full-integer model with float inputs and outputs."""
+        self.quantize(max_accuracy_drop=1.0)
+        predictor = TFLitePredictor(self.path('quantized/CNN_quantized.tflite'))
+        float_predictor = TFLitePredictor(self.path('CNN.tflite'))
+        batch = np.load(self.path('features.npy'))[40:45] / np.float32(255)
+
+        probabilities = predictor.predict(batch)
+        self.assertEqual(probabilities.shape, (5, 3))
+        self.assertEqual(probabilities.dtype, np.float32)
+        np.testing.assert_allclose(probabilities, float_predictor.predict(batch), atol=0.05)
+
+if __name__ == '__main__':
+    unittest.main()
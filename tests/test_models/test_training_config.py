@@ -0,0 +1,80 @@
+import unittest
+import os
+import tempfile
+import logging
+from unittest import mock
+import numpy as np
+from src.models.build_train_cnn import build_model
+from src.models.training_config import (
+    DEFAULT_CONFIG, ThroughputMonitor, bfloat16_supported, load_training_config,
+)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestTrainingConfig(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.params_file = os.path.join(self.tmp_dir.name, 'params.yaml')
+        with open(self.params_file, 'w', encoding='utf-8') as f:
+            f.write("train:\n  batch_size: 128\n  intra_op_threads: 4\nother:\n  value: 1\n")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_defaults_without_file(self):
+        """A missing parameters file gives the default configuration."""
+        config = load_training_config(os.path.join(self.tmp_dir.name, 'missing.yaml'))
+
+        self.assertEqual(config, DEFAULT_CONFIG)
+
+    def test_file_and_overrides(self):
+        """The train section overrides the defaults, command line values override the file."""
+        config = load_training_config(self.params_file, overrides={'batch_size': 64, 'xla': None, 'epochs': 5})
+
+        self.assertEqual(config['batch_size'], 64)
+        self.assertEqual(config['intra_op_threads'], 4)
+        self.assertEqual(config['epochs'], 5)
+        self.assertFalse(config['xla'])
+        logger.info("Loaded training configuration: %s", config)
+
+    def test_invalid_settings(self):
+        """Unknown settings and precisions are rejected."""
+        with self.assertRaises(ValueError):
+            load_training_config(self.params_file, overrides={'batch': 64})
+        with self.assertRaises(ValueError):
+            load_training_config(self.params_file, overrides={'precision': 'float16'})
+
+    def test_bfloat16_detection(self):
+        """bfloat16 support is read from the CPU flags."""
+        cpuinfo = os.path.join(self.tmp_dir.name, 'cpuinfo')
+        with open(cpuinfo, 'w', encoding='utf-8') as f:
+            f.write("flags\t\t: fpu sse avx2 avx512f\n")
+        self.assertFalse(bfloat16_supported(cpuinfo))
+
+        with open(cpuinfo, 'w', encoding='utf-8') as f:
+            f.write("flags\t\t: fpu sse avx2 avx512f avx512_bf16\n")
+        self.assertTrue(bfloat16_supported(cpuinfo))
+
+    def test_throughput_monitor(self):
+        """Every epoch logs its training samples per second."""
+        model = build_model((28, 28, 1), 3, jit_compile=True)
+        x = np.random.rand(32, 28, 28, 1).astype('float32')
+        y = np.arange(32) % 3
+        monitor = ThroughputMonitor(len(x))
+
+        with mock.patch('src.models.training_config.mlflow') as mlflow:
+            history = model.fit(x, y, batch_size=8, epochs=2, callbacks=[monitor], verbose=0)
+
+        self.assertEqual(len(monitor.epoch_throughputs), 2)
+        self.assertTrue(all(value > 0 for value in history.history['samples_per_second']))
+        # Logged to MLflow whatever the order of the callbacks
+        self.assertEqual(mlflow.log_metric.call_args_list,
+                         [mock.call('samples_per_second', value, step=epoch)
+                          for epoch, value in enumerate(monitor.epoch_throughputs)])
+        logger.info("Training throughput: %s", monitor.epoch_throughputs)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import sys
+import time
+import logging
+from src.pipeline.jobs import JobManager, PipelineBusyError, SUCCEEDED, FAILED
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def wait_for(job, timeout=10):
+    deadline = time.time() + timeout
+    while job.status not in (SUCCEEDED, FAILED) and time.time() < deadline:
+        time.sleep(0.05)
+    return job
+
+class TestJobManager(unittest.TestCase):
+
+    def test_job_reports_stages_and_log(self):
+        """
+        Test that a job runs in the background and tracks DVC stage progress from its output.
+        """
+        script = (
+            "print(\"Stage 'filter_data' didn't change, skipping\");"
+            "print(\"Running stage 'clean_data':\");"
+            "print('cleaning...')"
+        )
+        manager = JobManager("test", [sys.executable, "-c", script], stages=["filter_data", "clean_data"])
+        job = wait_for(manager.submit())
+        report = job.to_dict()
+        logger.info("Job report: %s", report)
+
+        self.assertEqual(report["status"], SUCCEEDED)
+        self.assertEqual(report["returncode"], 0)
+        self.assertEqual(report["completed_stages"], ["filter_data", "clean_data"])
+        self.assertEqual(report["total_stages"], 2)
+        self.assertIn("cleaning...", report["log_tail"])
+        self.assertIs(manager.get(job.job_id), job)
+
+    def test_failed_command(self):
+        """
+        Test that a non-zero exit code marks the job as failed.
+        """
+        manager = JobManager("test", [sys.executable, "-c", "import sys; sys.exit(3)"])
+        job = wait_for(manager.submit())
+        self.assertEqual(job.status, FAILED)
+        self.assertEqual(job.returncode, 3)
+
+    def test_one_job_per_pipeline(self):
+        """
+        Test that a second job is rejected while the first one is still running.
+        """
+        manager = JobManager("test", [sys.executable, "-c", "import time; time.sleep(0.5)"])
+        first = manager.submit()
+        with self.assertRaises(PipelineBusyError):
+            manager.submit()
+        wait_for(first)
+
+        # Once the first job has finished, a new one can start
+        second = wait_for(manager.submit())
+        self.assertEqual(second.status, SUCCEEDED)
+
+if __name__ == '__main__':
+    unittest.main()